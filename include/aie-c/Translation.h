@@ -29,6 +29,8 @@ MLIR_CAPI_EXPORTED MlirStringRef aieTranslateToXAIEV2(MlirOperation op);
 MLIR_CAPI_EXPORTED MlirStringRef aieTranslateToHSA(MlirOperation op);
 MLIR_CAPI_EXPORTED MlirStringRef aieTranslateToBCF(MlirOperation op, int col,
                                                    int row);
+MLIR_CAPI_EXPORTED MlirStringRef aieTranslateToLdScript(MlirOperation op,
+                                                        int col, int row);
 MLIR_CAPI_EXPORTED MlirStringRef aieLLVMLink(MlirStringRef *modules,
                                              int nModules);
 MLIR_CAPI_EXPORTED MlirLogicalResult
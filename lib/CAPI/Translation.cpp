@@ -149,6 +149,18 @@ MlirStringRef aieTranslateToBCF(MlirOperation moduleOp, int col, int row) {
   return mlirStringRefCreate(cStr, bcf.size());
 }
 
+MlirStringRef aieTranslateToLdScript(MlirOperation moduleOp, int col,
+                                     int row) {
+  std::string ldScript;
+  llvm::raw_string_ostream os(ldScript);
+  ModuleOp mod = llvm::cast<ModuleOp>(unwrap(moduleOp));
+  if (failed(AIETranslateToLdScript(mod, os, col, row)))
+    return mlirStringRefCreate(nullptr, 0);
+  char *cStr = static_cast<char *>(malloc(ldScript.size()));
+  ldScript.copy(cStr, ldScript.size());
+  return mlirStringRefCreate(cStr, ldScript.size());
+}
+
 MlirStringRef aieLLVMLink(MlirStringRef *modules, int nModules) {
   std::string ll;
   llvm::raw_string_ostream os(ll);
@@ -161,6 +161,13 @@ NB_MODULE(_aie, m) {
       },
       "module"_a, "col"_a, "row"_a);
 
+  m.def(
+      "generate_ldscript",
+      [&stealCStr](MlirOperation op, int col, int row) {
+        return stealCStr(aieTranslateToLdScript(op, col, row));
+      },
+      "module"_a, "col"_a, "row"_a);
+
   m.def(
       "aie_llvm_link",
       [&stealCStr](std::vector<std::string> moduleStrs) {
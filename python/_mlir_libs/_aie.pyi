@@ -10,6 +10,7 @@ __all__ = [
     "aie_llvm_link",
     "generate_bcf",
     "generate_cdo",
+    "generate_ldscript",
     "generate_xaie",
     "npu_instgen",
     "register_dialect",
@@ -30,6 +31,7 @@ def generate_cdo(
     partition_start_col: int = 1,
     enable_cores: bool = True,
 ) -> None: ...
+def generate_ldscript(module: Operation, col: int, row: int) -> str: ...
 def generate_xaie(module: Operation) -> str: ...
 def npu_instgen(module: Operation) -> list: ...
 def register_dialect(registry: DialectRegistry) -> None: ...
@@ -6,7 +6,17 @@
 #
 # (c) Copyright 2021 Xilinx Inc.
 
-from aie.compiler.aiecc.main import main
+import sys
+
+from aie.compiler.aiecc.server import forward_to_server
 
 if __name__ == "__main__":
+    # Hand the compile to a running `aiecc.py --serve` if there is one, before
+    # paying for importing the compiler.
+    returncode = forward_to_server(sys.argv[1:])
+    if returncode is not None:
+        sys.exit(returncode)
+
+    from aie.compiler.aiecc.main import main
+
     main()
@@ -0,0 +1,184 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+"""
+Content-addressed on-disk cache for aiecc build artifacts.
+
+Entries are stored as plain files named by the SHA-256 of everything that went
+into producing them (lowered IR, linker script, linked-in objects, toolchain and
+flags).  The cache is safe to share between concurrent aiecc processes: entries
+are written to a temporary file and atomically renamed into place.  Eviction is
+least-recently-used, where a cache hit refreshes the entry's modification time.
+
+aiecc only caches core ELFs when asked to, with --cache, --cache-dir or
+$AIECC_CACHE_DIR; `aiecc --help` lists the options.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+# Bump this whenever the per-core pipeline changes in a way that is not
+# captured by the inputs hashed into a key.
+CACHE_FORMAT_VERSION = "1"
+
+DEFAULT_MAX_SIZE_MB = 2048
+
+
+def default_cache_dir():
+    if cache_dir := os.getenv("AIECC_CACHE_DIR"):
+        return cache_dir
+    xdg_cache = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(xdg_cache, "aiecc")
+
+
+def hash_file(path, h=None):
+    if h is None:
+        h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h
+
+
+def tool_fingerprint(*tools):
+    """Identify a toolchain by the resolved path, size and mtime of its binaries.
+
+    This avoids spawning `--version` subprocesses while still invalidating
+    entries whenever a tool is rebuilt or reinstalled.
+    """
+    parts = []
+    for tool in tools:
+        if tool is None:
+            continue
+        resolved = shutil.which(tool) or tool
+        try:
+            st = os.stat(resolved)
+            parts.append(f"{os.path.realpath(resolved)}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{tool}:missing")
+    return ";".join(parts)
+
+
+# Object files pulled into a link by a linker script (INPUT(...)) or by a
+# Chess bcf (_include _file ...).
+_LINKED_INPUTS_RE = re.compile(r"^(?:INPUT\((.*)\)|_include _file (.*))$", re.MULTILINE)
+
+
+def linked_inputs(script_text):
+    return [a or b for a, b in _LINKED_INPUTS_RE.findall(script_text)]
+
+
+class ArtifactCache:
+    def __init__(self, cache_dir, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        """Hash an ordered list of str/bytes parts into a cache key.
+
+        Each part is length-prefixed so that concatenations of different parts
+        can never collide.
+        """
+        h = hashlib.sha256(CACHE_FORMAT_VERSION.encode())
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode()
+            h.update(len(part).to_bytes(8, "little"))
+            h.update(part)
+        return h.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def lookup(self, key, dest):
+        """Copy the entry for `key` to `dest`.  Returns True on a hit."""
+        entry = self._entry(key)
+        try:
+            shutil.copyfile(entry, dest)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        try:
+            # Refresh the entry for LRU eviction.
+            os.utime(entry)
+        except OSError:
+            pass
+        self.hits += 1
+        return True
+
+    def store(self, key, src):
+        entry = self._entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(entry), prefix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, open(src, "rb") as g:
+                shutil.copyfileobj(g, f)
+            os.replace(tmp, entry)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.stores += 1
+
+    def entries(self):
+        for sub in os.scandir(self.cache_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.startswith(".tmp"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    # Evicted concurrently by another process.
+                    continue
+                yield entry.path, st.st_size, st.st_mtime_ns
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits in max_size."""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def __str__(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.stores} stores, {self.evictions} evictions ({self.cache_dir})"
+        )
@@ -6,8 +6,10 @@
 # (c) Copyright 2021 Xilinx Inc.
 
 import argparse
+import os
 import sys
 
+from aie.compiler.aiecc.cache import DEFAULT_MAX_SIZE_MB, default_cache_dir
 from aie.compiler.aiecc.configure import *
 
 
@@ -185,6 +187,19 @@ def parse_args(args=None):
         action="store",
         help="Compile with max n-threads in the machine (default is 4).  An argument of zero corresponds to the maximum number of threads on the machine.",
     )
+    parser.add_argument(
+        "--batch",
+        dest="batch",
+        default=False,
+        action="store_true",
+        help="Compile every positional argument as a separate design, sharing workers and the build cache between them. Options must precede the files; outputs go to each design's <file>.prj directory.",
+    )
+    parser.add_argument(
+        "--batch-manifest",
+        dest="batch_manifest",
+        default="aiecc_batch_manifest.json",
+        help="Where --batch writes the per-design status and timings (default is aiecc_batch_manifest.json)",
+    )
     parser.add_argument(
         "--profile",
         dest="profiling",
@@ -192,6 +207,94 @@ def parse_args(args=None):
         action="store_true",
         help="Profile commands to find the most expensive executions.",
     )
+    parser.add_argument(
+        "--profile-trace",
+        dest="profile_trace",
+        default=None,
+        help="Where --profile writes its Chrome trace JSON (default is aiecc_trace.json in the tmpdir)",
+    )
+    parser.add_argument(
+        "--cache",
+        dest="cache",
+        default=None,
+        action="store_true",
+        help="Reuse core ELFs from a persistent build cache shared by all aiecc runs (off unless --cache, --cache-dir or $AIECC_CACHE_DIR is given)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        default=None,
+        action="store_false",
+        help="Disable the persistent per-core build cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        default=None,
+        help="Directory of the persistent per-core build cache; enables it (default is $AIECC_CACHE_DIR or ~/.cache/aiecc)",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        dest="cache_max_size",
+        default=DEFAULT_MAX_SIZE_MB,
+        type=_positive_int,
+        help=f"Maximum size of the build cache in MB before least-recently-used entries are evicted (default is {DEFAULT_MAX_SIZE_MB})",
+    )
+    parser.add_argument(
+        "--in-process",
+        dest="in_process",
+        default=False,
+        action="store_true",
+        help="Run per-core MLIR lowering through the Python bindings in a worker pool instead of spawning aie-opt/aie-translate for every core",
+    )
+    parser.add_argument(
+        "--no-in-process",
+        dest="in_process",
+        default=False,
+        action="store_false",
+        help="Run per-core MLIR lowering with aie-opt/aie-translate subprocesses",
+    )
+    parser.add_argument(
+        "--dedup-cores",
+        dest="dedup_cores",
+        default=False,
+        action="store_true",
+        help="With --no-unified and peano, compile cores whose lowered LLVM IR is identical up to tile coordinates and buffer names only once, and link the shared object per tile",
+    )
+    parser.add_argument(
+        "--no-dedup-cores",
+        dest="dedup_cores",
+        default=False,
+        action="store_false",
+        help="Compile every core separately",
+    )
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        default=False,
+        action="store_true",
+        help="Reuse the xclbin/pdi and other configuration outputs of the previous build in the tmpdir when only the runtime sequences changed, regenerating just the NPU instructions",
+    )
+    parser.add_argument(
+        "--serve",
+        dest="serve",
+        default=False,
+        action="store_true",
+        help="Run a compile server that later aiecc invocations hand their compiles to, avoiding the startup cost of each. At most -j compiles run at once.",
+    )
+    parser.add_argument(
+        "--server-socket",
+        dest="server_socket",
+        default=None,
+        help="Unix socket of the compile server (default is $AIECC_SERVER_SOCKET, $XDG_RUNTIME_DIR/aiecc.sock or /tmp/aiecc-<uid>/aiecc.sock). The socket and its directory must be owned by and private to the current user.",
+    )
+    parser.add_argument(
+        "--no-server",
+        dest="use_server",
+        default=True,
+        action="store_false",
+        help="Compile in this process even if a compile server is running",
+    )
     parser.add_argument(
         "--unified",
         dest="unified",
@@ -232,7 +335,7 @@ def parse_args(args=None):
         "--npu-insts-name",
         dest="insts_name",
         default="npu_insts.txt",
-        help="Output instructions filename for NPU target",
+        help="Output instructions filename for NPU target. Names ending in .bin get a binary little-endian file instead of one hex word per line",
     )
     parser.add_argument(
         "--aie-generate-cdo",
@@ -320,6 +423,15 @@ def parse_args(args=None):
     )
 
     opts = parser.parse_args(args)
+    # The build cache can grow to --cache-max-size in the user's home
+    # directory, so it is only used when asked for.  opts.cache stays None
+    # unless the cache was enabled or disabled explicitly.
+    if opts.cache is None and (
+        opts.cache_dir is not None or os.getenv("AIECC_CACHE_DIR")
+    ):
+        opts.cache = True
+    if opts.cache_dir is None:
+        opts.cache_dir = default_cache_dir()
     return opts
 
 
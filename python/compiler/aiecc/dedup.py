@@ -0,0 +1,77 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+"""
+Detection of cores that run identical programs.
+
+In data-parallel designs many cores execute the same code and differ only in
+the addresses of their buffers, which live in each tile's linker script.  The
+per-core LLVM IR then differs only in the name of the core function and of the
+external buffer symbols.  Renaming those to canonical names makes the IR of
+such cores byte-identical, so it can be compiled to an object file once; each
+tile's linker script then binds the canonical names back to its own symbols.
+"""
+
+import re
+
+CANONICAL_CORE = "__aiecc_core"
+CANONICAL_SYMBOL = "__aiecc_sym{}"
+
+_SYMBOL_RE = re.compile(r"@([-\w.$]+)")
+_EXTERNAL_GLOBAL_RE = re.compile(r"^@([-\w.$]+) = external\b.*\bglobal\b")
+
+
+def canonicalize_core_llvmir(llvmir, col, row):
+    """Rename the core function and external globals of a core's LLVM IR.
+
+    External globals are numbered in order of first use in the function
+    bodies, and their declarations are sorted by that numbering, so the
+    result doesn't depend on buffer names or declaration order.  Returns the
+    canonical IR and a list of (canonical name, original name) pairs.
+    """
+    lines = llvmir.splitlines()
+    declarations = {}
+    for i, line in enumerate(lines):
+        m = _EXTERNAL_GLOBAL_RE.match(line)
+        if m:
+            declarations[m.group(1)] = i
+
+    decl_lines = set(declarations.values())
+    order = []
+    for i, line in enumerate(lines):
+        if i in decl_lines:
+            continue
+        for name in _SYMBOL_RE.findall(line):
+            if name in declarations and name not in order:
+                order.append(name)
+    order += [name for name in declarations if name not in order]
+
+    renames = {f"core_{col}_{row}": CANONICAL_CORE}
+    for i, name in enumerate(order):
+        renames[name] = CANONICAL_SYMBOL.format(i)
+
+    def rename(m):
+        return "@" + renames.get(m.group(1), m.group(1))
+
+    lines = [_SYMBOL_RE.sub(rename, line) for line in lines]
+    # Put the declarations in canonical order in the slots they occupied.
+    renamed = {name: lines[i] for name, i in declarations.items()}
+    for slot, name in zip(sorted(decl_lines), order):
+        lines[slot] = renamed[name]
+
+    aliases = [(renames[name], name) for name in order]
+    return "\n".join(lines) + "\n", aliases
+
+
+def alias_ldscript(script, col, row, aliases):
+    """Bind a canonical core object's symbols to those of tile (col, row)."""
+    core = f"core_{col}_{row}"
+    script = script.replace(
+        f"PROVIDE(main = {core});", f"PROVIDE(main = {CANONICAL_CORE});"
+    )
+    lines = [f"{core} = {CANONICAL_CORE};"]
+    lines += [f"{canonical} = {name};" for canonical, name in aliases]
+    return script + "\n".join(lines) + "\n"
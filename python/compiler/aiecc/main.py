@@ -9,8 +9,14 @@ aiecc - AIE compiler driver for MLIR tools
 """
 
 import asyncio
+import concurrent.futures
+import contextlib
+import copy
+import functools
 import glob
+import hashlib
 import json
+import multiprocessing
 import os
 import random
 import re
@@ -20,19 +26,40 @@ import subprocess
 import sys
 import tempfile
 from textwrap import dedent
+import threading
 import time
 import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional
 
 from aie.extras.runtime.passes import Pipeline
 from aie.extras.util import find_ops
 import aiofiles
+import numpy as np
 import rich.progress as progress
 
+from aie.compiler.aiecc.cache import (
+    ArtifactCache,
+    hash_file,
+    linked_inputs,
+    tool_fingerprint,
+)
 import aie.compiler.aiecc.cl_arguments
 import aie.compiler.aiecc.configure
+from aie.compiler.aiecc.dedup import alias_ldscript, canonicalize_core_llvmir
+from aie.compiler.aiecc.profiler import (
+    TraceRecorder,
+    capture_stderr,
+    parse_timing_report,
+    split_timing_report,
+    stderr_gate,
+)
+from aie.compiler.aiecc.scheduler import TaskGraph
 from aie.dialects import aie as aiedialect
 from aie.ir import Context, Location, Module
 from aie.passmanager import PassManager
+from aie.util import worker_process_context
+from aie.utils.npu_insts import insts_from_hex, read_insts, write_insts
 
 INPUT_WITH_ADDRESSES_PIPELINE = lambda scheme, dynamic_objFifos, ctrl_pkt_overlay: (
     Pipeline()
@@ -104,6 +131,10 @@ NPU_LOWERING_PIPELINE = Pipeline().Nested(
     .add_pass("aie-dma-to-npu"),
 )
 
+# Records the device fingerprint and outputs of the last build for
+# --incremental.
+INCREMENTAL_STAMP = "aiecc_incremental.json"
+
 
 async def read_file_async(file_path: str) -> str:
     async with aiofiles.open(file_path, mode="r") as f:
@@ -274,6 +305,74 @@ def generate_cores_list(mlir_module_str):
         ]
 
 
+# Options that don't affect the device configuration (core ELFs, routing, CDO,
+# xclbin), so changing only them keeps --incremental builds incremental.
+_INCREMENTAL_IGNORED_OPTS = {
+    "filename",
+    "tmpdir",
+    "verbose",
+    "progress",
+    "profiling",
+    "profile_trace",
+    "nthreads",
+    "execute",
+    "npu",
+    "insts_name",
+    "incremental",
+    "batch",
+    "batch_manifest",
+    "cache",
+    "cache_dir",
+    "cache_max_size",
+    "in_process",
+    "serve",
+    "server_socket",
+    "use_server",
+}
+
+
+def device_fingerprint(mlir_module_str, opts):
+    """Hash everything that determines the device configuration of a design.
+
+    Runtime sequences are left out, since they only feed the NPU instructions,
+    and the objects that cores link with are hashed by their contents.
+    """
+    h = hashlib.sha256()
+    with Context(), Location.unknown():
+        module = Module.parse(mlir_module_str)
+        for seq in find_ops(
+            module.operation,
+            lambda o: o.operation.name == "aiex.runtime_sequence",
+        ):
+            seq.operation.erase()
+        h.update(str(module).encode())
+        for core in find_ops(
+            module.operation,
+            lambda o: isinstance(o.operation.opview, aiedialect.CoreOp),
+        ):
+            for attr in [core.link_with, core.elf_file]:
+                if attr is None:
+                    continue
+                h.update(attr.value.encode())
+                try:
+                    hash_file(attr.value, h)
+                except OSError:
+                    h.update(b"<missing>")
+
+    config = {k: v for k, v in vars(opts).items() if k not in _INCREMENTAL_IGNORED_OPTS}
+    h.update(json.dumps(config, sort_keys=True, default=str).encode())
+    h.update(aie.compiler.aiecc.configure.git_commit.encode())
+    h.update(
+        tool_fingerprint(
+            "aie-opt",
+            "aie-translate",
+            os.path.join(opts.peano_install_dir, "bin", "clang"),
+            os.path.join(opts.peano_install_dir, "bin", "llc"),
+        ).encode()
+    )
+    return h.hexdigest()
+
+
 def emit_design_bif(root_path, has_cores=True, enable_cores=True, unified=False):
     if unified:
         cdo_unified_file = f"file={root_path}/aie_cdo.bin" if unified else ""
@@ -315,14 +414,49 @@ def do_run(command, verbose=False):
     return ret
 
 
-def run_passes(pass_pipeline, mlir_module_str, outputfile=None, verbose=False):
+def run_pipeline(pass_pipeline, operation, trace=None, stage=None):
+    """Run `pass_pipeline` on `operation` in the current context.
+
+    With a TraceRecorder, the run is recorded as a slice named `stage` and,
+    when the bindings expose pass timing, the per-pass timing report is
+    attached to it.
+    """
+    pm = PassManager.parse(pass_pipeline)
+    if trace is None:
+        pm.run(operation)
+        return
+    with trace.slice(stage or pass_pipeline, "in-process"):
+        if not hasattr(pm, "enable_timing"):
+            pm.run(operation)
+            return
+        try:
+            with capture_stderr() as captured:
+                pm.enable_timing()
+                try:
+                    pm.run(operation)
+                finally:
+                    # The report is printed when the pass manager is destroyed.
+                    del pm
+        finally:
+            diagnostics, report = split_timing_report(captured[0])
+            sys.stderr.write(diagnostics)
+            trace.add_pass_timings(stage, parse_timing_report(report))
+
+
+def run_passes(
+    pass_pipeline,
+    mlir_module_str,
+    outputfile=None,
+    verbose=False,
+    trace=None,
+    stage=None,
+):
     if verbose:
         print("Running:", pass_pipeline)
     with Context(), Location.unknown():
         module = Module.parse(mlir_module_str)
-        pm = PassManager.parse(pass_pipeline)
         try:
-            pm.run(module.operation)
+            run_pipeline(pass_pipeline, module.operation, trace, stage)
         except Exception as e:
             print("Error running pass pipeline: ", pass_pipeline, e)
             raise e
@@ -333,13 +467,19 @@ def run_passes(pass_pipeline, mlir_module_str, outputfile=None, verbose=False):
     return mlir_module_str
 
 
-def run_passes_module(pass_pipeline, mlir_module, outputfile=None, verbose=False):
+def run_passes_module(
+    pass_pipeline,
+    mlir_module,
+    outputfile=None,
+    verbose=False,
+    trace=None,
+    stage=None,
+):
     if verbose:
         print("Running:", pass_pipeline)
     with mlir_module.context, Location.unknown():
-        pm = PassManager.parse(pass_pipeline)
         try:
-            pm.run(mlir_module.operation)
+            run_pipeline(pass_pipeline, mlir_module.operation, trace, stage)
         except Exception as e:
             print("Error running pass pipeline: ", pass_pipeline, e)
             raise e
@@ -395,22 +535,189 @@ def downgrade_ir_for_peano(llvmir):
     return llvmir
 
 
+# State of an in-process core lowering worker (process or thread): the most
+# recently used design stays parsed and is cloned for every core it lowers, so
+# one pool can serve all designs of a batch.
+_worker_state = threading.local()
+
+
+def _worker_design(file_with_addresses):
+    st = os.stat(file_with_addresses)
+    key = (file_with_addresses, st.st_mtime_ns, st.st_size)
+    design = getattr(_worker_state, "design", None)
+    if design is None or design[0] != key:
+        context = Context()
+        with context, Location.unknown(), open(file_with_addresses, "r") as f:
+            module = Module.parse(f.read())
+        design = _worker_state.design = (key, context, module)
+    return design[1], design[2]
+
+
+# The aiecc.py entry point, which guards its own `__main__` code.
+def make_core_worker_pool(nworkers):
+    # By the time cores are lowered this process has MLIR contexts and
+    # threads, so workers must not be forked from it.  Forkserver workers fork
+    # from a clean process that only imports this module.  When they would
+    # re-run an unguarded design script, the cores are lowered on threads.
+    context = worker_process_context(preload=[__name__])
+    if context is not None:
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=nworkers, mp_context=context
+        )
+    return concurrent.futures.ThreadPoolExecutor(max_workers=nworkers)
+
+
+def lower_core_in_process(file_with_addresses, col, row, file_core_llvmir):
+    # Equivalent to the per-core aie-opt and aie-translate --mlir-to-llvmir
+    # invocations, without re-parsing the design for every core.
+    context, module = _worker_design(file_with_addresses)
+    with context, Location.unknown():
+        core_module = module.operation.clone()
+        pm = PassManager.parse(AIE_LOWER_TO_LLVM(col, row).materialize(module=True))
+        pm.run(core_module)
+        llvmir = aiedialect.translate_mlir_to_llvmir(core_module)
+    with open(file_core_llvmir, "w") as f:
+        f.write(llvmir)
+
+
+class FlowError(Exception):
+    """A step of the flow failed.  `returncode` is aiecc's exit status."""
+
+    def __init__(self, message, returncode=1):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+def flow_nworkers(opts):
+    nworkers = int(opts.nthreads)
+    if nworkers == 0:
+        nworkers = os.cpu_count()
+    return nworkers
+
+
+def make_progress_bar():
+    return progress.Progress(
+        *progress.Progress.get_default_columns(),
+        progress.TimeElapsedColumn(),
+        progress.MofNCompleteColumn(),
+        progress.TextColumn("{task.fields[command]}"),
+        redirect_stdout=False,
+        redirect_stderr=False,
+    )
+
+
+def open_artifact_cache(opts):
+    """The build cache selected by `opts`, or None if it is off or unusable."""
+    if not opts.cache:
+        return None
+    try:
+        return ArtifactCache(opts.cache_dir, opts.cache_max_size)
+    except OSError as e:
+        print(f"Warning: build cache disabled: {e}", file=sys.stderr)
+        return None
+
+
 class FlowRunner:
-    def __init__(self, mlir_module_str, opts, tmpdirname):
+    # A batch of designs shares one semaphore, build cache, in-process worker
+    # pool and table of in-flight core builds between its runners; a single
+    # design gets its own.
+    def __init__(
+        self,
+        mlir_module_str,
+        opts,
+        tmpdirname,
+        limit=None,
+        cache=None,
+        inflight=None,
+        elf_dir=".",
+        name=None,
+        core_pool=None,
+    ):
         self.mlir_module_str = mlir_module_str
         self.opts = opts
         self.tmpdirname = tmpdirname
+        self.limit = limit
+        self.inflight = {} if inflight is None else inflight
+        self.elf_dir = elf_dir
+        self.label = f" ({name})" if name else ""
         self.runtimes = dict()
+        self.trace = TraceRecorder() if opts.profiling else None
         self.progress_bar = None
         self.maxtasks = 5
         self.stopall = False
-        self.peano_clang_path = os.path.join(opts.peano_install_dir, "bin", "clang")
-        self.peano_opt_path = os.path.join(opts.peano_install_dir, "bin", "opt")
-        self.peano_llc_path = os.path.join(opts.peano_install_dir, "bin", "llc")
+        self.peano_clang_path = os.path.join(
+            self.opts.peano_install_dir, "bin", "clang"
+        )
+        self.peano_opt_path = os.path.join(self.opts.peano_install_dir, "bin", "opt")
+        self.peano_llc_path = os.path.join(self.opts.peano_install_dir, "bin", "llc")
+        self.cache = cache
+        self.unified_ir_hash = None
+        self.core_pool = core_pool
+        self.owns_core_pool = False
+        # Canonical IR hash -> future of its object file, and the cores
+        # sharing it, for --dedup-cores.
+        self.dedup_objects = {}
+        self.dedup_cores = {}
+        self.with_addresses_ctx = None
+        self.with_addresses_module = None
+        if self.cache is None and opts.execute:
+            self.cache = open_artifact_cache(opts)
 
     def prepend_tmp(self, x):
         return os.path.join(self.tmpdirname, x)
 
+    def trace_slice(self, name, cat, **args):
+        if self.trace is None:
+            return contextlib.nullcontext()
+        return self.trace.slice(name, cat, **args)
+
+    def spawning(self):
+        # Only profiling captures fd 2 (see capture_stderr).  This blocks the
+        # event loop while a pass pipeline is being timed, which is what keeps
+        # new subprocesses from inheriting the capture.
+        if self.trace is None:
+            return contextlib.nullcontext()
+        return stderr_gate.spawning()
+
+    def core_cache_key(self, aie_target, file_core_ir, file_core_script):
+        # The key covers everything that determines the contents of a core's
+        # elf: its lowered IR (the whole design's LLVM IR when compiling
+        # unified), its linker script or bcf, any objects pulled in by that
+        # script, the toolchain binaries and the flags selecting the flow.
+        if self.cache is None or not (self.opts.compile and self.opts.link):
+            return None
+
+        if file_core_ir is None:
+            if self.unified_ir_hash is None:
+                self.unified_ir_hash = hash_file(
+                    self.prepend_tmp("input.ll")
+                ).hexdigest()
+            ir_hash = self.unified_ir_hash
+        else:
+            ir_hash = hash_file(file_core_ir).hexdigest()
+
+        with open(file_core_script, "r") as f:
+            script = f.read()
+        linked_hashes = []
+        for obj in linked_inputs(script):
+            try:
+                linked_hashes.append(hash_file(obj).hexdigest())
+            except OSError:
+                # Can't fingerprint an input of the link; don't cache this core.
+                return None
+
+        toolchain = tool_fingerprint(
+            self.peano_clang_path,
+            self.peano_opt_path,
+            self.peano_llc_path,
+            "xchesscc_wrapper" if self.opts.xchesscc or self.opts.xbridge else None,
+        )
+        flags = (
+            f"{aie_target} xchesscc={self.opts.xchesscc} xbridge={self.opts.xbridge} "
+            f"unified={self.opts.unified} {aie.compiler.aiecc.configure.git_commit}"
+        )
+        return ArtifactCache.make_key(ir_hash, script, *linked_hashes, toolchain, flags)
+
     async def do_call(self, task, command, force=False):
         if self.stopall:
             return
@@ -422,9 +729,30 @@ class FlowRunner:
         if self.opts.verbose:
             print(commandstr)
         if self.opts.execute or force:
-            proc = await asyncio.create_subprocess_exec(*command)
-            await proc.wait()
+            # When profiling, have aie-opt report its per-pass timings.
+            timed = self.trace is not None and command[0] == "aie-opt"
+            if timed:
+                command = [
+                    command[0],
+                    "--mlir-timing",
+                    "--mlir-timing-display=list",
+                    *command[1:],
+                ]
+            with self.trace_slice(
+                os.path.basename(command[0]), "subprocess", command=commandstr
+            ):
+                with self.spawning():
+                    proc = await asyncio.create_subprocess_exec(
+                        *command, stderr=asyncio.subprocess.PIPE if timed else None
+                    )
+                _, stderr = await proc.communicate()
             ret = proc.returncode
+            if timed:
+                diagnostics, report = split_timing_report(
+                    stderr.decode(errors="replace")
+                )
+                sys.stderr.write(diagnostics)
+                self.trace.add_pass_timings(commandstr, parse_timing_report(report))
         else:
             ret = 0
         end = time.time()
@@ -440,7 +768,7 @@ class FlowRunner:
             if task:
                 self.progress_bar._tasks[task].description = "[red] Error"
             print("Error encountered while running: " + commandstr, file=sys.stderr)
-            sys.exit(ret)
+            raise FlowError("Error encountered while running: " + commandstr, ret)
 
     # In order to run xchesscc on modern ll code, we need a bunch of hacks.
     async def chesshack(self, task, llvmir, aie_target):
@@ -472,7 +800,7 @@ class FlowRunner:
                 # The path below is cheating a bit since it refers directly to the AIE1
                 # version of llvm-link, rather than calling the architecture-specific
                 # tool version.
-                opts.aietools_path
+                self.opts.aietools_path
                 + "/tps/lnx64/"
                 + target
                 + "/bin/LNa64bin/chess-llvm-link",
@@ -498,6 +826,70 @@ class FlowRunner:
 
         return llvmir_peanohack
 
+    async def lower_core_in_process(self, core, file_with_addresses, file_core_llvmir):
+        corecol, corerow, _ = core
+        commandstr = f"in-process lowering of core ({corecol}, {corerow})"
+        if self.opts.verbose:
+            print(commandstr)
+        if not self.opts.execute:
+            return
+        start = time.time()
+        try:
+            with self.trace_slice(f"lower core ({corecol}, {corerow})", "in-process"):
+                # Submitting may start a pool worker.
+                with self.spawning():
+                    lowered = asyncio.get_running_loop().run_in_executor(
+                        self.core_pool,
+                        lower_core_in_process,
+                        file_with_addresses,
+                        corecol,
+                        corerow,
+                        file_core_llvmir,
+                    )
+                await lowered
+        except Exception as e:
+            print(f"Error encountered during {commandstr}: {e}", file=sys.stderr)
+            raise FlowError(f"Error encountered during {commandstr}: {e}")
+        self.runtimes[commandstr] = time.time() - start
+
+    def lower_unified_in_process(self, file_llvmir):
+        commandstr = "in-process lowering of all cores"
+        if self.opts.verbose:
+            print(commandstr)
+        if not self.opts.execute:
+            return
+        start = time.time()
+        with self.with_addresses_ctx, Location.unknown():
+            unified_module = self.with_addresses_module.operation.clone()
+            run_pipeline(
+                AIE_LOWER_TO_LLVM().materialize(module=True),
+                unified_module,
+                self.trace,
+                "lower all cores",
+            )
+            with self.trace_slice("translate_mlir_to_llvmir", "in-process"):
+                llvmir = aiedialect.translate_mlir_to_llvmir(unified_module)
+        with open(file_llvmir, "w") as f:
+            f.write(llvmir)
+        self.runtimes[commandstr] = time.time() - start
+
+    def generate_core_script_in_process(self, core, file_core_script):
+        corecol, corerow, _ = core
+        if self.opts.xbridge:
+            kind, generate = "bcf", aiedialect.generate_bcf
+        else:
+            kind, generate = "ldscript", aiedialect.generate_ldscript
+        if self.opts.verbose:
+            print(f"in-process {kind} generation for core ({corecol}, {corerow})")
+        if not self.opts.execute:
+            return
+        with self.with_addresses_ctx, Location.unknown(), self.trace_slice(
+            f"generate {kind} ({corecol}, {corerow})", "in-process"
+        ):
+            script = generate(self.with_addresses_module.operation, corecol, corerow)
+        with open(file_core_script, "w") as f:
+            f.write(script)
+
     async def process_core(
         self,
         core,
@@ -519,7 +911,7 @@ class FlowRunner:
             # If there are orphaned input sections, then they'd likely end up outside of the normal program memory.
             clang_link_args = ["-Wl,--gc-sections", "-Wl,--orphan-handling=error"]
 
-            if opts.progress:
+            if self.opts.progress:
                 task = self.progress_bar.add_task(
                     "[yellow] Core (%d, %d)" % core[0:2],
                     total=self.maxtasks,
@@ -530,26 +922,59 @@ class FlowRunner:
 
             # fmt: off
             corecol, corerow, elf_file = core
-            if not opts.unified:
+            file_core_ir = None
+            if not self.opts.unified and self.opts.in_process:
+                file_core_llvmir = corefile(self.tmpdirname, core, "ll")
+                await self.lower_core_in_process(core, file_with_addresses, file_core_llvmir)
+                file_core_ir = file_core_llvmir
+            elif not self.opts.unified:
                 file_core = corefile(self.tmpdirname, core, "mlir")
                 await self.do_call(task, ["aie-opt", "--aie-localize-locks", "--aie-normalize-address-spaces", "--aie-standard-lowering=tilecol=%d tilerow=%d" % core[0:2], "--aiex-standard-lowering", file_with_addresses, "-o", file_core])
-                file_opt_core = corefile(self.tmpdirname, core, "opt.mlir")
-                await self.do_call(task, ["aie-opt", f"--pass-pipeline={LOWER_TO_LLVM_PIPELINE}", file_core, "-o", file_opt_core])
+                file_core_ir = file_core
             if self.opts.xbridge:
                 file_core_bcf = corefile(self.tmpdirname, core, "bcf")
-                await self.do_call(task, ["aie-translate", file_with_addresses, "--aie-generate-bcf", "--tilecol=%d" % corecol, "--tilerow=%d" % corerow, "-o", file_core_bcf])
+                if self.opts.in_process:
+                    self.generate_core_script_in_process(core, file_core_bcf)
+                else:
+                    await self.do_call(task, ["aie-translate", file_with_addresses, "--aie-generate-bcf", "--tilecol=%d" % corecol, "--tilerow=%d" % corerow, "-o", file_core_bcf])
+                file_core_script = file_core_bcf
             else:
                 file_core_ldscript = corefile(self.tmpdirname, core, "ld.script")
-                await self.do_call(task, ["aie-translate", file_with_addresses, "--aie-generate-ldscript", "--tilecol=%d" % corecol, "--tilerow=%d" % corerow, "-o", file_core_ldscript])
+                if self.opts.in_process:
+                    self.generate_core_script_in_process(core, file_core_ldscript)
+                else:
+                    await self.do_call(task, ["aie-translate", file_with_addresses, "--aie-generate-ldscript", "--tilecol=%d" % corecol, "--tilerow=%d" % corerow, "-o", file_core_ldscript])
+                file_core_script = file_core_ldscript
+
+            file_core_elf = elf_file if elf_file else corefile(self.elf_dir, core, "elf")
+
+            # If nothing feeding into this core's elf has changed, restore it
+            # from the build cache and skip the rest of the per-core pipeline.
+            cache_key = self.core_cache_key(aie_target, file_core_ir, file_core_script)
+            if cache_key in self.inflight:
+                # Another design of the batch is building an identical elf;
+                # wait for it to finish and take its result from the cache.
+                await asyncio.wait([self.inflight[cache_key]])
+            if cache_key and self.cache.lookup(cache_key, file_core_elf):
+                if self.opts.verbose:
+                    print(f"Build cache hit for core ({corecol}, {corerow}): {file_core_elf}")
+                self.progress_bar.update(self.completed_task, advance=1)
+                if task:
+                    self.progress_bar.update(task, advance=0, visible=False)
+                return
+            if cache_key:
+                self.inflight[cache_key] = asyncio.current_task()
+
             if not self.opts.unified:
-                file_core_llvmir = corefile(self.tmpdirname, core, "ll")
-                await self.do_call(task, ["aie-translate", "--mlir-to-llvmir", file_opt_core, "-o", file_core_llvmir])
+                if not self.opts.in_process:
+                    file_opt_core = corefile(self.tmpdirname, core, "opt.mlir")
+                    await self.do_call(task, ["aie-opt", f"--pass-pipeline={LOWER_TO_LLVM_PIPELINE}", file_core, "-o", file_opt_core])
+                    file_core_llvmir = corefile(self.tmpdirname, core, "ll")
+                    await self.do_call(task, ["aie-translate", "--mlir-to-llvmir", file_opt_core, "-o", file_core_llvmir])
                 file_core_obj = corefile(self.tmpdirname, core, "o")
 
-            file_core_elf = elf_file if elf_file else corefile(".", core, "elf")
-
-            if opts.compile and opts.xchesscc:
-                if not opts.unified:
+            if self.opts.compile and self.opts.xchesscc:
+                if not self.opts.unified:
                     file_core_llvmir_chesslinked = await self.chesshack(task, file_core_llvmir, aie_target)
                     if self.opts.link and self.opts.xbridge:
                         link_with_obj = await extract_input_files(file_core_bcf)
@@ -559,14 +984,18 @@ class FlowRunner:
                         await self.do_call(task, [self.peano_clang_path, "-O2", "--target=" + aie_peano_target, file_core_obj, *clang_link_args, "-Wl,-T," + file_core_ldscript, "-o", file_core_elf])
                 else:
                     file_core_obj = self.unified_file_core_obj
-                    if opts.link and opts.xbridge:
+                    if self.opts.link and self.opts.xbridge:
                         link_with_obj = await extract_input_files(file_core_bcf)
                         await self.do_call(task, ["xchesscc_wrapper", aie_target.lower(), "+w", self.prepend_tmp("work"), "-d", "-f", file_core_obj, link_with_obj, "+l", file_core_bcf, "-o", file_core_elf])
-                    elif opts.link:
+                    elif self.opts.link:
                         await self.do_call(task, [self.peano_clang_path, "-O2", "--target=" + aie_peano_target, file_core_obj, *clang_link_args, "-Wl,-T," + file_core_ldscript, "-o", file_core_elf])
 
-            elif opts.compile:
-                if not opts.unified:
+            elif self.opts.compile:
+                # Shared objects are bound per tile through the linker script, which
+                # xbridge (bcf) linking does not use.
+                if not self.opts.unified and self.opts.dedup_cores and not self.opts.xbridge and self.opts.execute:
+                    file_core_obj, file_core_ldscript = await self.compile_deduplicated_core(task, core, file_core_llvmir, file_core_ldscript, aie_target)
+                elif not self.opts.unified:
                     file_core_llvmir_peanohacked = await self.peanohack(file_core_llvmir)
                     file_core_llvmir_stripped = corefile(self.tmpdirname, core, "stripped.ll")
                     await self.do_call(task, [self.peano_opt_path, "--passes=default<O2>,strip", "-S", file_core_llvmir_peanohacked, "-o", file_core_llvmir_stripped])
@@ -574,49 +1003,163 @@ class FlowRunner:
                 else:
                     file_core_obj = self.unified_file_core_obj
 
-                if opts.link and opts.xbridge:
+                if self.opts.link and self.opts.xbridge:
                     link_with_obj = await extract_input_files(file_core_bcf)
                     await self.do_call(task, ["xchesscc_wrapper", aie_target.lower(), "+w", self.prepend_tmp("work"), "-d", "-f", file_core_obj, link_with_obj, "+l", file_core_bcf, "-o", file_core_elf])
-                elif opts.link:
+                elif self.opts.link:
                     await self.do_call(task, [self.peano_clang_path, "-O2", "--target=" + aie_peano_target, file_core_obj, *clang_link_args, "-Wl,-T," + file_core_ldscript, "-o", file_core_elf])
 
-            self.progress_bar.update(self.progress_bar.task_completed, advance=1)
+            if cache_key and not self.stopall and os.path.exists(file_core_elf):
+                self.cache.store(cache_key, file_core_elf)
+
+            self.progress_bar.update(self.completed_task, advance=1)
             if task:
                 self.progress_bar.update(task, advance=0, visible=False)
             # fmt: on
 
-    async def process_cdo(self, module_str):
+    # Compile the object file of a core whose program is identical to that of
+    # other cores (modulo tile coordinates and buffer symbols) only once, and
+    # return it with a copy of the core's linker script that binds the shared
+    # object's canonical symbols to this tile's.
+    async def compile_deduplicated_core(
+        self, task, core, file_core_llvmir, file_core_ldscript, aie_target
+    ):
+        corecol, corerow, _ = core
+        llvmir = await read_file_async(file_core_llvmir)
+        canonical, aliases = canonicalize_core_llvmir(llvmir, corecol, corerow)
+        key = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+        if key not in self.dedup_objects:
+            self.dedup_objects[key] = asyncio.ensure_future(
+                self.compile_canonical_core(task, key, canonical, aie_target)
+            )
+            self.dedup_cores[key] = []
+        self.dedup_cores[key].append(core[0:2])
+        # Shield the shared compile from the cancellation of any one tile.
+        file_core_obj = await asyncio.shield(self.dedup_objects[key])
+        if self.opts.verbose and len(self.dedup_cores[key]) > 1:
+            print(
+                f"Core ({corecol}, {corerow}) reuses the object of core "
+                f"{self.dedup_cores[key][0]}: {file_core_obj}"
+            )
+
+        script = await read_file_async(file_core_ldscript)
+        file_core_dedup_ldscript = corefile(self.tmpdirname, core, "dedup.ld.script")
+        await write_file_async(
+            alias_ldscript(script, corecol, corerow, aliases),
+            file_core_dedup_ldscript,
+        )
+        return file_core_obj, file_core_dedup_ldscript
+
+    async def compile_canonical_core(self, task, key, canonical, aie_target):
+        file_llvmir = self.prepend_tmp(f"core_dedup_{key}.ll")
+        await write_file_async(canonical, file_llvmir)
+        file_llvmir_peanohacked = await self.peanohack(file_llvmir)
+        file_llvmir_stripped = self.prepend_tmp(f"core_dedup_{key}.stripped.ll")
+        file_obj = self.prepend_tmp(f"core_dedup_{key}.o")
+        # fmt: off
+        await self.do_call(task, [self.peano_opt_path, "--passes=default<O2>,strip", "-S", file_llvmir_peanohacked, "-o", file_llvmir_stripped])
+        await self.do_call(task, [self.peano_llc_path, file_llvmir_stripped, "-O2", "--march=" + aie_target.lower(), "--function-sections", "--filetype=obj", "-o", file_obj])
+        # fmt: on
+        return file_obj
+
+    def process_npu_insts(self, file_with_addresses):
+        # Generate insts.txt for the NPU instruction stream
         with Context(), Location.unknown():
-            input_physical = Module.parse(module_str)
-            aiedialect.generate_cdo(input_physical.operation, self.tmpdirname)
+            with open(file_with_addresses, "r") as f:
+                file_with_addresses_module = Module.parse(f.read())
+            pass_pipeline = NPU_LOWERING_PIPELINE.materialize(module=True)
+            npu_insts_file = (
+                self.prepend_tmp("npu_insts.mlir") if self.opts.verbose else None
+            )
+            npu_insts_module = run_passes_module(
+                pass_pipeline,
+                file_with_addresses_module,
+                npu_insts_file,
+                self.opts.verbose,
+                self.trace,
+                "npu lowering",
+            )
+            with self.trace_slice("translate_npu_to_binary", "in-process"):
+                npu_insts = aiedialect.translate_npu_to_binary(
+                    npu_insts_module.operation
+                )
+            write_insts(self.opts.insts_name, insts_from_hex(npu_insts))
 
-    async def process_txn(self, module_str):
+    # Lower and compile all cores together into input.o, which every core's
+    # link step then consumes.
+    async def process_unified(self, aie_target, file_with_addresses):
+        task = self.main_task
+        # fmt: off
+        file_llvmir = self.prepend_tmp("input.ll")
+        if self.opts.in_process:
+            await asyncio.to_thread(self.lower_unified_in_process, file_llvmir)
+        else:
+            file_opt_with_addresses = self.prepend_tmp("input_opt_with_addresses.mlir")
+            await self.do_call(task, ["aie-opt", f"--pass-pipeline={AIE_LOWER_TO_LLVM()}", file_with_addresses, "-o", file_opt_with_addresses])
+            await self.do_call(task, ["aie-translate", "--mlir-to-llvmir", file_opt_with_addresses, "-o", file_llvmir])
+
+        self.unified_file_core_obj = self.prepend_tmp("input.o")
+        if self.opts.compile and self.opts.xchesscc:
+            file_llvmir_hacked = await self.chesshack(task, file_llvmir, aie_target)
+            await self.do_call(task, ["xchesscc_wrapper", aie_target.lower(), "+w", self.prepend_tmp("work"), "-c", "-d", "+Wclang,-xir", "-f", file_llvmir_hacked, "-o", self.unified_file_core_obj])
+        elif self.opts.compile:
+            file_llvmir_hacked = await self.peanohack(file_llvmir)
+            file_llvmir_opt = self.prepend_tmp("input.opt.ll")
+            await self.do_call(task, [self.peano_opt_path, "--passes=default<O2>", "-inline-threshold=10", "-S", file_llvmir_hacked, "-o", file_llvmir_opt])
+            await self.do_call(task, [self.peano_llc_path, file_llvmir_opt, "-O2", "--march=" + aie_target.lower(), "--function-sections", "--filetype=obj", "-o", self.unified_file_core_obj])
+        # fmt: on
+
+    def collect_elfs(self):
+        # copy the elfs left by proess_core to the tmpdir for process_cdo
+        for elf in glob.glob(os.path.join(self.elf_dir, "*.elf")):
+            try:
+                shutil.copy(elf, self.tmpdirname)
+            except shutil.SameFileError:
+                pass
+        for elf_map in glob.glob(os.path.join(self.elf_dir, "*.elf.map")):
+            try:
+                shutil.copy(elf_map, self.tmpdirname)
+            except shutil.SameFileError:
+                pass
+
+    def process_cdo(self, file_physical):
         with Context(), Location.unknown():
+            with open(file_physical, "r") as f:
+                input_physical = Module.parse(f.read())
+            with self.trace_slice("generate_cdo", "in-process"):
+                aiedialect.generate_cdo(input_physical.operation, self.tmpdirname)
+
+    def process_txn(self, file_physical):
+        with Context(), Location.unknown(), open(file_physical, "r") as f:
             run_passes(
                 "builtin.module(aie.device(convert-aie-to-transaction{elf-dir="
                 + self.tmpdirname
                 + "}))",
-                module_str,
+                f.read(),
                 self.prepend_tmp("txn.mlir"),
                 self.opts.verbose,
+                self.trace,
+                "convert-aie-to-transaction",
             )
 
-    async def process_ctrlpkt(self, module_str):
-        with Context(), Location.unknown():
+    def process_ctrlpkt(self, file_physical):
+        with Context(), Location.unknown(), open(file_physical, "r") as f:
             run_passes(
                 "builtin.module(aie.device(convert-aie-to-control-packets{elf-dir="
                 + self.tmpdirname
                 + "}))",
-                module_str,
+                f.read(),
                 self.prepend_tmp("ctrlpkt.mlir"),
                 self.opts.verbose,
+                self.trace,
+                "convert-aie-to-control-packets",
             )
 
     async def process_pdi_gen(self):
 
         await write_file_async(
             emit_design_bif(self.tmpdirname),
-            self.prepend_tmp(opts.pdi_name + ".bif"),
+            self.prepend_tmp(self.opts.pdi_name + ".bif"),
         )
 
         await self.do_call(
@@ -626,9 +1169,9 @@ class FlowRunner:
                 "-arch",
                 "versal",
                 "-image",
-                self.prepend_tmp(opts.pdi_name + ".bif"),
+                self.prepend_tmp(self.opts.pdi_name + ".bif"),
                 "-o",
-                self.prepend_tmp(opts.pdi_name),
+                self.prepend_tmp(self.opts.pdi_name),
                 "-w",
             ],
         )
@@ -636,7 +1179,7 @@ class FlowRunner:
     # generate an xclbin. The inputs are self.mlir_module_str and the cdo
     # binaries from the process_cdo step.
     async def process_xclbin_gen(self):
-        if opts.progress:
+        if self.opts.progress:
             task = self.progress_bar.add_task(
                 "[yellow] XCLBIN generation ", total=10, command="starting"
             )
@@ -658,7 +1201,9 @@ class FlowRunner:
         processes.append(
             write_file_async(
                 json.dumps(
-                    emit_partition(self.mlir_module_str, opts.pdi_name, opts.kernel_id),
+                    emit_partition(
+                        self.mlir_module_str, self.opts.pdi_name, self.opts.kernel_id
+                    ),
                     indent=2,
                 ),
                 self.prepend_tmp("aie_partition.json"),
@@ -671,9 +1216,9 @@ class FlowRunner:
             write_file_async(
                 json.dumps(
                     emit_design_kernel_json(
-                        opts.kernel_name,
-                        opts.kernel_id,
-                        opts.instance_name,
+                        self.opts.kernel_name,
+                        self.opts.kernel_id,
+                        self.opts.instance_name,
                         buffer_arg_names,
                     ),
                     indent=2,
@@ -686,7 +1231,7 @@ class FlowRunner:
         processes.append(self.process_pdi_gen())
 
         # get partition info from input xclbin, if present
-        if opts.xclbin_input:
+        if self.opts.xclbin_input:
             processes.append(
                 self.do_call(
                     task,
@@ -698,7 +1243,7 @@ class FlowRunner:
                         "--force",
                         "--quiet",
                         "--input",
-                        opts.xclbin_input,
+                        self.opts.xclbin_input,
                     ],
                 )
             )
@@ -707,7 +1252,7 @@ class FlowRunner:
         await asyncio.gather(*processes)
 
         # fmt: off
-        if opts.xclbin_input:
+        if self.opts.xclbin_input:
             # patch the input partition json with the new partition information
             with open(self.prepend_tmp("aie_input_partition.json")) as f:
                 input_partition = json.load(f)
@@ -716,7 +1261,7 @@ class FlowRunner:
             input_partition["aie_partition"]["PDIs"].append(new_partition["aie_partition"]["PDIs"][0])
             with open(self.prepend_tmp("aie_partition.json"), "w") as f:
                 json.dump(input_partition, f, indent=2)
-            flag = ['--input', opts.xclbin_input]
+            flag = ['--input', self.opts.xclbin_input]
         else:
             flag = ["--add-replace-section", "MEM_TOPOLOGY:JSON:" + self.prepend_tmp("mem_topology.json")]
 
@@ -724,7 +1269,7 @@ class FlowRunner:
         await self.do_call(task, ["xclbinutil"] + flag +
                                  ["--add-kernel", self.prepend_tmp("kernels.json"),
                                   "--add-replace-section", "AIE_PARTITION:JSON:" + self.prepend_tmp("aie_partition.json"),
-                                  "--force", "--quiet", "--output", opts.xclbin_name])
+                                  "--force", "--quiet", "--output", self.opts.xclbin_name])
         # fmt: on
 
     async def process_host_cgen(self, aie_target, file_physical):
@@ -732,14 +1277,14 @@ class FlowRunner:
             if self.stopall:
                 return
 
-            if opts.progress:
+            if self.opts.progress:
                 task = self.progress_bar.add_task(
                     "[yellow] Host compilation ", total=10, command="starting"
                 )
             else:
                 task = None
 
-            if opts.airbin:
+            if self.opts.airbin:
                 file_airbin = self.prepend_tmp("air.bin")
                 await self.do_call(
                     task,
@@ -752,7 +1297,7 @@ class FlowRunner:
                     ],
                 )
 
-            if opts.link_against_hsa:
+            if self.opts.link_against_hsa:
                 file_inc_cpp = self.prepend_tmp("aie_data_movement.cpp")
                 await self.do_call(
                     task,
@@ -766,51 +1311,55 @@ class FlowRunner:
                 )
 
             cmd = ["clang++", "-std=c++17"]
-            if opts.host_target:
-                cmd += ["--target=" + opts.host_target]
+            if self.opts.host_target:
+                cmd += ["--target=" + self.opts.host_target]
                 if (
-                    opts.aiesim
-                    and opts.host_target
+                    self.opts.aiesim
+                    and self.opts.host_target
                     != aie.compiler.aiecc.configure.host_architecture
                 ):
                     sys.exit(
                         "Host cross-compile from "
                         + aie.compiler.aiecc.configure.host_architecture
                         + " to --target="
-                        + opts.host_target
+                        + self.opts.host_target
                         + " is not supported with --aiesim"
                     )
 
             if self.opts.sysroot:
-                cmd += ["--sysroot=" + opts.sysroot]
+                cmd += ["--sysroot=" + self.opts.sysroot]
                 # In order to find the toolchain in the sysroot, we need to have
                 # a 'target' that includes 'linux' and for the 'lib/gcc/$target/$version'
                 # directory to have a corresponding 'include/gcc/$target/$version'.
                 # In some of our sysroots, it seems that we find a lib/gcc, but it
                 # doesn't have a corresponding include/gcc directory.  Instead
                 # force using '/usr/lib,include/gcc'
-                if opts.host_target == "aarch64-linux-gnu":
-                    cmd += [f"--gcc-toolchain={opts.sysroot}/usr"]
+                if self.opts.host_target == "aarch64-linux-gnu":
+                    cmd += [f"--gcc-toolchain={self.opts.sysroot}/usr"]
                     # It looks like the G++ distribution is non standard, so add
                     # an explicit handling of C++ library.
                     # Perhaps related to https://discourse.llvm.org/t/add-gcc-install-dir-deprecate-gcc-toolchain-and-remove-gcc-install-prefix/65091/23
-                    cxx_include = glob.glob(f"{opts.sysroot}/usr/include/c++/*.*.*")[0]
-                    triple = os.path.basename(opts.sysroot)
+                    cxx_include = glob.glob(
+                        f"{self.opts.sysroot}/usr/include/c++/*.*.*"
+                    )[0]
+                    triple = os.path.basename(self.opts.sysroot)
                     cmd += [f"-I{cxx_include}", f"-I{cxx_include}/{triple}"]
-                    gcc_lib = glob.glob(f"{opts.sysroot}/usr/lib/{triple}/*.*.*")[0]
+                    gcc_lib = glob.glob(f"{self.opts.sysroot}/usr/lib/{triple}/*.*.*")[
+                        0
+                    ]
                     cmd += [f"-B{gcc_lib}", f"-L{gcc_lib}"]
             install_path = aie.compiler.aiecc.configure.install_path()
 
             # Setting everything up if linking against HSA
-            if opts.link_against_hsa:
+            if self.opts.link_against_hsa:
                 cmd += ["-DHSA_RUNTIME"]
-                arch_name = opts.host_target.split("-")[0] + "-hsa"
+                arch_name = self.opts.host_target.split("-")[0] + "-hsa"
                 hsa_path = os.path.join(aie.compiler.aiecc.configure.hsa_dir)
                 hsa_include_path = os.path.join(hsa_path, "..", "..", "..", "include")
                 hsa_lib_path = os.path.join(hsa_path, "..", "..")
                 hsa_so_path = os.path.join(hsa_lib_path, "libhsa-runtime64.so")
             else:
-                arch_name = opts.host_target.split("-")[0]
+                arch_name = self.opts.host_target.split("-")[0]
 
             # Getting a pointer to the libxaie include and library
             runtime_xaiengine_path = os.path.join(
@@ -829,7 +1378,7 @@ class FlowRunner:
             )
 
             # Linking against the correct memory allocator
-            if opts.link_against_hsa:
+            if self.opts.link_against_hsa:
                 memory_allocator = os.path.join(
                     runtime_testlib_path, "libmemory_allocator_hsa.a"
                 )
@@ -842,7 +1391,7 @@ class FlowRunner:
                 memory_allocator,
                 "-I" + xaiengine_include_path,
                 "-L" + xaiengine_lib_path,
-                "-L" + os.path.join(opts.aietools_path, "lib", "lnx64.o"),
+                "-L" + os.path.join(self.opts.aietools_path, "lib", "lnx64.o"),
                 "-Wl,-R" + xaiengine_lib_path,
                 "-I" + self.tmpdirname,
                 "-fuse-ld=lld",
@@ -850,26 +1399,26 @@ class FlowRunner:
                 "-lxaiengine",
             ]
             # Linking against HSA
-            if opts.link_against_hsa:
+            if self.opts.link_against_hsa:
                 cmd += [hsa_so_path]
                 cmd += ["-I%s" % hsa_include_path]
                 cmd += ["-Wl,-rpath,%s" % hsa_lib_path]
 
             cmd += aie_target_defines(aie_target)
 
-            if len(opts.host_args) > 0:
-                await self.do_call(task, cmd + opts.host_args)
+            if len(self.opts.host_args) > 0:
+                await self.do_call(task, cmd + self.opts.host_args)
 
-            self.progress_bar.update(self.progress_bar.task_completed, advance=1)
+            self.progress_bar.update(self.completed_task, advance=1)
             if task:
                 self.progress_bar.update(task, advance=0, visible=False)
 
     async def gen_sim(self, task, aie_target, file_physical):
         # For simulation, we need to additionally parse the 'remaining' options to avoid things
         # which conflict with the options below (e.g. -o)
-        print(opts.host_args)
+        print(self.opts.host_args)
         host_opts = aie.compiler.aiecc.cl_arguments.strip_host_args_for_aiesim(
-            opts.host_args
+            self.opts.host_args
         )
 
         sim_dir = self.prepend_tmp("sim")
@@ -888,10 +1437,10 @@ class FlowRunner:
         install_path = aie.compiler.aiecc.configure.install_path()
 
         # Setting everything up if linking against HSA
-        if opts.link_against_hsa:
-            arch_name = opts.host_target.split("-")[0] + "-hsa"
+        if self.opts.link_against_hsa:
+            arch_name = self.opts.host_target.split("-")[0] + "-hsa"
         else:
-            arch_name = opts.host_target.split("-")[0]
+            arch_name = self.opts.host_target.split("-")[0]
 
         runtime_simlib_path = os.path.join(
             install_path, "aie_runtime_lib", aie_target.upper(), "aiesim"
@@ -929,19 +1478,21 @@ class FlowRunner:
             "-Og",
             "-Dmain(...)=ps_main(...)",
             "-I" + self.tmpdirname,
-            "-I" + opts.aietools_path + "/include",
-            "-I" + opts.aietools_path + "/include/drivers/aiengine",
-            "-I" + opts.aietools_path + "/data/osci_systemc/include",
-            "-I" + opts.aietools_path + "/include/xtlm/include",
-            "-I" + opts.aietools_path + "/include/common_cpp/common_cpp_v1_0/include",
+            "-I" + self.opts.aietools_path + "/include",
+            "-I" + self.opts.aietools_path + "/include/drivers/aiengine",
+            "-I" + self.opts.aietools_path + "/data/osci_systemc/include",
+            "-I" + self.opts.aietools_path + "/include/xtlm/include",
+            "-I"
+            + self.opts.aietools_path
+            + "/include/common_cpp/common_cpp_v1_0/include",
             "-I" + runtime_testlib_include_path,
             memory_allocator,
         ]  # clang is picky  # Pickup aie_inc.cpp
 
         # Don't use shipped version of xaiengine?
         sim_link_args = [
-            "-L" + opts.aietools_path + "/lib/lnx64.o",
-            "-L" + opts.aietools_path + "/data/osci_systemc/lib/lnx64",
+            "-L" + self.opts.aietools_path + "/lib/lnx64.o",
+            "-L" + self.opts.aietools_path + "/data/osci_systemc/lib/lnx64",
             "-Wl,--as-needed",
             "-lxioutils",
             "-lxaiengine",
@@ -1056,125 +1607,186 @@ class FlowRunner:
         print("Simulation generated...")
         print("To run simulation: " + sim_script)
 
-    async def run_flow(self):
-        nworkers = int(opts.nthreads)
-        if nworkers == 0:
-            nworkers = os.cpu_count()
-
-        self.limit = asyncio.Semaphore(nworkers)
-        with progress.Progress(
-            *progress.Progress.get_default_columns(),
-            progress.TimeElapsedColumn(),
-            progress.MofNCompleteColumn(),
-            progress.TextColumn("{task.fields[command]}"),
-            redirect_stdout=False,
-            redirect_stderr=False,
-        ) as progress_bar:
-            self.progress_bar = progress_bar
-            progress_bar.task = progress_bar.add_task(
-                "[green] MLIR compilation:", total=1, command="1 Worker"
-            )
+    def incremental_outputs(self):
+        # The configuration outputs that an incremental build reuses, or None
+        # if the requested flow can't be rebuilt incrementally.  Outputs other
+        # than the xclbin live in the tmpdir next to the stamp.
+        if (
+            not self.opts.incremental
+            or not self.opts.execute
+            or self.opts.aiesim
+            or (self.opts.compile_host and len(self.opts.host_args) > 0)
+        ):
+            return None
+        outputs = []
+        if self.opts.xcl:
+            outputs.append(self.opts.xclbin_name)
+        if self.opts.pdi:
+            outputs.append(self.prepend_tmp(self.opts.pdi_name))
+        return outputs
+
+    def read_incremental_stamp(self, fingerprint, outputs):
+        """Whether the outputs of a previous build match `fingerprint`."""
+        try:
+            with open(self.prepend_tmp(INCREMENTAL_STAMP), "r") as f:
+                stamp = json.load(f)
+            if stamp["fingerprint"] != fingerprint:
+                return False
+            for output in outputs:
+                st = os.stat(output)
+                if stamp["outputs"].get(output) != [st.st_size, st.st_mtime_ns]:
+                    return False
+        except (OSError, ValueError, KeyError):
+            return False
+        return True
+
+    def write_incremental_stamp(self, fingerprint, outputs):
+        stamp = {"fingerprint": fingerprint, "outputs": {}}
+        for output in outputs:
+            st = os.stat(output)
+            stamp["outputs"][output] = [st.st_size, st.st_mtime_ns]
+        with open(self.prepend_tmp(INCREMENTAL_STAMP), "w") as f:
+            json.dump(stamp, f, indent=2)
+
+    async def run_flow(self, progress_bar=None):
+        nworkers = flow_nworkers(self.opts)
+        if self.limit is None:
+            self.limit = asyncio.Semaphore(nworkers)
+        if progress_bar is None:
+            with make_progress_bar() as progress_bar:
+                return await self.run_flow(progress_bar)
+
+        self.progress_bar = progress_bar
+        self.main_task = progress_bar.add_task(
+            f"[green] MLIR compilation{self.label}:", total=1, command="1 Worker"
+        )
 
-            pass_pipeline = INPUT_WITH_ADDRESSES_PIPELINE(
-                opts.alloc_scheme, opts.dynamic_objFifos, opts.ctrl_pkt_overlay
-            ).materialize(module=True)
+        pass_pipeline = INPUT_WITH_ADDRESSES_PIPELINE(
+            self.opts.alloc_scheme,
+            self.opts.dynamic_objFifos,
+            self.opts.ctrl_pkt_overlay,
+        ).materialize(module=True)
+
+        file_with_addresses = self.prepend_tmp("input_with_addresses.mlir")
+        await asyncio.to_thread(
+            run_passes,
+            pass_pipeline,
+            self.mlir_module_str,
+            file_with_addresses,
+            self.opts.verbose,
+            self.trace,
+            "input with addresses",
+        )
 
-            file_with_addresses = self.prepend_tmp("input_with_addresses.mlir")
-            run_passes(
-                pass_pipeline,
-                self.mlir_module_str,
+        incremental_outputs = self.incremental_outputs()
+        fingerprint = None
+        if incremental_outputs is not None:
+            fingerprint = await asyncio.to_thread(
+                device_fingerprint, self.mlir_module_str, self.opts
+            )
+            if self.read_incremental_stamp(fingerprint, incremental_outputs):
+                # Only the runtime sequences may have changed.
+                if self.opts.npu:
+                    await asyncio.to_thread(self.process_npu_insts, file_with_addresses)
+                progress_bar.update(self.main_task, advance=0, visible=False)
+                print(
+                    f"Device configuration unchanged{self.label}; "
+                    "reusing the previous build"
+                )
+                self.write_trace()
+                return
+            # Don't leave a stale stamp behind if this build fails.
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.prepend_tmp(INCREMENTAL_STAMP))
+
+        with_addresses_str = await read_file_async(file_with_addresses)
+        cores = generate_cores_list(with_addresses_str)
+        t = await asyncio.to_thread(
+            do_run,
+            [
+                "aie-translate",
+                "--aie-generate-target-arch",
                 file_with_addresses,
-                self.opts.verbose,
+            ],
+            self.opts.verbose,
+        )
+        aie_target = t.stdout.strip()
+        if not re.fullmatch("AIE.?.?", aie_target):
+            print(
+                "Unexpected target " + aie_target + ". Exiting...",
+                file=sys.stderr,
+            )
+            raise FlowError("Unexpected target " + aie_target, -3)
+        aie_peano_target = aie_target.lower() + "-none-elf"
+
+        if self.opts.in_process:
+            # Parse the design once; per-core scripts are generated from
+            # it and per-core lowering runs on clones in worker processes.
+            self.with_addresses_ctx = Context()
+            with self.with_addresses_ctx, Location.unknown():
+                self.with_addresses_module = Module.parse(with_addresses_str)
+            if (
+                not self.opts.unified
+                and cores
+                and self.opts.execute
+                and self.core_pool is None
+            ):
+                self.core_pool = make_core_worker_pool(min(nworkers, len(cores)))
+                self.owns_core_pool = True
+
+        self.completed_task = progress_bar.add_task(
+            f"[green] AIE Compilation{self.label}:",
+            total=len(cores) + 1,
+            command="%d Workers" % nworkers,
+        )
+
+        # Every step below declares the files it reads and writes and
+        # starts as soon as its inputs exist: routing, NPU instruction
+        # generation and core compilation all overlap.
+        graph = TaskGraph(self.limit)
+        input_physical = self.prepend_tmp("input_physical.mlir")
+        file_inc_cpp = self.prepend_tmp("aie_inc.cpp")
+        unified_obj = self.prepend_tmp("input.o")
+
+        if self.opts.npu:
+            graph.add(
+                "npu-insts",
+                lambda: asyncio.to_thread(self.process_npu_insts, file_with_addresses),
+                inputs=[file_with_addresses],
+                outputs=[self.opts.insts_name],
             )
 
-            cores = generate_cores_list(await read_file_async(file_with_addresses))
-            t = do_run(
+        graph.add(
+            "route",
+            lambda: self.do_call(
+                None,
                 [
-                    "aie-translate",
-                    "--aie-generate-target-arch",
+                    "aie-opt",
+                    "--aie-create-pathfinder-flows",
                     file_with_addresses,
+                    "-o",
+                    input_physical,
                 ],
-                self.opts.verbose,
-            )
-            aie_target = t.stdout.strip()
-            if not re.fullmatch("AIE.?.?", aie_target):
-                print(
-                    "Unexpected target " + aie_target + ". Exiting...",
-                    file=sys.stderr,
-                )
-                exit(-3)
-            aie_peano_target = aie_target.lower() + "-none-elf"
-
-            # Optionally generate insts.txt for NPU instruction stream
-            if opts.npu:
-                with Context(), Location.unknown():
-                    file_with_addresses_module = Module.parse(
-                        await read_file_async(file_with_addresses)
-                    )
-                    pass_pipeline = NPU_LOWERING_PIPELINE.materialize(module=True)
-                    npu_insts_file = (
-                        self.prepend_tmp("npu_insts.mlir")
-                        if self.opts.verbose
-                        else None
-                    )
-                    npu_insts_module = run_passes_module(
-                        pass_pipeline,
-                        file_with_addresses_module,
-                        npu_insts_file,
-                        self.opts.verbose,
-                    )
-                    npu_insts = aiedialect.translate_npu_to_binary(
-                        npu_insts_module.operation
-                    )
-                    with open(opts.insts_name, "w") as f:
-                        for inst in npu_insts:
-                            f.write(f"{inst}\n")
-
-            # fmt: off
-            if opts.unified:
-                file_opt_with_addresses = self.prepend_tmp("input_opt_with_addresses.mlir")
-                await self.do_call(progress_bar.task, ["aie-opt", f"--pass-pipeline={AIE_LOWER_TO_LLVM()}", file_with_addresses, "-o", file_opt_with_addresses])
-
-                file_llvmir = self.prepend_tmp("input.ll")
-                await self.do_call(progress_bar.task, ["aie-translate", "--mlir-to-llvmir", file_opt_with_addresses, "-o", file_llvmir])
-
-                self.unified_file_core_obj = self.prepend_tmp("input.o")
-                if opts.compile and opts.xchesscc:
-                    file_llvmir_hacked = await self.chesshack(progress_bar.task, file_llvmir, aie_target)
-                    await self.do_call(progress_bar.task, ["xchesscc_wrapper", aie_target.lower(), "+w", self.prepend_tmp("work"), "-c", "-d", "+Wclang,-xir", "-f", file_llvmir_hacked, "-o", self.unified_file_core_obj])
-                elif opts.compile:
-                    file_llvmir_hacked = await self.peanohack(file_llvmir)
-                    file_llvmir_opt = self.prepend_tmp("input.opt.ll")
-                    await self.do_call(progress_bar.task, [self.peano_opt_path, "--passes=default<O2>", "-inline-threshold=10", "-S", file_llvmir_hacked, "-o", file_llvmir_opt])
-                    await self.do_call(progress_bar.task, [self.peano_llc_path, file_llvmir_opt, "-O2", "--march=" + aie_target.lower(), "--function-sections", "--filetype=obj", "-o", self.unified_file_core_obj])
-            # fmt: on
+                force=True,
+            ),
+            inputs=[file_with_addresses],
+            outputs=[input_physical],
+            limited=True,
+        )
 
-            progress_bar.update(progress_bar.task, advance=0, visible=False)
-            progress_bar.task_completed = progress_bar.add_task(
-                "[green] AIE Compilation:",
-                total=len(cores) + 1,
-                command="%d Workers" % nworkers,
+        if self.opts.unified:
+            graph.add(
+                "unified",
+                lambda: self.process_unified(aie_target, file_with_addresses),
+                inputs=[file_with_addresses],
+                outputs=[unified_obj],
+                limited=True,
             )
 
-            input_physical = self.prepend_tmp("input_physical.mlir")
-            processes = [
-                self.do_call(
-                    None,
-                    [
-                        "aie-opt",
-                        "--aie-create-pathfinder-flows",
-                        file_with_addresses,
-                        "-o",
-                        input_physical,
-                    ],
-                    force=True,
-                )
-            ]
-            await asyncio.gather(*processes)
-
-            if opts.compile_host or opts.aiesim:
-                file_inc_cpp = self.prepend_tmp("aie_inc.cpp")
-                await self.do_call(
+        if self.opts.compile_host or self.opts.aiesim:
+            graph.add(
+                "aie-inc",
+                lambda: self.do_call(
                     None,
                     [
                         "aie-translate",
@@ -1183,59 +1795,120 @@ class FlowRunner:
                         "-o",
                         file_inc_cpp,
                     ],
-                )
+                ),
+                inputs=[input_physical],
+                outputs=[file_inc_cpp],
+                limited=True,
+            )
 
-            if opts.compile_host and len(opts.host_args) > 0:
-                await self.process_host_cgen(aie_target, input_physical)
+        # process_host_cgen and process_core take a slot of self.limit
+        # themselves.
+        if self.opts.compile_host and len(self.opts.host_args) > 0:
+            graph.add(
+                "host",
+                lambda: self.process_host_cgen(aie_target, input_physical),
+                inputs=[input_physical, file_inc_cpp],
+            )
 
-            input_physical_str = await read_file_async(input_physical)
+        if self.opts.aiesim:
+            graph.add(
+                "aiesim",
+                lambda: self.gen_sim(self.main_task, aie_target, input_physical),
+                inputs=[input_physical, file_inc_cpp],
+            )
 
-            processes = []
-            if opts.aiesim:
-                processes.append(
-                    self.gen_sim(progress_bar.task, aie_target, input_physical)
-                )
-            for core in cores:
-                processes.append(
-                    self.process_core(
-                        core,
-                        aie_target,
-                        aie_peano_target,
-                        file_with_addresses,
-                    )
-                )
-            await asyncio.gather(*processes)
+        core_elfs = []
+        for core in cores:
+            core_elf = core[2] if core[2] else corefile(self.elf_dir, core, "elf")
+            core_elfs.append(core_elf)
+            graph.add(
+                "core_%d_%d" % core[0:2],
+                functools.partial(
+                    self.process_core,
+                    core,
+                    aie_target,
+                    aie_peano_target,
+                    file_with_addresses,
+                ),
+                inputs=[unified_obj if self.opts.unified else file_with_addresses],
+                outputs=[core_elf],
+            )
 
-            # copy the elfs left by proess_core to the tmpdir for process_cdo
-            for elf in glob.glob("*.elf"):
-                try:
-                    shutil.copy(elf, self.tmpdirname)
-                except shutil.SameFileError:
-                    pass
-            for elf_map in glob.glob("*.elf.map"):
-                try:
-                    shutil.copy(elf_map, self.tmpdirname)
-                except shutil.SameFileError:
-                    pass
+        graph.add(
+            "collect-elfs",
+            lambda: asyncio.to_thread(self.collect_elfs),
+            inputs=core_elfs,
+            outputs=["elfs"],
+        )
 
-            if (opts.cdo or opts.xcl or opts.pdi) and opts.execute:
-                await self.process_cdo(input_physical_str)
+        if (self.opts.cdo or self.opts.xcl or self.opts.pdi) and self.opts.execute:
+            graph.add(
+                "cdo",
+                lambda: asyncio.to_thread(self.process_cdo, input_physical),
+                inputs=[input_physical, "elfs"],
+                outputs=["cdo"],
+            )
 
-            processes = []
-            if opts.xcl:
-                processes.append(self.process_xclbin_gen())
-            # self.process_pdi_gen is called in process_xclbin_gen,
-            # so don't call it again if opts.xcl is set
-            elif opts.pdi:
-                processes.append(self.process_pdi_gen())
+        if self.opts.xcl:
+            graph.add(
+                "xclbin",
+                self.process_xclbin_gen,
+                inputs=["cdo", "elfs"],
+                outputs=[self.opts.xclbin_name],
+            )
+        # self.process_pdi_gen is called in process_xclbin_gen,
+        # so don't call it again if self.opts.xcl is set
+        elif self.opts.pdi:
+            graph.add(
+                "pdi",
+                self.process_pdi_gen,
+                inputs=["cdo", "elfs"],
+                outputs=[self.opts.pdi_name],
+            )
 
-            if opts.txn and opts.execute:
-                processes.append(self.process_txn(input_physical_str))
+        if self.opts.txn and self.opts.execute:
+            graph.add(
+                "txn",
+                lambda: asyncio.to_thread(self.process_txn, input_physical),
+                inputs=[input_physical, "elfs"],
+            )
+
+        if self.opts.ctrlpkt and self.opts.execute:
+            graph.add(
+                "ctrlpkt",
+                lambda: asyncio.to_thread(self.process_ctrlpkt, input_physical),
+                inputs=[input_physical, "elfs"],
+            )
+
+        progress_bar.update(self.main_task, advance=0, visible=False)
+        await graph.run()
 
-            if opts.ctrlpkt and opts.execute:
-                processes.append(self.process_ctrlpkt(input_physical_str))
+        if self.owns_core_pool:
+            self.core_pool.shutdown()
+            self.core_pool = None
+            self.owns_core_pool = False
+
+        if self.cache:
+            self.cache.evict()
+            if self.opts.verbose or self.opts.profiling:
+                print(f"Build cache: {self.cache}")
+
+        if self.dedup_cores and (self.opts.verbose or self.opts.profiling):
+            ncores = sum(len(cores) for cores in self.dedup_cores.values())
+            print(
+                f"Compiled {len(self.dedup_cores)} distinct core objects for {ncores} cores"
+            )
 
-            await asyncio.gather(*processes)
+        if fingerprint is not None:
+            self.write_incremental_stamp(fingerprint, incremental_outputs)
+
+        self.write_trace()
+
+    def write_trace(self):
+        if self.trace:
+            trace_file = self.opts.profile_trace or self.prepend_tmp("aiecc_trace.json")
+            self.trace.write(trace_file)
+            print(f"Compile-time trace written to {trace_file}")
 
     def dumpprofile(self):
         sortedruntimes = sorted(
@@ -1245,14 +1918,42 @@ class FlowRunner:
             if i < len(sortedruntimes):
                 s1, s0 = sortedruntimes[i][1], sortedruntimes[i][0]
                 print(f"{s1:.4f} sec: {s0}")
-
-
-def run(mlir_module, args=None):
-    global opts
-    if args is not None:
-        opts = aie.compiler.aiecc.cl_arguments.parse_args(args)
+        if self.trace:
+            pass_totals = self.trace.pass_totals()
+            if pass_totals:
+                print("Slowest passes:")
+            for name, seconds in pass_totals[:20]:
+                print(f"{seconds:.4f} sec: {name}")
+
+
+# Toolchain discovery results keyed by peano install dir, so that a process
+# compiling many designs (--batch, compile_many, the compile server) only
+# probes the system once.  Each entry holds the aietools path and the
+# directories to prepend and append to PATH.
+_discovered_aietools = {}
+
+
+def _apply_toolchain_env(aietools_path, prepend, append):
+    os.environ["AIETOOLS"] = aietools_path
+    path = os.environ.get("PATH", "").split(os.pathsep)
+    path = prepend + [d for d in path if d not in prepend]
+    path += [d for d in append if d not in path]
+    os.environ["PATH"] = os.pathsep.join(path)
+
+
+def discover_toolchain(opts):
+    """Locate aietools and put the aie, peano and xchesscc tools on PATH."""
+    # The environment is re-applied on every call, as a compile server worker
+    # replaces its environment with the client's.
+    if opts.peano_install_dir in _discovered_aietools:
+        opts.aietools_path, prepend, append = _discovered_aietools[
+            opts.peano_install_dir
+        ]
+        _apply_toolchain_env(opts.aietools_path, prepend, append)
+        return
 
     opts.aietools_path = None
+    append = []
 
     # If Ryzen AI Software is installed then use it for aietools
     try:
@@ -1273,7 +1974,7 @@ def run(mlir_module, args=None):
         xchesscc_bin_path = os.path.dirname(os.path.realpath(xchesscc_path))
         xchesscc_path = os.path.dirname(xchesscc_bin_path)
         print(f"Found xchesscc at {xchesscc_path}")
-        os.environ["PATH"] = os.pathsep.join([os.environ["PATH"], xchesscc_bin_path])
+        append.append(xchesscc_bin_path)
         if opts.aietools_path is None:
             opts.aietools_path = xchesscc_path
     else:
@@ -1283,12 +1984,35 @@ def run(mlir_module, args=None):
         print("Could not find aietools from Vitis or Ryzen AI Software.")
         opts.aietools_path = "<aietools not found>"
 
-    os.environ["AIETOOLS"] = opts.aietools_path
-
     aie_path = aie.compiler.aiecc.configure.install_path()
     peano_path = os.path.join(opts.peano_install_dir, "bin")
-    os.environ["PATH"] = os.pathsep.join([aie_path, os.environ["PATH"]])
-    os.environ["PATH"] = os.pathsep.join([peano_path, os.environ["PATH"]])
+    prepend = [peano_path, aie_path]
+    _apply_toolchain_env(opts.aietools_path, prepend, append)
+
+    _discovered_aietools[opts.peano_install_dir] = (
+        opts.aietools_path,
+        prepend,
+        append,
+    )
+
+
+def make_tmpdir(tmpdirname, verbose=False):
+    tmpdirname = os.path.abspath(tmpdirname)
+    try:
+        os.mkdir(tmpdirname)
+    except FileExistsError:
+        pass
+    if verbose:
+        print("created temporary directory", tmpdirname)
+    return tmpdirname
+
+
+def run(mlir_module, args=None):
+    global opts
+    if args is not None:
+        opts = aie.compiler.aiecc.cl_arguments.parse_args(args)
+
+    discover_toolchain(opts)
 
     if opts.aiesim and not opts.xbridge:
         sys.exit("AIE Simulation (--aiesim) currently requires --xbridge")
@@ -1302,40 +2026,270 @@ def run(mlir_module, args=None):
         tmpdirname = os.path.basename(opts.filename) + ".prj"
     else:
         tmpdirname = tempfile.mkdtemp()
-    tmpdirname = os.path.abspath(tmpdirname)
+    tmpdirname = make_tmpdir(tmpdirname, opts.verbose)
 
+    runner = FlowRunner(str(mlir_module), opts, tmpdirname)
     try:
-        os.mkdir(tmpdirname)
-    except FileExistsError:
-        pass
-    if opts.verbose:
-        print("created temporary directory", tmpdirname)
+        asyncio.run(runner.run_flow())
+    except FlowError as e:
+        sys.exit(e.returncode)
+
+    if opts.profiling:
+        runner.dumpprofile()
+
+
+@dataclass
+class CompileResult:
+    """The artifacts of a compile_module() call, held in memory."""
+
+    # NPU instruction stream (--aie-generate-npu-insts).
+    insts: Optional[np.ndarray] = None
+    # Contents of the xclbin (--aie-generate-xclbin) and pdi (--aie-generate-pdi).
+    xclbin: Optional[bytes] = None
+    pdi: Optional[bytes] = None
+    # Core ELF name -> contents.
+    elfs: Dict[str, bytes] = field(default_factory=dict)
+    # Command or stage -> wall seconds, and the wall seconds of the whole flow.
+    timings: Dict[str, float] = field(default_factory=dict)
+    seconds: float = 0.0
+    # Working directory, if it was kept.
+    tmpdir: Optional[str] = None
+
+
+def _memory_tmpdir_root():
+    # Prefer tmpfs so that intermediate files never reach the disk.
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return None
 
-    runner = FlowRunner(str(mlir_module), opts, tmpdirname)
-    asyncio.run(runner.run_flow())
+
+def _read_if_exists(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def compile_module(mlir_module, args=None, tmpdir=None):
+    """Compile a design and return its artifacts in memory.
+
+    `args` are aiecc command line arguments.  Unlike run(), every output,
+    including the ELFs and relative output names, is written to the working
+    directory only.  Unless `tmpdir` is given, that is a fresh directory on
+    tmpfs (where available) which is removed before returning.  Failures raise
+    FlowError instead of exiting.
+    """
+    opts = aie.compiler.aiecc.cl_arguments.parse_args(args or [])
+    discover_toolchain(opts)
+
+    if opts.aiesim and not opts.xbridge:
+        raise FlowError("AIE Simulation (--aiesim) currently requires --xbridge")
+
+    with contextlib.ExitStack() as stack:
+        if tmpdir is None:
+            tmpdirname = stack.enter_context(
+                tempfile.TemporaryDirectory(prefix="aiecc-", dir=_memory_tmpdir_root())
+            )
+        else:
+            tmpdirname = make_tmpdir(tmpdir, opts.verbose)
+
+        runner = FlowRunner(
+            str(mlir_module),
+            _design_opts(opts, opts.filename, tmpdirname),
+            tmpdirname,
+            elf_dir=tmpdirname,
+        )
+        start = time.time()
+        asyncio.run(runner.run_flow())
+        result = CompileResult(
+            timings=dict(runner.runtimes),
+            seconds=time.time() - start,
+            tmpdir=tmpdirname if tmpdir is not None else None,
+        )
+        if runner.opts.npu and os.path.exists(runner.opts.insts_name):
+            result.insts = read_insts(runner.opts.insts_name)
+        if runner.opts.xcl:
+            result.xclbin = _read_if_exists(runner.opts.xclbin_name)
+        if runner.opts.pdi:
+            result.pdi = _read_if_exists(runner.prepend_tmp(runner.opts.pdi_name))
+        for elf in sorted(glob.glob(os.path.join(tmpdirname, "*.elf"))):
+            result.elfs[os.path.basename(elf)] = _read_if_exists(elf)
 
     if opts.profiling:
         runner.dumpprofile()
+    return result
+
+
+def _design_opts(opts, name, tmpdirname):
+    # Each design of a batch writes its elfs and its relative-path outputs
+    # into its own project directory so that variants don't overwrite each
+    # other.
+    design_opts = copy.copy(opts)
+    design_opts.filename = name
+    design_opts.host_args = []
+    design_opts.compile_host = False
+    # (pdi_name is already relative to the project directory.)
+    for attr in ["insts_name", "xclbin_name", "profile_trace"]:
+        path = getattr(opts, attr)
+        if path and not os.path.isabs(path):
+            setattr(design_opts, attr, os.path.join(tmpdirname, path))
+    return design_opts
+
+
+async def _compile_batch(designs, opts):
+    limit = asyncio.Semaphore(flow_nworkers(opts))
+    inflight = {}
+    cache = None
+    core_pool = None
+    if opts.execute:
+        cache = open_artifact_cache(opts)
+        if cache is None:
+            # Off or unusable; don't have every design try to open it again.
+            opts = copy.copy(opts)
+            opts.cache = False
+        if opts.in_process and not opts.unified:
+            core_pool = make_core_worker_pool(flow_nworkers(opts))
+
+    runners = []
+    prj_names = set()
+    for name, module_str in designs:
+        prj_name = os.path.basename(name) + ".prj"
+        if prj_name in prj_names:
+            prj_name = f"{os.path.basename(name)}.{len(runners)}.prj"
+        prj_names.add(prj_name)
+        tmpdirname = make_tmpdir(
+            os.path.join(opts.tmpdir or ".", prj_name), opts.verbose
+        )
+        runner = FlowRunner(
+            module_str,
+            _design_opts(opts, name, tmpdirname),
+            tmpdirname,
+            limit=limit,
+            cache=cache,
+            inflight=inflight,
+            elf_dir=tmpdirname,
+            name=name,
+            core_pool=core_pool,
+        )
+        runners.append(runner)
 
+    async def compile_one(runner, progress_bar):
+        record = {"name": runner.opts.filename, "tmpdir": runner.tmpdirname}
+        start = time.time()
+        try:
+            await runner.run_flow(progress_bar)
+            record["status"] = "ok"
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+        record["seconds"] = time.time() - start
+        outputs = {}
+        if runner.opts.npu:
+            outputs["insts"] = runner.opts.insts_name
+        if runner.opts.xcl:
+            outputs["xclbin"] = runner.opts.xclbin_name
+        elif runner.opts.pdi:
+            outputs["pdi"] = runner.prepend_tmp(runner.opts.pdi_name)
+        record["outputs"] = outputs
+        return record
+
+    start = time.time()
+    try:
+        with make_progress_bar() as progress_bar:
+            records = await asyncio.gather(
+                *(compile_one(r, progress_bar) for r in runners)
+            )
+    finally:
+        if core_pool:
+            core_pool.shutdown()
+    manifest = {
+        "designs": records,
+        "seconds": time.time() - start,
+        "cache": cache.stats() if cache else None,
+    }
+    return manifest, runners
+
+
+def compile_many(modules, opts=None):
+    """Compile many designs in one process.
+
+    `modules` is a list of MLIR modules (or their text), or of (name, module)
+    pairs.  `opts` is parsed aiecc options or a list of command line arguments
+    applying to every design.  All designs share the toolchain discovery, one
+    pool of `-j` workers and the build cache, so cores that are identical
+    across designs are compiled once.  Unless a persistent build cache is
+    enabled (see --cache) or the cache is turned off with --no-cache, a
+    temporary one is used for the duration of the batch.
+
+    Returns the manifest: per-design status, timings and outputs.
+    """
+    if opts is None or isinstance(opts, list):
+        opts = aie.compiler.aiecc.cl_arguments.parse_args(opts or [])
+    discover_toolchain(opts)
+
+    designs = []
+    for i, module in enumerate(modules):
+        name, module = module if isinstance(module, tuple) else (f"design{i}", module)
+        designs.append((name, str(module)))
+
+    opts = copy.copy(opts)
+    with contextlib.ExitStack() as stack:
+        if opts.cache is None:
+            opts.cache = True
+            opts.cache_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        manifest, runners = asyncio.run(_compile_batch(designs, opts))
+
+    if opts.batch_manifest:
+        with open(opts.batch_manifest, "w") as f:
+            json.dump(manifest, f, indent=2)
+    if opts.profiling:
+        for runner in runners:
+            print(f"Profile of {runner.opts.filename}:")
+            runner.dumpprofile()
+    return manifest
 
-def main():
+
+def main(args=None):
     global opts
-    opts = aie.compiler.aiecc.cl_arguments.parse_args()
+    opts = aie.compiler.aiecc.cl_arguments.parse_args(args)
 
     if opts.version:
         print(f"aiecc.py {aie.compiler.aiecc.configure.git_commit}")
         sys.exit(0)
 
+    if opts.serve:
+        from aie.compiler.aiecc.server import default_socket_path, serve
+
+        serve(opts.server_socket or default_socket_path(), flow_nworkers(opts), opts)
+        return
+
     if opts.filename is None:
         print("error: the 'file' positional argument is required.")
         sys.exit(1)
 
+    # In batch mode every positional argument is a design to compile.
+    filenames = [opts.filename] + opts.host_args if opts.batch else [opts.filename]
+    modules = []
     try:
         with Context() as ctx, Location.unknown():
-            with open(opts.filename, "r") as f:
-                module = Module.parse(f.read())
-            module_str = str(module)
+            for filename in filenames:
+                with open(filename, "r") as f:
+                    module = Module.parse(f.read())
+                modules.append((filename, str(module)))
     except Exception as e:
         print(e)
         sys.exit(1)
-    run(module_str)
+
+    if not opts.batch:
+        run(modules[0][1])
+        return
+
+    manifest = compile_many(modules, opts)
+    failed = [d["name"] for d in manifest["designs"] if d["status"] != "ok"]
+    print(
+        f"Compiled {len(modules) - len(failed)} of {len(modules)} designs "
+        f"in {manifest['seconds']:.1f} sec"
+    )
+    if failed:
+        print("Failed: " + " ".join(failed), file=sys.stderr)
+        sys.exit(1)
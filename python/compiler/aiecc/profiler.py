@@ -0,0 +1,249 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+"""
+Compile-time tracing for aiecc --profile.
+
+Records one slice per subprocess and per in-process stage and writes them in
+the Chrome trace event format, which can be loaded into chrome://tracing or
+https://ui.perfetto.dev.  Concurrently running slices are placed on separate
+lanes, and a counter track shows how many subprocesses are running at once,
+which makes it easy to see whether the -j limit is saturated.  Per-pass
+timings from MLIR's pass timing instrumentation are attached to the stage that
+ran the pass pipeline.
+
+In-process pass pipelines print their timing report to fd 2, so while one is
+timed no subprocess is started and the other timed pipelines wait; profiling
+therefore serializes some of the work it measures.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+# One row of an MLIR timing report in list or tree display, e.g.
+#   "   0.0123 ( 12.3%)   0.0456 ( 45.6%)  Canonicalizer"
+# When both user and wall time are reported, wall time is the last column.
+_TIMING_ROW_RE = re.compile(r"^\s*((?:[\d.]+\s+\(\s*[\d.]+%\)\s+)+)(\S.*?)\s*$")
+_TIMING_VALUE_RE = re.compile(r"([\d.]+)\s+\(\s*[\d.]+%\)")
+_TIMING_SKIP = {"Total", "Rest", "Parser", "Output"}
+
+
+def parse_timing_report(text):
+    """Extract {pass name: wall seconds} from an MLIR pass timing report."""
+    timings = defaultdict(float)
+    in_report = False
+    for line in text.splitlines():
+        if "Execution time report" in line:
+            in_report = True
+            continue
+        if not in_report:
+            continue
+        m = _TIMING_ROW_RE.match(line)
+        if not m:
+            continue
+        name = m.group(2).strip()
+        if name in _TIMING_SKIP or name.startswith("'"):
+            # Skip totals and the op-anchor headers of nested pipelines.
+            continue
+        timings[name] += float(_TIMING_VALUE_RE.findall(m.group(1))[-1])
+    return dict(timings)
+
+
+def split_timing_report(text):
+    """Split tool stderr into (diagnostics, timing report)."""
+    idx = text.find("===----")
+    if idx < 0 or "Execution time report" not in text[idx:]:
+        return text, ""
+    return text[:idx], text[idx:]
+
+
+class StderrGate:
+    """Keeps redirections of fd 2 apart from the creation of processes.
+
+    Redirecting fd 2 is process-wide, and a child process inherits fd 2 as it
+    is when the child is created: a child started while a timing report is
+    being captured would write all of its stderr into the capture file, which
+    is discarded afterwards.  So a capture waits for processes being started
+    to be started, and processes wait for a capture to end before starting.
+    Children already running are unaffected by a capture.  Only one capture
+    runs at a time.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._spawning = 0
+        self._redirected = False
+
+    @contextmanager
+    def spawning(self):
+        """Start processes (or fork pool workers) in the enclosed block."""
+        # Processes may be started across an await, so a capture must not keep
+        # new ones waiting before the ones being started are: that could block
+        # the event loop that has to finish starting them.
+        with self._cond:
+            self._cond.wait_for(lambda: not self._redirected)
+            self._spawning += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._spawning -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def redirecting(self):
+        """Redirect fd 2 in the enclosed block."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._redirected and not self._spawning)
+            self._redirected = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._redirected = False
+                self._cond.notify_all()
+
+
+stderr_gate = StderrGate()
+
+
+@contextmanager
+def capture_stderr():
+    """Capture everything written to fd 2 (including by C++ code).
+
+    Yields a list that holds the captured text once the block exits.  No
+    process may be started through `stderr_gate` meanwhile; text that other
+    threads write to stderr in the meantime is captured as well.
+    """
+    captured = []
+    with stderr_gate.redirecting(), tempfile.TemporaryFile(mode="w+b") as tmp:
+        sys.stderr.flush()
+        saved = os.dup(2)
+        os.dup2(tmp.fileno(), 2)
+        try:
+            yield captured
+        finally:
+            sys.stderr.flush()
+            os.dup2(saved, 2)
+            os.close(saved)
+            tmp.seek(0)
+            captured.append(tmp.read().decode(errors="replace"))
+
+
+class TraceRecorder:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.events = []
+        self.pass_timings = defaultdict(lambda: defaultdict(float))
+        self.lock = threading.Lock()
+        self.free_lanes = []
+        self.num_lanes = 0
+        self.running = 0
+
+    def now_us(self):
+        return (time.perf_counter() - self.start) * 1e6
+
+    def _acquire_lane(self):
+        if self.free_lanes:
+            self.free_lanes.sort()
+            return self.free_lanes.pop(0)
+        self.num_lanes += 1
+        return self.num_lanes - 1
+
+    def _counter(self, ts):
+        self.events.append(
+            {
+                "name": "running subprocesses",
+                "ph": "C",
+                "ts": ts,
+                "pid": 0,
+                "args": {"running": self.running},
+            }
+        )
+
+    @contextmanager
+    def slice(self, name, cat, **args):
+        """Record the enclosed block as a slice on the lowest free lane."""
+        with self.lock:
+            lane = self._acquire_lane()
+            ts = self.now_us()
+            if cat == "subprocess":
+                self.running += 1
+                self._counter(ts)
+        try:
+            yield
+        finally:
+            with self.lock:
+                end = self.now_us()
+                event = {
+                    "name": name,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": ts,
+                    "dur": end - ts,
+                    "pid": 0,
+                    "tid": lane,
+                }
+                if args:
+                    event["args"] = args
+                self.events.append(event)
+                self.free_lanes.append(lane)
+                if cat == "subprocess":
+                    self.running -= 1
+                    self._counter(end)
+
+    def add_pass_timings(self, stage, timings):
+        with self.lock:
+            for name, seconds in timings.items():
+                self.pass_timings[stage][name] += seconds
+
+    def pass_totals(self):
+        totals = defaultdict(float)
+        for timings in self.pass_timings.values():
+            for name, seconds in timings.items():
+                totals[name] += seconds
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def to_json(self):
+        lanes = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 0,
+                "tid": lane,
+                "args": {"name": f"lane {lane}"},
+            }
+            for lane in range(self.num_lanes)
+        ]
+        return {
+            "traceEvents": [
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": 0,
+                    "args": {"name": "aiecc"},
+                },
+                *lanes,
+                *sorted(self.events, key=lambda e: e["ts"]),
+            ],
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "passTimings": {
+                    stage: dict(timings) for stage, timings in self.pass_timings.items()
+                }
+            },
+        }
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f)
@@ -0,0 +1,105 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+"""
+Dependency-driven task scheduling for the aiecc flow.
+
+Each step of the flow is a task that declares the artifacts it consumes and
+produces.  A task starts as soon as every task producing one of its inputs has
+finished, so independent steps (e.g. routing and per-core compilation) overlap
+instead of waiting on phase-wide barriers.  Inputs that no task produces are
+treated as already available.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+
+@dataclass
+class Task:
+    name: str
+    fn: Callable[[], Awaitable]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    # Whether the task holds a slot of the graph's concurrency limit while it
+    # runs.
+    limited: bool = False
+
+
+class TaskGraph:
+    def __init__(self, limit: Optional[asyncio.Semaphore] = None):
+        self.limit = limit
+        self.tasks = {}
+        self.producers = {}
+
+    def add(self, name, fn, inputs=(), outputs=(), limited=False):
+        if name in self.tasks:
+            raise ValueError(f"duplicate task '{name}'")
+        for output in outputs:
+            if output in self.producers:
+                raise ValueError(
+                    f"'{output}' is produced by both '{self.producers[output]}' and '{name}'"
+                )
+            self.producers[output] = name
+        self.tasks[name] = Task(name, fn, list(inputs), list(outputs), limited)
+
+    def dependencies(self, name):
+        deps = []
+        for input in self.tasks[name].inputs:
+            producer = self.producers.get(input)
+            if producer is not None and producer != name and producer not in deps:
+                deps.append(producer)
+        return deps
+
+    def topological_order(self):
+        """Return the task names in dependency order; raise on cycles."""
+        order = []
+        state = {}
+
+        def visit(name, stack):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                cycle = stack[stack.index(name) :] + [name]
+                raise ValueError("dependency cycle: " + " -> ".join(cycle))
+            state[name] = "visiting"
+            for dep in self.dependencies(name):
+                visit(dep, stack + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.tasks:
+            visit(name, [])
+        return order
+
+    async def _run_task(self, task, deps):
+        if deps:
+            await asyncio.gather(*deps)
+        if task.limited and self.limit is not None:
+            async with self.limit:
+                return await task.fn()
+        return await task.fn()
+
+    async def run(self):
+        """Run every task once all of its dependencies have completed.
+
+        The first failure cancels all outstanding tasks and is re-raised.
+        """
+        running = {}
+        for name in self.topological_order():
+            deps = [running[dep] for dep in self.dependencies(name)]
+            running[name] = asyncio.ensure_future(
+                self._run_task(self.tasks[name], deps)
+            )
+
+        try:
+            await asyncio.gather(*running.values())
+        except BaseException:
+            for future in running.values():
+                future.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+            raise
@@ -0,0 +1,290 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+"""
+Persistent aiecc compile server.
+
+`aiecc.py --serve` starts a daemon listening on a Unix socket that has the MLIR
+bindings imported and the toolchain discovered.  Every later `aiecc.py`
+invocation first tries to hand its command line, working directory,
+environment and stdio file descriptors to the daemon, which forks a worker
+that runs the compile exactly as the client would have and reports its exit
+status back.  When no daemon is listening (or it belongs to another aiecc
+installation), the client compiles in-process as usual.
+
+The socket hands over the client's environment and terminal, so both sides
+only talk to a peer running as the same user: the socket and its directory
+must be owned by the user and not writable by anyone else, and each side
+checks the other's uid with SO_PEERCRED where the platform has it.
+
+The client side of this module only uses the standard library so that it adds
+no startup cost of its own.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+
+# Identifies the installation serving or sending a request; a daemon never
+# serves clients of another installation.
+_INSTALLATION = os.path.dirname(os.path.realpath(__file__))
+
+_HEADER = struct.Struct("<Q")
+_PEERCRED = struct.Struct("3i")
+
+# Seconds to connect and have the request accepted; an unresponsive server
+# must not hold up the compile.
+_ACCEPT_TIMEOUT = 5
+
+
+def default_socket_path():
+    if path := os.getenv("AIECC_SERVER_SOCKET"):
+        return path
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "aiecc.sock")
+    # A private directory rather than a socket directly in the shared /tmp,
+    # where anyone could have created it first.
+    return os.path.join("/tmp", f"aiecc-{os.getuid()}", "aiecc.sock")
+
+
+def server_timeout():
+    """Seconds a client waits for the server to finish a compile."""
+    return float(os.getenv("AIECC_SERVER_TIMEOUT", 6 * 60 * 60))
+
+
+def _owned_privately(path):
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def is_trusted_socket(socket_path):
+    """True if only the current user can have created or replaced the socket."""
+    try:
+        st = os.stat(socket_path)
+        return (
+            stat.S_ISSOCK(st.st_mode)
+            and st.st_uid == os.getuid()
+            and _owned_privately(os.path.dirname(os.path.abspath(socket_path)))
+        )
+    except OSError:
+        return False
+
+
+def _peer_uid(sock):
+    """The uid of the process at the other end of the socket, if known."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size)
+    _, uid, _ = _PEERCRED.unpack(creds)
+    return uid
+
+
+def _same_user(sock):
+    uid = _peer_uid(sock)
+    return uid is None or uid == os.getuid()
+
+
+def _option_value(argv, name):
+    value = None
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            value = argv[i + 1]
+        elif arg.startswith(name + "="):
+            value = arg[len(name) + 1 :]
+    return value
+
+
+def _recv_exactly(sock, n):
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed by peer")
+        data += chunk
+    return data
+
+
+def _recv_message(sock):
+    """One newline-terminated JSON message, or None if the peer hung up."""
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = sock.recv(1)
+        if not chunk:
+            return None
+        data += chunk
+    return json.loads(data)
+
+
+def _send_message(sock, message):
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def forward_to_server(argv):
+    """Run `aiecc argv` on a compile server.
+
+    Returns the exit status of the compile, or None if no compatible server
+    is available and the caller should compile in-process.
+    """
+    if "--serve" in argv or "--no-server" in argv:
+        return None
+    socket_path = _option_value(argv, "--server-socket") or default_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+    if not is_trusted_socket(socket_path):
+        print(
+            f"aiecc: ignoring compile server socket {socket_path}: it or its "
+            "directory is not owned by and private to the current user",
+            file=sys.stderr,
+        )
+        return None
+
+    request = json.dumps(
+        {
+            "installation": _INSTALLATION,
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }
+    ).encode()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.settimeout(_ACCEPT_TIMEOUT)
+            sock.connect(socket_path)
+            if not _same_user(sock):
+                return None
+            for f in (sys.stdout, sys.stderr):
+                f.flush()
+            socket.send_fds(sock, [_HEADER.pack(len(request))], [0, 1, 2])
+            sock.sendall(request)
+            accepted = _recv_message(sock)
+        except (OSError, ValueError):
+            return None
+        if not accepted or not accepted.get("accepted"):
+            # The server refused the request or died before accepting it.
+            return None
+
+        # From here on the server owns the compile and our stdio, so don't
+        # fall back to compiling in-process a second time.
+        try:
+            sock.settimeout(server_timeout())
+            reply = _recv_message(sock)
+        except socket.timeout:
+            print(
+                f"aiecc: compile server did not finish within {server_timeout()} s "
+                "(see AIECC_SERVER_TIMEOUT)",
+                file=sys.stderr,
+            )
+            return 1
+        except (OSError, ValueError):
+            reply = None
+    if not reply or "returncode" not in reply:
+        print("aiecc: compile server died during the compile", file=sys.stderr)
+        return 1
+    return reply["returncode"]
+
+
+class _CompileHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        # Runs in a forked child of the server.
+        header, fds, _, _ = socket.recv_fds(self.request, _HEADER.size, 3)
+        (length,) = _HEADER.unpack(header)
+        request = json.loads(_recv_exactly(self.request, length))
+        if request.get("installation") != _INSTALLATION or len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            _send_message(self.request, {"accepted": False})
+            return
+        _send_message(self.request, {"accepted": True})
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        for f in (sys.stdout, sys.stderr):
+            f.flush()
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+
+        from aie.compiler.aiecc.main import main
+
+        returncode = 0
+        try:
+            main(request["argv"])
+        except SystemExit as e:
+            if e.code is None:
+                returncode = 0
+            elif isinstance(e.code, int):
+                returncode = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except Exception as e:
+            print(f"aiecc server: {e}", file=sys.stderr)
+            returncode = 1
+        finally:
+            for f in (sys.stdout, sys.stderr):
+                f.flush()
+        _send_message(self.request, {"returncode": returncode})
+
+
+class CompileServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    # Forked workers inherit the imported bindings and discovered toolchain.
+    # ForkingMixIn stops accepting requests while max_children are running,
+    # which is the server's global job limit.
+    def __init__(self, socket_path, max_jobs):
+        self.max_children = max_jobs
+        super().__init__(socket_path, _CompileHandler)
+
+    def server_bind(self):
+        # Never let the socket exist with a looser mode, not even briefly.
+        umask = os.umask(0o077)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def verify_request(self, request, client_address):
+        # Only serve (and receive the environment of) our own user.
+        return _same_user(request)
+
+
+def serve(socket_path, max_jobs, opts):
+    """Serve compile requests on `socket_path` until interrupted."""
+    # Warm up the process that every worker is forked from.
+    from aie.compiler.aiecc.main import discover_toolchain
+
+    discover_toolchain(opts)
+
+    socket_dir = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if not _owned_privately(socket_dir):
+        sys.exit(
+            f"Refusing to serve on {socket_path}: {socket_dir} must be owned by the "
+            "current user and not writable by group or others"
+        )
+
+    if os.path.exists(socket_path):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+            sys.exit(f"An aiecc server is already listening on {socket_path}")
+        except ConnectionRefusedError:
+            # Left behind by a server that didn't shut down cleanly.
+            os.unlink(socket_path)
+
+    with CompileServer(socket_path, max_jobs) as server:
+        print(f"aiecc server listening on {socket_path} ({max_jobs} jobs)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
@@ -31,6 +31,7 @@ from .._mlir_libs._aie import (
     aie_llvm_link,
     generate_bcf,
     generate_cdo,
+    generate_ldscript,
     generate_xaie,
     generate_control_packets,
     translate_npu_to_binary,
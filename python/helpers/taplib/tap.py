@@ -1,17 +1,58 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from copy import deepcopy
 import numpy as np
-import itertools
-from typing import Sequence, Generator
+from typing import Callable, Sequence, Generator
 
 from .utils import (
+    canonicalize_sizes_strides,
+    flatten_tensor_data,
+    strided_view,
     validate_and_clean_sizes_strides,
     validate_offset,
     validate_tensor_dims,
 )
 from .visualization2d import visualize_from_accesses
 
+# Bytes of access arrays kept around, least recently used first to go
+ACCESS_CACHE_MAX_BYTES = 256 * 2**20
+
+
+class _AccessCache:
+    """
+    A bounded LRU cache of access arrays. Access arrays depend only on the pattern,
+    so equal patterns share them; they are read-only so that no caller can change
+    what the others see.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        array = self._entries.get(key)
+        if array is not None:
+            self._entries.move_to_end(key)
+            return array
+        array = compute()
+        array.flags.writeable = False
+        if array.nbytes <= self.max_bytes:
+            self._entries[key] = array
+            self._bytes += array.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+        return array
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+
+_ACCESS_CACHE = _AccessCache(ACCESS_CACHE_MAX_BYTES)
+
 
 class TensorAccessPattern:
     """
@@ -105,6 +146,8 @@ class TensorAccessPattern:
         The access_count ndarray contains the number of times each element is
         accessed by the tensor access pattern.
 
+        Both are cached and shared between equal patterns, so they are read-only.
+
         Returns:
             tuple[np.ndarray, np.ndarray]: access_order, access_count
         """
@@ -116,7 +159,7 @@ class TensorAccessPattern:
         tensor. If an element is accessed more than once, only the last count is reflected.
 
         Returns:
-            np.ndarray: access_order
+            np.ndarray: access_order (read-only)
         """
         access_order_tensor, _ = self._calculate_accesses(
             calc_order=True, calc_count=False
@@ -129,7 +172,7 @@ class TensorAccessPattern:
         accessed by the tensor access pattern.
 
         Returns:
-            np.ndarray: access_count
+            np.ndarray: access_count (read-only)
         """
         _, access_count_tensor = self._calculate_accesses(
             calc_order=False, calc_count=True
@@ -139,43 +182,79 @@ class TensorAccessPattern:
     def _calculate_accesses(
         self, calc_order: bool, calc_count: bool
     ) -> tuple[np.ndarray, np.ndarray]:
-        # This is an internal method for calculating both the access_order and access_count
-        # arrays. If needed, it will create both at once to avoid looping through the tensor
-        # more than necessary.
-
-        # TODO: should access order be a list of lists instead of generate two separate tensors?
-        # TODO: for performance, should cache and return copies? Or just cache?
+        # This is an internal method for getting the access_order and/or access_count
+        # arrays. Both are derived from the same cached access indices.
         if not calc_order and not calc_count:
             raise ValueError("Must select calc_order, calc_count, or both")
 
-        # Initialize access order and count maps; we create them as flat arrays
-        total_elems = np.prod(self._tensor_dims)
         access_order_tensor = None
         if calc_order:
-            access_order_tensor = np.full(total_elems, -1, dtype=self._DTYPE)
-            access_count = 0
+            access_order_tensor = _ACCESS_CACHE.get(
+                ("order", self._DTYPE, self._cache_key()), self._compute_access_order
+            )
         access_count_tensor = None
         if calc_count:
-            access_count_tensor = np.full(total_elems, 0, dtype=self._DTYPE)
+            access_count_tensor = _ACCESS_CACHE.get(
+                ("count", self._DTYPE, self._cache_key()), self._compute_access_count
+            )
+        return access_order_tensor, access_count_tensor
 
-        # Get an iterator for the access indices
-        access_idx_generator = self.access_generator()
+    def _compute_access_order(self) -> np.ndarray:
+        access_indices = self.access_indices()
+        access_order_tensor = np.full(np.prod(self._tensor_dims), -1, dtype=self._DTYPE)
+        # Later accesses overwrite earlier ones, so only the last count is kept
+        np.put(
+            access_order_tensor,
+            access_indices,
+            np.arange(len(access_indices), dtype=self._DTYPE),
+        )
+        # Reshape to match tensor type since we created it initially as a flat array
+        return access_order_tensor.reshape(self._tensor_dims)
 
-        for access_idx in access_idx_generator:
-            # Count the accesses
-            if calc_count:
-                access_count_tensor[access_idx] += 1
-            # Enumerate the accesses
-            if calc_order:
-                access_order_tensor[access_idx] = access_count
-                access_count += 1
+    def _compute_access_count(self) -> np.ndarray:
+        access_count_tensor = np.bincount(
+            self.access_indices(), minlength=np.prod(self._tensor_dims)
+        )
+        return access_count_tensor.astype(self._DTYPE).reshape(self._tensor_dims)
 
-        # Reshape to match tensor type since we created them initially as flat arrays
-        if calc_order:
-            access_order_tensor = access_order_tensor.reshape(self._tensor_dims)
-        if calc_count:
-            access_count_tensor = access_count_tensor.reshape(self._tensor_dims)
-        return access_order_tensor, access_count_tensor
+    def _compute_access_indices(self) -> np.ndarray:
+        total_elems = np.prod(self._tensor_dims)
+
+        # Broadcast one range per dimension against the others; raveling the result
+        # in C order enumerates the accesses like the nested loops would.
+        num_dims = len(self._sizes)
+        indices = np.full((1,) * num_dims, self._offset, dtype=np.int64)
+        for dim, (size, stride) in enumerate(zip(self._sizes, self._strides)):
+            shape = [1] * num_dims
+            shape[dim] = size
+            indices = indices + np.arange(size, dtype=np.int64).reshape(shape) * stride
+        return (indices % total_elems).ravel()
+
+    def _cache_key(
+        self,
+    ) -> tuple[tuple[int, ...], int, tuple[int, ...], tuple[int, ...]]:
+        return (
+            tuple(self._tensor_dims),
+            self._offset,
+            tuple(self._sizes),
+            tuple(self._strides),
+        )
+
+    @staticmethod
+    def clear_access_cache() -> None:
+        """Drop the access arrays cached for all TensorAccessPatterns."""
+        _ACCESS_CACHE.clear()
+
+    def access_indices(self) -> np.ndarray:
+        """The access indices into the flattened tensor that this access pattern
+        represents, in access order.
+
+        Returns:
+            np.ndarray: One index per access (read-only)
+        """
+        return _ACCESS_CACHE.get(
+            ("indices", self._cache_key()), self._compute_access_indices
+        )
 
     def access_generator(self) -> Generator[int, None, None]:
         """This function returns an iterator that returns the access index
@@ -185,21 +264,31 @@ class TensorAccessPattern:
         Yields:
             int: The next access index
         """
-        total_elems = np.prod(self._tensor_dims)
+        yield from self.access_indices()
+
+    def canonical_form(self) -> tuple[int, int, tuple[int, ...], tuple[int, ...]]:
+        """
+        The access pattern reduced to (total elements, offset, sizes, strides), with
+        size-1 dimensions dropped and contiguous dimensions merged. Access patterns
+        with equal canonical forms access the same elements in the same order.
 
-        # Use itertools.product to collapse len(sizes) nested forloop into one forloop
-        for dims in itertools.product(*[range(0, n) for n in self._sizes]):
-            yield (
-                self._offset + np.sum(np.multiply(dims, self._strides))
-            ) % total_elems
+        Returns:
+            tuple[int, int, tuple[int, ...], tuple[int, ...]]: total_elems, offset, sizes, strides
+        """
+        total_elems = int(np.prod(self._tensor_dims))
+        sizes, strides = canonicalize_sizes_strides(
+            self._sizes, self._strides, total_elems
+        )
+        return total_elems, self._offset, sizes, strides
 
     def compare_access_orders(self, other: TensorAccessPattern) -> bool:
         """
         This function creates an alternative way to compare access patterns.
         Sometimes access patterns with different sizes/strides are functionally equivalent;
-        to detect functional equivalency, this function uses iterators produced by
-        access_generator() to compare the access patterns. This is more performant than
-        comparing the numpy array access_order or access_count tensors.
+        to detect functional equivalency, this function first compares the canonical forms
+        of the access patterns (see canonical_form()), which does not depend on the number
+        of accesses. Only if those differ but the patterns may still be equivalent does it
+        compare the access indices produced by access_indices().
 
         Args:
             other (TensorAccessPattern): The TensorAccessPattern to compare to
@@ -210,20 +299,82 @@ class TensorAccessPattern:
         Returns:
             bool: True if the TensorAccessPatterns are functionally equivalent; false otherwise.
         """
-        # This function compares using access generators, which is more performant
-        # than actually generating the access order or access count tensors.
         if not isinstance(other, TensorAccessPattern):
             raise ValueError(
                 "Can only compare access order against another TensorAccessPattern"
             )
-        my_generator = self.access_generator()
-        other_generator = other.access_generator()
-        return all(
-            my_idx == other_idx
-            for my_idx, other_idx in itertools.zip_longest(
-                my_generator, other_generator
+        if self.canonical_form() == other.canonical_form():
+            return True
+
+        # Equivalent patterns have the same number of accesses, starting at the same index
+        if np.prod(self._sizes) != np.prod(other._sizes):
+            return False
+        if self._offset != other._offset:
+            return False
+        return np.array_equal(self.access_indices(), other.access_indices())
+
+    def gather(self, array: np.ndarray) -> np.ndarray:
+        """
+        Apply the access pattern to host data, i.e., read the elements in the order
+        a DMA using this access pattern would.
+
+        If the accesses can be expressed with strides (they do not wrap around the end
+        of the tensor), this is a read-only view of the data; otherwise it is a copy
+        made with a single fancy-index.
+
+        Args:
+            array (np.ndarray): Tensor data, with as many elements as the tensor
+
+        Raises:
+            ValueError: The data does not match the tensor dimensions
+
+        Returns:
+            np.ndarray: The accessed elements, with shape sizes
+        """
+        flat = flatten_tensor_data(array, self._tensor_dims)
+        view = strided_view(flat, self._offset, self._sizes, self._strides)
+        if view is not None:
+            return view
+        return flat[self.access_indices()].reshape(self._sizes)
+
+    def scatter(self, array: np.ndarray, values: np.ndarray) -> None:
+        """
+        Apply the access pattern to host data in the other direction, i.e., write values
+        into the data in the order a DMA using this access pattern would. If an element is
+        accessed more than once, the last value written to it remains.
+
+        Args:
+            array (np.ndarray): Tensor data to write into, with as many elements as the tensor.
+                Must be C-contiguous so that it can be written in place.
+            values (np.ndarray): Values to write, broadcastable to shape sizes
+
+        Raises:
+            ValueError: The data does not match the tensor dimensions or is not C-contiguous
+        """
+        if not isinstance(array, np.ndarray) or not array.flags.c_contiguous:
+            raise ValueError("Can only scatter into a C-contiguous numpy array")
+        flat = flatten_tensor_data(array, self._tensor_dims)
+        values = np.broadcast_to(values, self._sizes)
+        # A strided view can only be written through if no element is accessed twice
+        if self._is_injective():
+            view = strided_view(
+                flat, self._offset, self._sizes, self._strides, writeable=True
             )
-        )
+            if view is not None:
+                view[...] = values
+                return
+        np.put(flat, self.access_indices(), values)
+
+    def _is_injective(self) -> bool:
+        # Sufficient condition: ordered by stride, every dimension steps past all
+        # elements reachable through the smaller strides (like a mixed radix number).
+        _, _, sizes, strides = self.canonical_form()
+        reach = 0
+        for size, stride in sorted(zip(sizes, strides), key=lambda d: d[1]):
+            if stride <= reach:
+                return False
+            reach += (size - 1) * stride
+        return True
 
     def visualize(
         self,
@@ -1,18 +1,22 @@
 from __future__ import annotations
 from collections import abc
 from copy import deepcopy
-import matplotlib.animation as animation
 import numpy as np
-from typing import Callable, Sequence
+from typing import TYPE_CHECKING, Callable, Sequence
 
 from .tap import TensorAccessPattern
 from .utils import (
+    flatten_tensor_data,
+    strided_view,
     validate_and_clean_sizes_strides,
     validate_offset,
     validate_tensor_dims,
 )
 from .visualization2d import animate_from_accesses, visualize_from_accesses
 
+if TYPE_CHECKING:
+    import matplotlib.animation as animation
+
 
 class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
     """
@@ -56,6 +60,9 @@ class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
             ValueError: Parameters are validated
         """
         self._current_step = 0
+        # Combined access arrays, dropped whenever the sequence changes
+        self._access_order = None
+        self._access_count = None
 
         # Check tensor dims, offset, sizes, strides
         self._tensor_dims = validate_tensor_dims(tensor_dims)
@@ -170,6 +177,8 @@ class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
         The access_count ndarray contains the number of times each element is
         accessed by the tensor access pattern.
 
+        Both are cached until the sequence is modified, so they are read-only.
+
         Returns:
             tuple[np.ndarray, np.ndarray]: access_order, access_count
         """
@@ -183,7 +192,7 @@ class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
         The TensorAccessPatterns in the sequence are applied sequentially.
 
         Returns:
-            np.ndarray: access_order
+            np.ndarray: access_order (read-only)
         """
         access_order, _ = self._calc_accesses(calc_order=True, calc_count=False)
         return access_order
@@ -196,7 +205,7 @@ class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
         The TensorAccessPatterns in the sequence are applied sequentially.
 
         Returns:
-            np.ndarray: access_count
+            np.ndarray: access_count (read-only)
         """
         _, access_count = self._calc_accesses(calc_order=False, calc_count=True)
         return access_count
@@ -205,45 +214,99 @@ class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
         self, calc_order: bool, calc_count: bool
     ) -> tuple[np.ndarray, np.ndarray]:
         # This is an internal method for calculating both the access_order and access_count
-        # arrays. If needed, it will create both at once to avoid looping through the tensor
-        # more than necessary.
-
-        # TODO: this function is not particularly efficient, and could be improved.
+        # arrays in one pass over the accesses of all member taps. Results are kept until
+        # the sequence is modified.
         if not calc_order and not calc_count:
             raise ValueError("Must select calc_order, calc_count, or both")
 
         total_elems = np.prod(self._tensor_dims)
-        combined_access_order_tensor = None
-        combined_access_count_tensor = None
-
-        if calc_order:
+        needs_order = calc_order and self._access_order is None
+        needs_count = calc_count and self._access_count is None
+        if needs_order or needs_count:
+            access_indices = self._access_indices()
+        if needs_order:
             combined_access_order_tensor = np.full(
-                total_elems, 0, TensorAccessPattern._DTYPE
-            ).reshape(self._tensor_dims)
-            highest_count = 0
-        if calc_count:
-            combined_access_count_tensor = np.full(
-                total_elems, 0, TensorAccessPattern._DTYPE
-            ).reshape(self._tensor_dims)
-        for t in self._taps:
-            if calc_order and calc_count:
-                t_access_order, t_access_count = t.accesses()
-            elif calc_order:
-                t_access_order = t.access_order()
-            else:
-                t_access_count = t.access_count()
+                total_elems, -1, TensorAccessPattern._DTYPE
+            )
+            # Later accesses overwrite earlier ones, so only the last count is kept
+            np.put(
+                combined_access_order_tensor,
+                access_indices,
+                np.arange(len(access_indices), dtype=TensorAccessPattern._DTYPE),
+            )
+            combined_access_order_tensor = combined_access_order_tensor.reshape(
+                self._tensor_dims
+            )
+            combined_access_order_tensor.flags.writeable = False
+            self._access_order = combined_access_order_tensor
+        if needs_count:
+            combined_access_count_tensor = (
+                np.bincount(access_indices, minlength=total_elems)
+                .astype(TensorAccessPattern._DTYPE)
+                .reshape(self._tensor_dims)
+            )
+            combined_access_count_tensor.flags.writeable = False
+            self._access_count = combined_access_count_tensor
+
+        return (
+            self._access_order if calc_order else None,
+            self._access_count if calc_count else None,
+        )
 
-            if calc_order:
-                t_access_order[t_access_order != -1] += 1 + highest_count
-                t_access_order[t_access_order == -1] = 0
-                combined_access_order_tensor += t_access_order
-                highest_count = np.max(combined_access_order_tensor)
-            if calc_count:
-                combined_access_count_tensor += t_access_count
+    def _access_indices(self) -> np.ndarray:
+        # All accesses of the sequence, in order (none for an empty sequence)
+        return np.concatenate(
+            [np.empty(0, dtype=np.int64)] + [t.access_indices() for t in self._taps]
+        )
+
+    def gather(self, array: np.ndarray) -> np.ndarray:
+        """
+        Apply the TensorAccessPatterns of the sequence, one after the other, to host data,
+        i.e., read the elements in the order a DMA using these access patterns would.
+
+        If all access patterns share sizes and strides, the result has shape
+        (len(self), *sizes). If additionally their offsets advance by a constant step
+        without any access wrapping around the end of the tensor, it is a read-only view
+        of the data; otherwise it is a copy made with a single fancy-index. Access patterns
+        with differing sizes or strides result in a flat array of all accesses.
+
+        Args:
+            array (np.ndarray): Tensor data, with as many elements as the tensor
+
+        Raises:
+            ValueError: The data does not match the tensor dimensions
+
+        Returns:
+            np.ndarray: The accessed elements
+        """
+        flat = flatten_tensor_data(array, self._tensor_dims)
+        if not self._taps:
+            return flat[:0]
+        first = self._taps[0]
+        uniform = all(
+            t.sizes == first.sizes and t.strides == first.strides for t in self._taps
+        )
+        if not uniform:
+            return flat[self._access_indices()]
+
+        offsets = [t.offset for t in self._taps]
+        step = offsets[1] - offsets[0] if len(offsets) > 1 else 0
+        if step >= 0 and all(b - a == step for a, b in zip(offsets, offsets[1:])):
+            view = strided_view(
+                flat,
+                offsets[0],
+                [len(self._taps)] + list(first.sizes),
+                [step] + list(first.strides),
+            )
+            if view is not None:
+                return view
+        return flat[self._access_indices()].reshape(
+            [len(self._taps)] + list(first.sizes)
+        )
 
-        if calc_order:
-            combined_access_order_tensor -= 1
-        return (combined_access_order_tensor, combined_access_count_tensor)
+    def _invalidate_accesses(self):
+        self._access_order = None
+        self._access_count = None
 
     def animate(
         self, title: str | None = None, animate_access_count: bool = False
@@ -343,10 +406,11 @@ class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
         """
         This function creates an alternative way to compare access pattern sequences.
         Sometimes access patterns with different sizes/strides are functionally equivalent;
-        to detect functional equivalency, this function uses iterators produced by
-        access_generator() to compare the access patterns. This is more performant than
-        comparing the numpy array access_order or access_count tensors, particularly
-        when comparing sequences containing multiple tensor access patterns.
+        to detect functional equivalency, this function compares the access patterns pairwise
+        with TensorAccessPattern.compare_access_orders(), which mostly avoids enumerating the
+        accesses. This is more performant than comparing the numpy array access_order or
+        access_count tensors, particularly when comparing sequences containing multiple
+        tensor access patterns.
 
         Args:
             other (TensorAccessSequence): The TensorAccessSequence to compare to
@@ -379,9 +443,11 @@ class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
                 f"Cannot add TensorAccessPattern with tensor dims {tap.tensor_dims} to TensorAccessSequence with tensor dims {self._tensor_dims}"
             )
         self._taps[idx] = deepcopy(tap)
+        self._invalidate_accesses()
 
     def __delitem__(self, idx: int):
         del self._taps[idx]
+        self._invalidate_accesses()
 
     def insert(self, index: int, value: TensorAccessPattern):
         if self._tensor_dims != value.tensor_dims:
@@ -389,6 +455,7 @@ class TensorAccessSequence(abc.MutableSequence, abc.Iterable):
                 f"Cannot add TensorAccessPattern with tensor dims {value.tensor_dims} to TensorAccessSequence with tensor dims {self._tensor_dims}"
             )
         self._taps.insert(index, value)
+        self._invalidate_accesses()
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -105,6 +105,46 @@ def validate_and_clean_sizes_strides(
     return sizes, strides
 
 
+def canonicalize_sizes_strides(
+    sizes: Sequence[int],
+    strides: Sequence[int],
+    total_elems: int | None = None,
+) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """
+    This is a helper function to produce a canonical form of sizes and strides, so that
+    functionally equivalent access patterns can be recognized without enumerating their
+    accesses. Dimensions of size 1 are dropped and a dimension is merged into the next
+    (inner) one whenever it continues it, i.e., stride[i] == sizes[i+1] * strides[i+1]
+    (modulo total_elems, if given).
+
+    Args:
+        sizes (Sequence[int]): The transformation sizes
+        strides (Sequence[int]): The transformation strides
+        total_elems (int | None, optional): Number of elements of the tensor the accesses wrap around. If given, strides are reduced modulo it. Defaults to None.
+
+    Returns:
+        tuple[tuple[int, ...], tuple[int, ...]]: The canonical sizes and strides, outermost dimension first.
+    """
+    canonical_sizes = []
+    canonical_strides = []
+    # Walk from the innermost dimension out, merging into the last kept dimension
+    for size, stride in reversed(list(zip(sizes, strides))):
+        if size == 1:
+            continue
+        if total_elems:
+            stride %= total_elems
+        if canonical_sizes:
+            continued = canonical_sizes[-1] * canonical_strides[-1]
+            if total_elems:
+                continued %= total_elems
+        if canonical_sizes and stride == continued:
+            canonical_sizes[-1] *= size
+        else:
+            canonical_sizes.append(size)
+            canonical_strides.append(stride)
+    return tuple(reversed(canonical_sizes)), tuple(reversed(canonical_strides))
+
+
 def validate_tensor_dims(
     tensor_dims: Sequence[int], expected_dims: int | None = None
 ) -> Sequence[int]:
@@ -173,3 +213,58 @@ def validate_offset(offset: int, tensor_dims: Sequence[int] | None) -> int:
                 f"Offset too large: {offset}. Max value allowed for tensor: {np.prod(tensor_dims)}"
             )
     return offset
+
+
+def flatten_tensor_data(array: np.ndarray, tensor_dims: Sequence[int]) -> np.ndarray:
+    """
+    This is a helper function to validate host data against the dimensions of the tensor
+    an access pattern applies to, and to return it as a flat array (a view if possible).
+
+    Args:
+        array (np.ndarray): The tensor data. Any shape with the right number of elements is accepted.
+        tensor_dims (Sequence[int]): The dimensions of the tensor.
+
+    Raises:
+        ValueError: The number of elements does not match the tensor dimensions.
+
+    Returns:
+        np.ndarray: The data as a 1-dimensional array, in C order.
+    """
+    array = np.asarray(array)
+    if array.size != np.prod(tensor_dims):
+        raise ValueError(
+            f"Data of shape {array.shape} does not match tensor dimensions {tensor_dims}"
+        )
+    return array.reshape(-1)
+
+
+def strided_view(
+    flat: np.ndarray,
+    offset: int,
+    sizes: Sequence[int],
+    strides: Sequence[int],
+    writeable: bool = False,
+) -> np.ndarray | None:
+    """
+    This is a helper function to express an access pattern over flat data as a strided
+    view, without copying the data.
+
+    Args:
+        flat (np.ndarray): 1-dimensional data
+        offset (int): Offset of the first access
+        sizes (Sequence[int]): The transformation sizes
+        strides (Sequence[int]): The transformation strides, in elements
+        writeable (bool, optional): Whether the view may be written through. Defaults to False.
+
+    Returns:
+        np.ndarray | None: The view, with shape sizes, or None if the accesses wrap around the end of the data.
+    """
+    last = offset + sum((size - 1) * stride for size, stride in zip(sizes, strides))
+    if last >= len(flat):
+        return None
+    return np.lib.stride_tricks.as_strided(
+        flat[offset:],
+        shape=tuple(sizes),
+        strides=tuple(stride * flat.strides[0] for stride in strides),
+        writeable=writeable,
+    )
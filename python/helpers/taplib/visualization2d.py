@@ -1,18 +1,26 @@
-import matplotlib.animation as animation
-import matplotlib.patheffects as pe
-import matplotlib.pyplot as plt
+from __future__ import annotations
+
 import numpy as np
 import os
 import sys
+from typing import TYPE_CHECKING
 
 from .utils import ceildiv
 
+# matplotlib is slow to import and only needed to visualize, so it is imported
+# on first use rather than with aie.iron.
+if TYPE_CHECKING:
+    import matplotlib.animation as animation
+
 
 def animate_from_accesses(
     access_order_tensors: list[np.ndarray],
     access_count_tensors: list[np.ndarray] | None,
     title: str = "Animated Access Visualization",
 ) -> animation.FuncAnimation:
+    import matplotlib.animation as animation
+    import matplotlib.pyplot as plt
+
     if len(access_order_tensors) < 1:
         raise ValueError("At least one access order tensor is required.")
     if not (access_count_tensors is None):
@@ -86,6 +94,9 @@ def visualize_from_accesses(
     file_path: str | None = None,
     show_plot: bool = True,
 ):
+    import matplotlib.patheffects as pe
+    import matplotlib.pyplot as plt
+
     tensor_height, tensor_width = access_order_tensor.shape
     if tensor_height * tensor_width >= 1024:
         if show_arrows:
@@ -0,0 +1,635 @@
+# tiling.py -*- Python -*-
+#
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+"""
+Tiling design-space exploration.
+
+Every loop of a loop nest (e.g., the m, n and k loops of a matmul) is split into
+four factors whose product is the loop bound, from the outermost to the
+innermost memory level:
+
+    L3:      iterations over the tiles brought from external memory into L2
+    L2:      iterations over the tiles brought from L2 into the cores' L1
+    spatial: iterations spread over the compute cores
+    L1:      iterations over the tile held in a core's local memory
+
+A tensor's tile at a level is the product of the factors inside that level of
+the loops the tensor depends on (its row of the tensor/IV matrix). Tilings are
+feasible when every tile fits its share of the memory, the spatial factors fit
+the cores and, optionally, the traffic each tile causes can be sustained by the
+memory bandwidth. All of these are linear in the log2 of the factors, so the
+search is over how many of each prime factor of a loop go to each level.
+
+Three solvers share the same model: OR-Tools CP-SAT (the default), Gurobi
+(optional) and an exhaustive NumPy enumeration for small spaces. All of them
+return the same ranked Pareto set (see explore()).
+"""
+
+from dataclasses import dataclass
+import math
+import time
+from typing import Sequence
+
+import numpy as np
+
+# Memory levels a loop is split over, outermost first.
+LEVELS = ("L3", "L2", "spatial", "L1")
+_L3, _L2, _SPATIAL, _L1 = range(len(LEVELS))
+
+# Fixed-point scale of the log2 values in the CP-SAT model.
+_LOG_SCALE = 1000
+
+# Relative slack when checking the exact constraints in floating point.
+_EPS = 1e-9
+
+
+@dataclass(frozen=True)
+class MemoryHierarchy:
+    """The memory and compute resources a loop nest is tiled over.
+
+    Capacities are in bytes, bandwidths in bytes per cycle. The ratios give each
+    tensor's share of a memory (and of its bandwidth); they default to an equal
+    share per tensor.
+    """
+
+    l2_bytes: int
+    l1_bytes: int
+    cores: int
+    l2_ratios: Sequence[float] | None = None
+    l1_ratios: Sequence[float] | None = None
+    l3_l2_bandwidth: float | None = None
+    l2_l1_bandwidth: float | None = None
+
+    @classmethod
+    def from_target_model(cls, target_model, columns: int | None = None, **kwargs):
+        """Derive the hierarchy of (a partition of) a device from its target model.
+
+        Args:
+            target_model: The AIETargetModel, e.g. from aie.dialects.aie.get_target_model().
+            columns (int | None, optional): Number of columns used. Defaults to all columns.
+            **kwargs: Ratios and bandwidths, passed through to the MemoryHierarchy.
+
+        Returns:
+            MemoryHierarchy: L2 is the memory tiles of the columns, L1 one core's local memory.
+        """
+        if columns is None:
+            columns = target_model.columns()
+        core_rows = sum(
+            1 for r in range(target_model.rows()) if target_model.is_core_tile(0, r)
+        )
+        return cls(
+            l2_bytes=target_model.get_mem_tile_size()
+            * target_model.get_num_mem_tile_rows()
+            * columns,
+            l1_bytes=target_model.get_local_memory_size(),
+            cores=core_rows * columns,
+            **kwargs,
+        )
+
+
+@dataclass(frozen=True)
+class TilingProblem:
+    """A loop nest to tile over a MemoryHierarchy.
+
+    tensor_iv[v][l] is 1 if tensor v is indexed by loop l. element_bytes is the
+    size of one element of each tensor. The objective rewards memory and core
+    utilization and penalizes the temporal iterations (cycles), in log2 scale:
+    compute_factor * log2(cycles) - util_factor * log2(utilization).
+    """
+
+    loop_bounds: Sequence[int]
+    tensor_iv: Sequence[Sequence[int]]
+    hierarchy: MemoryHierarchy
+    element_bytes: Sequence[int] | None = None
+    util_factor: float = 0.5
+    compute_factor: float = 1.0
+
+    def __post_init__(self):
+        if any(b < 1 for b in self.loop_bounds):
+            raise ValueError(f"Loop bounds must be positive: {self.loop_bounds}")
+        for row in self.tensor_iv:
+            if len(row) != len(self.loop_bounds):
+                raise ValueError(
+                    f"Tensor/IV row {row} does not match {len(self.loop_bounds)} loops"
+                )
+        per_tensor = {
+            "element_bytes": self.element_bytes,
+            "l2_ratios": self.hierarchy.l2_ratios,
+            "l1_ratios": self.hierarchy.l1_ratios,
+        }
+        for name, value in per_tensor.items():
+            if value is not None and len(value) != len(self.tensor_iv):
+                raise ValueError(
+                    f"{name} needs one entry per tensor, got {len(value)} for {len(self.tensor_iv)}"
+                )
+
+    @property
+    def num_tensors(self) -> int:
+        return len(self.tensor_iv)
+
+    def _ratios(self, ratios):
+        if ratios is None:
+            return [1.0 / self.num_tensors] * self.num_tensors
+        return list(ratios)
+
+    @property
+    def l2_budgets(self) -> list[float]:
+        """Bytes of L2 available to each tensor's tile."""
+        return [
+            self.hierarchy.l2_bytes * r for r in self._ratios(self.hierarchy.l2_ratios)
+        ]
+
+    @property
+    def l1_budgets(self) -> list[float]:
+        """Bytes of L1 available to each tensor's tile."""
+        return [
+            self.hierarchy.l1_bytes * r for r in self._ratios(self.hierarchy.l1_ratios)
+        ]
+
+    @property
+    def bytes_per_element(self) -> list[int]:
+        if self.element_bytes is None:
+            return [1] * self.num_tensors
+        return list(self.element_bytes)
+
+
+def matmul_problem(
+    m: int,
+    k: int,
+    n: int,
+    hierarchy: MemoryHierarchy,
+    element_bytes: Sequence[int] = (2, 2, 4),
+    **kwargs,
+) -> TilingProblem:
+    """The tiling problem of C[m, n] += A[m, k] * B[k, n].
+
+    Loops are ordered (m, k, n) and tensors (A, B, C), so Tiling.tile_sizes()
+    returns (m, k, n) tile sizes.
+    """
+    return TilingProblem(
+        loop_bounds=[m, k, n],
+        tensor_iv=[[1, 1, 0], [0, 1, 1], [1, 0, 1]],
+        hierarchy=hierarchy,
+        element_bytes=element_bytes,
+        **kwargs,
+    )
+
+
+@dataclass(frozen=True)
+class Tiling:
+    """A feasible tiling and its metrics.
+
+    factors[l] are the (L3, L2, spatial, L1) factors of loop l. Tile sizes are
+    in bytes per tensor; traffic is in bytes per cycle summed over the tensors.
+    """
+
+    factors: tuple[tuple[int, int, int, int], ...]
+    cycles: int
+    cores: int
+    l2_tile_bytes: tuple[int, ...]
+    l1_tile_bytes: tuple[int, ...]
+    l3_l2_traffic: float
+    l2_l1_traffic: float
+    objective: float
+
+    def tile_sizes(self, level: str = "L1") -> tuple[int, ...]:
+        """The extent of every loop within one tile at a level.
+
+        "L1" is one core's tile, "spatial" the tile of all cores together and
+        "L2" the tile held in L2.
+        """
+        inner = LEVELS.index(level)
+        return tuple(math.prod(f[inner:]) for f in self.factors)
+
+    def _pareto_metrics(self):
+        return (self.cycles, self.l3_l2_traffic, self.l2_l1_traffic)
+
+    def dominates(self, other: "Tiling") -> bool:
+        """True if this tiling is no worse in cycles and traffic and better in one."""
+        mine, theirs = self._pareto_metrics(), other._pareto_metrics()
+        return all(a <= b for a, b in zip(mine, theirs)) and mine != theirs
+
+
+def _prime_factors(n: int) -> dict[int, int]:
+    factors = {}
+    p = 2
+    while p * p <= n:
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+        p += 1
+    if n > 1:
+        factors[n] = factors.get(n, 0) + 1
+    return factors
+
+
+def evaluate(problem: TilingProblem, factors) -> Tiling | None:
+    """Compute the metrics of a tiling, or None if it violates a constraint.
+
+    Args:
+        problem (TilingProblem): The problem the tiling is for.
+        factors: Per loop, the (L3, L2, spatial, L1) factors.
+
+    Raises:
+        ValueError: If the factors of a loop do not multiply to its bound.
+    """
+    factors = tuple(tuple(int(f) for f in loop) for loop in factors)
+    for bound, loop in zip(problem.loop_bounds, factors):
+        if len(loop) != len(LEVELS) or math.prod(loop) != bound:
+            raise ValueError(f"Factors {loop} do not split the loop bound {bound}")
+
+    def tile(iv, levels):
+        return math.prod(
+            math.prod(loop[i] for i in levels) for dep, loop in zip(iv, factors) if dep
+        )
+
+    def iterations(levels):
+        return math.prod(math.prod(loop[i] for i in levels) for loop in factors)
+
+    sizes = problem.bytes_per_element
+    l2_tiles = [tile(iv, (_L2, _SPATIAL, _L1)) for iv in problem.tensor_iv]
+    l1_tiles = [tile(iv, (_L1,)) for iv in problem.tensor_iv]
+    l2_bytes = tuple(t * s for t, s in zip(l2_tiles, sizes))
+    l1_bytes = tuple(t * s for t, s in zip(l1_tiles, sizes))
+    cores = iterations((_SPATIAL,))
+    # An L2 tile has to arrive while the previous one is computed, over its L2
+    # and L1 iterations; the cores' L1 tiles while the previous L1 tiles are.
+    l3_l2 = [b / iterations((_L2, _L1)) for b in l2_bytes]
+    l2_l1 = [
+        tile(iv, (_SPATIAL, _L1)) * s / iterations((_L1,))
+        for iv, s in zip(problem.tensor_iv, sizes)
+    ]
+
+    def fits(value, budget):
+        return value <= budget * (1 + _EPS)
+
+    hierarchy = problem.hierarchy
+    ratios = problem._ratios
+    if not fits(cores, hierarchy.cores):
+        return None
+    if not all(map(fits, l2_bytes, problem.l2_budgets)):
+        return None
+    if not all(map(fits, l1_bytes, problem.l1_budgets)):
+        return None
+    if hierarchy.l3_l2_bandwidth is not None and not all(
+        fits(t, hierarchy.l3_l2_bandwidth * r)
+        for t, r in zip(l3_l2, ratios(hierarchy.l2_ratios))
+    ):
+        return None
+    if hierarchy.l2_l1_bandwidth is not None and not all(
+        fits(t, hierarchy.l2_l1_bandwidth * r)
+        for t, r in zip(l2_l1, ratios(hierarchy.l1_ratios))
+    ):
+        return None
+
+    cycles = iterations((_L3, _L2, _L1))
+    utilization = sum(math.log2(t) for t in l2_tiles + l1_tiles) + math.log2(cores)
+    objective = (
+        problem.compute_factor * math.log2(cycles) - problem.util_factor * utilization
+    )
+    return Tiling(
+        factors=factors,
+        cycles=cycles,
+        cores=cores,
+        l2_tile_bytes=l2_bytes,
+        l1_tile_bytes=l1_bytes,
+        l3_l2_traffic=sum(l3_l2),
+        l2_l1_traffic=sum(l2_l1),
+        objective=objective,
+    )
+
+
+def _rank_key(tiling: Tiling):
+    return (round(tiling.objective, 9), *tiling._pareto_metrics(), tiling.factors)
+
+
+def pareto_set(tilings: Sequence[Tiling]) -> list[Tiling]:
+    """The tilings no other one dominates, best objective first.
+
+    Of tilings with the same cycles and traffic, only the best ranked is kept.
+    """
+    best = {}
+    for t in sorted(tilings, key=_rank_key):
+        best.setdefault(t._pareto_metrics(), t)
+    front = [t for t in best.values() if not any(o.dominates(t) for o in tilings)]
+    return sorted(front, key=_rank_key)
+
+
+def _split(exponents: dict[int, Sequence[int]]) -> tuple[int, int, int, int]:
+    """Loop factors from how many of each prime go to each level."""
+    return tuple(
+        math.prod(p ** counts[i] for p, counts in exponents.items())
+        for i in range(len(LEVELS))
+    )
+
+
+def _log_terms(problem: TilingProblem, levels, loops=None):
+    """(loop, prime, level, log2(prime)) of the factors in levels of loops."""
+    for l, bound in enumerate(problem.loop_bounds):
+        if loops is not None and not loops[l]:
+            continue
+        for p in _prime_factors(bound):
+            for i in levels:
+                yield l, p, i, math.log2(p)
+
+
+def _log_constraints(problem: TilingProblem):
+    """The model in log2 scale: (terms, negative terms, bound) per constraint.
+
+    A constraint is sum(terms) - sum(negative terms) <= bound, where a term is
+    (loop, prime, level, coefficient) and sums are over the exponent variables.
+    """
+    hierarchy = problem.hierarchy
+    sizes = problem.bytes_per_element
+    constraints = [
+        (list(_log_terms(problem, (_SPATIAL,))), [], math.log2(hierarchy.cores))
+    ]
+    for iv, size, budget in zip(problem.tensor_iv, sizes, problem.l2_budgets):
+        terms = list(_log_terms(problem, (_L2, _SPATIAL, _L1), iv))
+        constraints.append((terms, [], math.log2(budget / size)))
+    for iv, size, budget in zip(problem.tensor_iv, sizes, problem.l1_budgets):
+        terms = list(_log_terms(problem, (_L1,), iv))
+        constraints.append((terms, [], math.log2(budget / size)))
+    if hierarchy.l3_l2_bandwidth is not None:
+        ratios = problem._ratios(hierarchy.l2_ratios)
+        for iv, size, r in zip(problem.tensor_iv, sizes, ratios):
+            terms = list(_log_terms(problem, (_L2, _SPATIAL, _L1), iv))
+            cycles = list(_log_terms(problem, (_L2, _L1)))
+            bound = math.log2(hierarchy.l3_l2_bandwidth * r / size)
+            constraints.append((terms, cycles, bound))
+    if hierarchy.l2_l1_bandwidth is not None:
+        ratios = problem._ratios(hierarchy.l1_ratios)
+        for iv, size, r in zip(problem.tensor_iv, sizes, ratios):
+            terms = list(_log_terms(problem, (_SPATIAL, _L1), iv))
+            cycles = list(_log_terms(problem, (_L1,)))
+            bound = math.log2(hierarchy.l2_l1_bandwidth * r / size)
+            constraints.append((terms, cycles, bound))
+    return constraints
+
+
+def _log_objective(problem: TilingProblem):
+    """The objective as (loop, prime, level, coefficient) terms."""
+    terms = [
+        (l, p, i, problem.compute_factor * c)
+        for l, p, i, c in _log_terms(problem, (_L3, _L2, _L1))
+    ]
+    util = []
+    for iv in problem.tensor_iv:
+        util += _log_terms(problem, (_L2, _SPATIAL, _L1), iv)
+        util += _log_terms(problem, (_L1,), iv)
+    util += _log_terms(problem, (_SPATIAL,))
+    terms += [(l, p, i, -problem.util_factor * c) for l, p, i, c in util]
+    return terms
+
+
+def _solve_cp_sat(problem: TilingProblem, num_solutions, timeout, num_workers):
+    from ortools.sat.python import cp_model
+
+    model = cp_model.CpModel()
+    n = {}
+    for l, bound in enumerate(problem.loop_bounds):
+        for p, count in _prime_factors(bound).items():
+            levels = [
+                model.NewIntVar(0, count, f"n_{l}_{p}_{i}") for i in range(len(LEVELS))
+            ]
+            model.Add(sum(levels) == count)
+            for i, var in enumerate(levels):
+                n[(l, p, i)] = var
+
+    # Round conservatively so that whatever CP-SAT accepts is feasible; the
+    # exact check in evaluate() has the last word.
+    for terms, negative, bound in _log_constraints(problem):
+        expr = sum(math.ceil(c * _LOG_SCALE) * n[(l, p, i)] for l, p, i, c in terms)
+        expr -= sum(
+            math.floor(c * _LOG_SCALE) * n[(l, p, i)] for l, p, i, c in negative
+        )
+        model.Add(expr <= math.floor(bound * _LOG_SCALE))
+    model.Minimize(
+        sum(
+            round(c * _LOG_SCALE) * n[(l, p, i)]
+            for l, p, i, c in _log_objective(problem)
+        )
+    )
+
+    variables = list(n.values())
+    keys = list(n.keys())
+    tilings = []
+    found = 0
+    # Objective of the last of the num_solutions best; solutions tied with it
+    # are collected too, or the Pareto filter could miss the one among them
+    # with the least traffic.
+    cut = None
+    deadline = time.time() + timeout
+    solver = cp_model.CpSolver()
+    if num_workers:
+        solver.parameters.num_workers = num_workers
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        solver.parameters.max_time_in_seconds = remaining
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            break
+        if cut is not None and solver.ObjectiveValue() > cut:
+            break
+        found += 1
+        if found == num_solutions:
+            cut = solver.ObjectiveValue()
+        values = [solver.Value(v) for v in variables]
+        tiling = evaluate(problem, _factors_from(problem, dict(zip(keys, values))))
+        if tiling is not None:
+            tilings.append(tiling)
+        # Exclude this solution for the next best one.
+        model.AddForbiddenAssignments(variables, [values])
+    return tilings
+
+
+def _solve_gurobi(problem: TilingProblem, num_solutions, timeout, num_workers):
+    import gurobipy as gp
+    from gurobipy import GRB
+
+    model = gp.Model("tiling")
+    model.Params.OutputFlag = 0
+    model.Params.TimeLimit = timeout
+    model.Params.PoolSearchMode = 2
+    model.Params.PoolSolutions = num_solutions
+    if num_workers:
+        model.Params.Threads = num_workers
+    n = {}
+    for l, bound in enumerate(problem.loop_bounds):
+        for p, count in _prime_factors(bound).items():
+            levels = [
+                model.addVar(lb=0, ub=count, vtype=GRB.INTEGER, name=f"n_{l}_{p}_{i}")
+                for i in range(len(LEVELS))
+            ]
+            model.addConstr(gp.quicksum(levels) == count)
+            for i, var in enumerate(levels):
+                n[(l, p, i)] = var
+    for terms, negative, bound in _log_constraints(problem):
+        expr = gp.quicksum(c * n[(l, p, i)] for l, p, i, c in terms)
+        expr -= gp.quicksum(c * n[(l, p, i)] for l, p, i, c in negative)
+        model.addConstr(expr <= bound + _EPS)
+    model.setObjective(
+        gp.quicksum(c * n[(l, p, i)] for l, p, i, c in _log_objective(problem)),
+        GRB.MINIMIZE,
+    )
+    deadline = time.time() + timeout
+    model.optimize()
+    if model.SolCount >= num_solutions:
+        # Search again for every solution tied with the last of the best ones,
+        # or the Pareto filter could miss the one among them with the least
+        # traffic.
+        model.Params.SolutionNumber = num_solutions - 1
+        model.Params.PoolGapAbs = model.PoolObjVal - model.ObjVal + _EPS
+        model.Params.PoolSolutions = GRB.MAXINT
+        model.Params.TimeLimit = max(deadline - time.time(), 0)
+        model.optimize()
+
+    tilings = []
+    for s in range(model.SolCount):
+        model.Params.SolutionNumber = s
+        counts = {key: round(var.Xn) for key, var in n.items()}
+        tiling = evaluate(problem, _factors_from(problem, counts))
+        if tiling is not None:
+            tilings.append(tiling)
+    return tilings
+
+
+def _factors_from(problem: TilingProblem, counts):
+    """Loop factors from the exponent variables' values, keyed (loop, prime, level)."""
+    return [
+        _split(
+            {
+                p: [counts[(l, p, i)] for i in range(len(LEVELS))]
+                for p in _prime_factors(bound)
+            }
+        )
+        for l, bound in enumerate(problem.loop_bounds)
+    ]
+
+
+def _loop_splits(bound: int) -> np.ndarray:
+    """All (L3, L2, spatial, L1) factorizations of a loop bound."""
+    splits = [(bound,)]
+    for _ in range(len(LEVELS) - 1):
+        splits = [
+            s[:-1] + (d, s[-1] // d)
+            for s in splits
+            for d in range(1, s[-1] + 1)
+            if s[-1] % d == 0
+        ]
+    return np.array(splits, dtype=np.int64)
+
+
+def num_tilings(loop_bounds: Sequence[int]) -> int:
+    """Size of the tiling space, i.e. what the enumerator has to go through."""
+    return math.prod(len(_loop_splits(b)) for b in loop_bounds)
+
+
+def _solve_enumerate(problem: TilingProblem, num_solutions, max_tilings):
+    size = num_tilings(problem.loop_bounds)
+    if size > max_tilings:
+        raise ValueError(
+            f"{size} tilings are too many to enumerate (max_tilings={max_tilings}); use solver='cp-sat'"
+        )
+    splits = [_loop_splits(b) for b in problem.loop_bounds]
+    index = np.stack(
+        np.meshgrid(*[np.arange(len(s)) for s in splits], indexing="ij"), axis=-1
+    ).reshape(-1, len(splits))
+    # factors[t, l, i]: factor of loop l at level i in tiling t.
+    factors = np.stack([s[index[:, l]] for l, s in enumerate(splits)], axis=1)
+    logs = np.log2(factors)
+
+    def tile(iv, levels):
+        per_loop = logs[:, :, levels].sum(axis=2)
+        return per_loop[:, np.asarray(iv, dtype=bool)].sum(axis=1)
+
+    def iterations(levels):
+        return logs[:, :, levels].sum(axis=(1, 2))
+
+    hierarchy = problem.hierarchy
+    sizes = np.log2(problem.bytes_per_element)
+    l2_tiles = [tile(iv, [_L2, _SPATIAL, _L1]) for iv in problem.tensor_iv]
+    l1_tiles = [tile(iv, [_L1]) for iv in problem.tensor_iv]
+    slack = np.log2(1 + _EPS)
+    feasible = iterations([_SPATIAL]) <= np.log2(hierarchy.cores) + slack
+    for t, s, b in zip(l2_tiles, sizes, problem.l2_budgets):
+        feasible &= t + s <= np.log2(b) + slack
+    for t, s, b in zip(l1_tiles, sizes, problem.l1_budgets):
+        feasible &= t + s <= np.log2(b) + slack
+    if hierarchy.l3_l2_bandwidth is not None:
+        cycles = iterations([_L2, _L1])
+        ratios = problem._ratios(hierarchy.l2_ratios)
+        for t, s, r in zip(l2_tiles, sizes, ratios):
+            feasible &= t + s - cycles <= np.log2(hierarchy.l3_l2_bandwidth * r) + slack
+    if hierarchy.l2_l1_bandwidth is not None:
+        cycles = iterations([_L1])
+        ratios = problem._ratios(hierarchy.l1_ratios)
+        for iv, s, r in zip(problem.tensor_iv, sizes, ratios):
+            data = tile(iv, [_SPATIAL, _L1]) + s
+            feasible &= data - cycles <= np.log2(hierarchy.l2_l1_bandwidth * r) + slack
+
+    utilization = sum(l2_tiles) + sum(l1_tiles) + iterations([_SPATIAL])
+    objective = (
+        problem.compute_factor * iterations([_L3, _L2, _L1])
+        - problem.util_factor * utilization
+    )
+    candidates = np.flatnonzero(feasible)
+    best = candidates[np.argsort(objective[candidates], kind="stable")]
+    # Keep ties at the cut so the Pareto filter sees all of them.
+    if len(best) > num_solutions:
+        cut = objective[best[num_solutions - 1]] + 1e-9
+        best = best[objective[best] <= cut]
+    tilings = [evaluate(problem, factors[t]) for t in best]
+    return [t for t in tilings if t is not None]
+
+
+SOLVERS = ("cp-sat", "gurobi", "enumerate")
+
+
+def explore(
+    problem: TilingProblem,
+    solver: str = "cp-sat",
+    num_solutions: int = 10,
+    timeout: float = 60,
+    num_workers: int | None = None,
+    max_tilings: int = 2_000_000,
+) -> list[Tiling]:
+    """Search the tiling space of a problem.
+
+    The num_solutions best tilings by objective are collected, along with any
+    tied with the last of them, and those that no other collected tiling beats
+    in cycles and traffic are returned, best objective first. Of tilings with
+    the same cycles and traffic, only one is returned.
+
+    Args:
+        problem (TilingProblem): The loop nest and hierarchy to tile.
+        solver (str, optional): One of "cp-sat", "gurobi" (requires gurobipy) or "enumerate". Defaults to "cp-sat".
+        num_solutions (int, optional): Number of best tilings to collect, not counting ties. Defaults to 10.
+        timeout (float, optional): Seconds the cp-sat and gurobi solvers may take. Defaults to 60.
+        num_workers (int | None, optional): Solver threads. Defaults to the solver's choice.
+        max_tilings (int, optional): Largest space "enumerate" accepts (see num_tilings()). Defaults to 2,000,000.
+
+    Raises:
+        ValueError: On an unknown solver, or a space too large to enumerate.
+
+    Returns:
+        list[Tiling]: The ranked Pareto set; empty if no tiling is feasible.
+    """
+    if num_solutions < 1:
+        raise ValueError(f"num_solutions must be positive, got {num_solutions}")
+    if solver == "cp-sat":
+        tilings = _solve_cp_sat(problem, num_solutions, timeout, num_workers)
+    elif solver == "gurobi":
+        tilings = _solve_gurobi(problem, num_solutions, timeout, num_workers)
+    elif solver == "enumerate":
+        tilings = _solve_enumerate(problem, num_solutions, max_tilings)
+    else:
+        raise ValueError(f"Unknown solver {solver!r}, expected one of {SOLVERS}")
+    return pareto_set(tilings)
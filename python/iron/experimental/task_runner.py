@@ -7,9 +7,11 @@
 # (c) Copyright 2024 Advanced Micro Devices, Inc.
 
 import numpy as np
+import os
+import tempfile
 from typing import Sequence
 
-from ...compiler.aiecc.main import run as aiecc_run
+from ...compiler.aiecc.main import compile_module
 from ...utils.xrt import setup_aie, execute as execute_on_aie
 from ...helpers.taplib import TensorTiler2D
 from ..dataflow import ObjectFifo
@@ -45,9 +47,6 @@ class TaskRunner:
         ]
 
     def run(self):
-        # Compile
-        aiecc_run(self._module, self._aiecc_args(self._XCLBIN, self._INSTS))
-
         MAX_INPUTS = 2
         MAX_OUTPUTS = 1
 
@@ -72,11 +71,17 @@ class TaskRunner:
         kwargs[f"out_buf_shape"] = self._output_arrs[0]._shape
         kwargs[f"out_buf_dtype"] = self._output_arrs[0]._dtype
 
-        app = setup_aie(
-            self._XCLBIN,
-            self._INSTS,
-            **kwargs,
-        )
+        # Compile into a temporary directory; the instructions are kept in
+        # memory and the xclbin is only needed until it is registered.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = compile_module(
+                self._module, self._aiecc_args(self._XCLBIN, self._INSTS), tmpdir
+            )
+            app = setup_aie(
+                os.path.join(tmpdir, self._XCLBIN),
+                result.insts,
+                **kwargs,
+            )
 
         # Execute program and collect output
         aie_output = execute_on_aie(app, *[arr.asnumpy() for arr in self._input_arrs])
@@ -1,82 +1,190 @@
 # Copyright (C) 2022, Advanced Micro Devices, Inc.
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+import heapq
 import inspect
-import multiprocessing
+import json
 import numbers
 import os
-from collections import defaultdict
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict, namedtuple
 from typing import List, Tuple, Dict, Set, TypeVar
 
+from .compiler.aiecc.cache import ArtifactCache
+
+
+def switchbox_capacities(max_cols, max_rows, target_model):
+    """Query the target model for the capacity of every inter-switchbox link.
+
+    Returns (col, row) int arrays, by the bundle of the edge they become in
+    build_graph, of the number of connections:
+      South: outgoing on the south side of (c, r), i.e., rhs of connect ops
+      North: incoming on the south side of (c, r), i.e., lhs of connect ops
+             routed through the switchbox
+      East:  incoming on the west side of (c, r)
+      West:  outgoing on the west side of (c, r)
+    Row 0 has no south and column 0 no west neighbour, so those stay 0.
+    """
+    import numpy as np
+    from ._mlir_libs._aie_python_passes import WireBundle
+
+    shape = (max_cols + 1, max_rows + 1)
+    caps = {
+        b: np.zeros(shape, dtype=np.int32) for b in ("South", "North", "East", "West")
+    }
+    dest = target_model.get_num_dest_switchbox_connections
+    source = target_model.get_num_source_switchbox_connections
+    for c in range(max_cols + 1):
+        for r in range(max_rows + 1):
+            if r > 0:
+                caps["South"][c, r] = dest(c, r, WireBundle.South)
+                caps["North"][c, r] = source(c, r, WireBundle.South)
+            if c > 0:
+                caps["East"][c, r] = source(c, r, WireBundle.West)
+                caps["West"][c, r] = dest(c, r, WireBundle.West)
+    return caps
+
+
+# The edges of every switchbox (c, r) in build_graph, as the bundle and the
+# offsets of the edge's source and target from (c, r).
+_SWITCHBOX_LINKS = (
+    ("South", (0, 0), (0, -1)),
+    ("North", (0, -1), (0, 0)),
+    ("East", (-1, 0), (0, 0)),
+    ("West", (0, 0), (-1, 0)),
+)
+
 
 def build_graph(max_cols, max_rows, target_model):
     import networkx as nx
     from ._mlir_libs._aie_python_passes import WireBundle, Switchbox
 
+    caps = switchbox_capacities(max_cols, max_rows, target_model)
+    switchboxes = [
+        [Switchbox(c, r) for r in range(max_rows + 1)] for c in range(max_cols + 1)
+    ]
+
     DG = nx.DiGraph()
+    DG.add_nodes_from(sb for column in switchboxes for sb in column)
+    bundles = {b: getattr(WireBundle, b) for b, _, _ in _SWITCHBOX_LINKS}
+    edges = []
     for c in range(max_cols + 1):
         for r in range(max_rows + 1):
-            this_switchbox = Switchbox(c, r)
-            DG.add_node(this_switchbox)
-            if r > 0:
-                southern_neighbor = Switchbox(c, r - 1)
-                # Get the number of outgoing connections on the south side - outgoing
-                # because these correspond to rhs of a connect op.
-                if max_capacity := target_model.get_num_dest_switchbox_connections(
-                    c, r, WireBundle.South
-                ):
-                    DG.add_edge(
-                        this_switchbox,
-                        southern_neighbor,
-                        bundle=WireBundle.South,
-                        capacity=max_capacity,
-                    )
-                # Get the number of incoming connections on the south side - incoming
-                # because they correspond to connections on the southside that are then
-                # routed using internal connect ops through the switchbox (i.e., lhs of
-                # connect ops).
-                if max_capacity := target_model.get_num_source_switchbox_connections(
-                    c, r, WireBundle.South
-                ):
-                    DG.add_edge(
-                        southern_neighbor,
-                        this_switchbox,
-                        bundle=WireBundle.North,
-                        capacity=max_capacity,
-                    )
-            if c > 0:
-                western_neighbor = Switchbox(c - 1, r)
-                if max_capacity := target_model.get_num_source_switchbox_connections(
-                    c, r, WireBundle.West
-                ):
-                    DG.add_edge(
-                        western_neighbor,
-                        this_switchbox,
-                        bundle=WireBundle.East,
-                        capacity=max_capacity,
-                    )
-                if max_capacity := target_model.get_num_dest_switchbox_connections(
-                    c, r, WireBundle.West
-                ):
-                    DG.add_edge(
-                        this_switchbox,
-                        western_neighbor,
-                        bundle=WireBundle.West,
-                        capacity=max_capacity,
-                    )
+            for bundle, (uc, ur), (vc, vr) in _SWITCHBOX_LINKS:
+                # Links off the edge of the array have no capacity.
+                if max_capacity := int(caps[bundle][c, r]):
+                    u = switchboxes[c + uc][r + ur]
+                    v = switchboxes[c + vc][r + vr]
+                    attrs = {"bundle": bundles[bundle], "capacity": max_capacity}
+                    edges.append((u, v, attrs))
+    DG.add_edges_from(edges)
 
     return DG
 
 
+def build_edge_index(DG):
+    """Index the edges of `DG` by (switchbox, bundle, "out"/"in").
+
+    Every switchbox has at most one outgoing and one incoming edge per bundle,
+    so each key maps to a single (u, v, data) triple.
+    """
+    index = {}
+    for u, v, e in DG.edges(data=True):
+        index[u, e["bundle"], "out"] = u, v, e
+        index[v, e["bundle"], "in"] = u, v, e
+    return index
+
+
+# Ways of costing flows that share an edge (see route_using_cp).
+ROUTER_FORMULATIONS = ("pairwise", "congestion")
+
+
+# Saved flow paths identify flows and edges by the repr of their endpoints and
+# switchboxes, which is the same in every process.
+def _repr_key(x):
+    return x if isinstance(x, str) else repr(x)
+
+
+def save_flow_paths(path, flow_paths):
+    """Save flow paths (as returned by route_using_*) to a JSON file."""
+    with open(path, "w") as f:
+        json.dump(
+            [
+                {
+                    "src": _repr_key(src),
+                    "tgt": _repr_key(tgt),
+                    "edges": [[_repr_key(u), _repr_key(v)] for u, v in edges],
+                }
+                for (src, tgt), edges in flow_paths.items()
+            ],
+            f,
+            indent=1,
+        )
+
+
+def load_flow_paths(path):
+    """Load flow paths saved by save_flow_paths, e.g., as a routing hint."""
+    with open(path, "r") as f:
+        return {
+            (p["src"], p["tgt"]): [tuple(e) for e in p["edges"]] for p in json.load(f)
+        }
+
+
+def _hint_values(DG, flows, hint):
+    # Yields (flow, edge, 0 or 1) for every edge of every flow that the flow
+    # paths `hint` have a path for.
+    if not hint:
+        return
+    hinted = {
+        (_repr_key(src), _repr_key(tgt)): {(_repr_key(u), _repr_key(v)) for u, v in e}
+        for (src, tgt), e in hint.items()
+    }
+    edge_keys = {(i, j): (repr(i), repr(j)) for i, j in DG.edges}
+    for flow in flows:
+        edges = hinted.get((repr(flow[0]), repr(flow[1])))
+        if edges is None:
+            continue
+        for e, key in edge_keys.items():
+            yield flow, e, int(key in edges)
+
+
 def route_using_cp(
     DG,
     flows,
     min_edges=False,
     seed=42,
-    num_workers=multiprocessing.cpu_count() // 2,
+    num_workers=None,
     timeout=600,
+    formulation="pairwise",
+    stats=None,
+    hint=None,
 ):
+    """Route `flows` on `DG` with CP-SAT.
+
+    Unless `min_edges`, every edge used by d flows costs d + d(d-1)/2, i.e.,
+    one per flow plus one per pair of overlapping flows.  The "pairwise"
+    formulation counts the pairs with a product variable per pair of flows
+    per edge (O(F^2 E) variables); the "congestion" formulation computes the
+    same cost as sum_k max(0, d - k) over the capacity levels k of the edge
+    (O(F E) variables), which scales to many more flows.
+
+    If `stats` is a dict, the model size and build and solve times are
+    recorded in it.  `hint` are the flow paths of a previous routing (e.g.,
+    from load_flow_paths); the solver starts from the paths of the flows that
+    are still routed, so re-routing after a small change is fast.
+    """
     from ortools.sat.python import cp_model
 
+    if num_workers is None:
+        import multiprocessing
+
+        num_workers = multiprocessing.cpu_count() // 2
+    if formulation not in ROUTER_FORMULATIONS:
+        raise ValueError(f"unknown router formulation '{formulation}'")
+    build_start = time.perf_counter()
+
     # Create model object
     model = cp_model.CpModel()
     solver = cp_model.CpSolver()
@@ -128,6 +236,16 @@ def route_using_cp(
         if min_edges:
             # counts whether an edge is used by any flow
             model.AddMaxEquality(used_edges[i, j], [f[i, j] for f in flat_flow_vars])
+        elif formulation == "congestion":
+            # d(d-1)/2 = sum_{k >= 1} max(0, d - k), and d <= capacity; the
+            # minimization drives each congestion counter down to max(0, d - k)
+            congestion = [
+                model.NewIntVar(0, len(flat_flow_vars), "")
+                for _ in range(1, attrs["capacity"])
+            ]
+            for k, c in enumerate(congestion, start=1):
+                model.Add(c >= total_demand[i, j] - k)
+            model.Add(overlapping_demands[i, j] == sum(congestion))
         else:
             # counts the number of overlapping flows
             overlapping_flows = {}
@@ -163,7 +281,23 @@ def route_using_cp(
         obj += sum(overlapping_demands[i, j] for i, j in DG.edges)
     model.Minimize(obj)
 
+    hinted = False
+    for flow, e, value in _hint_values(DG, flows, hint):
+        model.AddHint(flow_vars[flow][e], value)
+        hinted = True
+    if hinted:
+        # The hint may be partial or infeasible after flows or capacities changed.
+        solver.parameters.repair_hint = True
+
+    solve_start = time.perf_counter()
     status = solver.Solve(model)
+    if stats is not None:
+        proto = model.Proto()
+        stats["num_variables"] = len(proto.variables)
+        stats["num_constraints"] = len(proto.constraints)
+        stats["build_seconds"] = solve_start - build_start
+        stats["solve_seconds"] = time.perf_counter() - solve_start
+        stats["status"] = solver.StatusName(status)
     if status in {cp_model.OPTIMAL, cp_model.FEASIBLE}:
         flow_paths = {}
         for flow, flow_varss in flow_vars.items():
@@ -183,10 +317,18 @@ def route_using_ilp(
     DG,
     flows,
     timeout=600,
+    formulation="pairwise",
+    stats=None,
+    hint=None,
 ):
+    """Route `flows` on `DG` with Gurobi; see route_using_cp."""
     import gurobipy as gp
     from gurobipy import GRB
 
+    if formulation not in ROUTER_FORMULATIONS:
+        raise ValueError(f"unknown router formulation '{formulation}'")
+    build_start = time.perf_counter()
+
     m = gp.Model()
     m.setParam("TimeLimit", timeout)
 
@@ -223,15 +365,22 @@ def route_using_ilp(
     for i, j, attrs in DG.edges(data=True):
         m.addConstr(total_demand[i, j] == gp.quicksum(f[i, j] for f in flat_flow_vars))
         m.addConstr(total_demand[i, j] <= attrs["capacity"])
-        # See above for this counts up overlapping demands (gurobi just has a nicer API).
-        m.addConstr(
-            overlapping_demands[i, j]
-            == gp.quicksum(
-                (f1[i, j] * f2[i, j])
-                for k, f1 in enumerate(flat_flow_vars)
-                for f2 in flat_flow_vars[k + 1 :]
+        if formulation == "congestion":
+            # See route_using_cp.
+            congestion = m.addVars(range(1, attrs["capacity"]))
+            for k, c in congestion.items():
+                m.addConstr(c >= total_demand[i, j] - k)
+            m.addConstr(overlapping_demands[i, j] == congestion.sum())
+        else:
+            # See above for this counts up overlapping demands (gurobi just has a nicer API).
+            m.addConstr(
+                overlapping_demands[i, j]
+                == gp.quicksum(
+                    (f1[i, j] * f2[i, j])
+                    for k, f1 in enumerate(flat_flow_vars)
+                    for f2 in flat_flow_vars[k + 1 :]
+                )
             )
-        )
 
     m.setObjective(
         gp.quicksum(
@@ -240,8 +389,19 @@ def route_using_ilp(
         GRB.MINIMIZE,
     )
 
+    for flow, e, value in _hint_values(DG, flows, hint):
+        flow_vars[flow][e].Start = value
+
     # Solve
+    m.update()
+    solve_start = time.perf_counter()
     m.optimize()
+    if stats is not None:
+        stats["num_variables"] = m.NumVars
+        stats["num_constraints"] = m.NumConstrs + m.NumQConstrs
+        stats["build_seconds"] = solve_start - build_start
+        stats["solve_seconds"] = time.perf_counter() - solve_start
+        stats["status"] = m.Status
 
     if m.Status == GRB.INFEASIBLE:
         raise RuntimeError("Couldn't route.")
@@ -254,6 +414,516 @@ def route_using_ilp(
     return flow_paths
 
 
+def route_using_pathfinder(
+    DG,
+    flows,
+    max_iterations=100,
+    present_factor=0.5,
+    present_growth=1.5,
+    history_factor=1.0,
+    stats=None,
+):
+    """Route `flows` on `DG` by PathFinder-style negotiated congestion.
+
+    Flows from the same source are routed as a tree, since they share the
+    channels of their common edges (see get_routing_solution), so an edge's
+    occupancy is the number of sources using it.  Each iteration routes every
+    source whose tree crosses an over-capacity edge along the cheapest paths,
+    where an edge's cost grows with its present overuse and with the overuse
+    accumulated over previous iterations, until no edge exceeds its capacity.
+    The result is legal but not necessarily optimal.
+
+    Raises RuntimeError if no legal routing is found in `max_iterations`.
+    """
+    start = time.perf_counter()
+    capacity = {(u, v): attrs["capacity"] for u, v, attrs in DG.edges(data=True)}
+    successors = {n: list(DG.successors(n)) for n in DG.nodes}
+    occupancy = dict.fromkeys(capacity, 0)
+    history = dict.fromkeys(capacity, 0.0)
+    present = present_factor
+
+    sources = defaultdict(list)
+    for flow in flows:
+        sources[flow[0]].append(flow)
+    source_edges = {src: set() for src in sources}
+    flow_paths = {}
+
+    def edge_cost(e):
+        overuse = max(0, occupancy[e] + 1 - capacity[e])
+        return (1.0 + history[e]) * (1.0 + present * overuse)
+
+    def route_source(src):
+        # Grow a tree from the source switchbox, connecting each target to
+        # the cheapest point of the tree built so far.
+        pred = {src.sb: None}
+        for flow in sources[src]:
+            tgt = flow[1].sb
+            dist = dict.fromkeys(pred, 0.0)
+            reached = {}
+            heap = [(0.0, i, n) for i, n in enumerate(pred)]
+            heapq.heapify(heap)
+            counter = len(heap)
+            while heap:
+                d, _, n = heapq.heappop(heap)
+                if n == tgt:
+                    break
+                if d > dist[n]:
+                    continue
+                for m in successors[n]:
+                    e = (n, m)
+                    if capacity[e] <= 0 or m in pred:
+                        continue
+                    nd = d + edge_cost(e)
+                    if nd < dist.get(m, float("inf")):
+                        dist[m] = nd
+                        reached[m] = n
+                        heapq.heappush(heap, (nd, counter, m))
+                        counter += 1
+            else:
+                if tgt not in pred:
+                    raise RuntimeError("Couldn't route.")
+
+            n = tgt
+            while n not in pred:
+                pred[n] = reached[n]
+                n = reached[n]
+
+            path = []
+            n = tgt
+            while pred[n] is not None:
+                path.append((pred[n], n))
+                n = pred[n]
+            flow_paths[flow] = list(reversed(path))
+
+        return {(p, n) for n, p in pred.items() if p is not None}
+
+    to_route = list(sources)
+    for iteration in range(1, max_iterations + 1):
+        for src in to_route:
+            for e in source_edges[src]:
+                occupancy[e] -= 1
+            source_edges[src] = route_source(src)
+            for e in source_edges[src]:
+                occupancy[e] += 1
+
+        overused = {e for e, occ in occupancy.items() if occ > capacity[e]}
+        if not overused:
+            if stats is not None:
+                stats["iterations"] = iteration
+                stats["build_seconds"] = 0.0
+                stats["solve_seconds"] = time.perf_counter() - start
+                stats["status"] = "FEASIBLE"
+            return flow_paths
+
+        for e in overused:
+            history[e] += history_factor * (occupancy[e] - capacity[e])
+        present *= present_growth
+        to_route = [src for src, edges in source_edges.items() if edges & overused]
+
+    raise RuntimeError("Couldn't route.")
+
+
+# Flows of a region are shipped to worker processes with plain (col, row)
+# switchboxes, since the bindings' objects can't be pickled.
+_RegionEndPoint = namedtuple("_RegionEndPoint", ["sb", "port"])
+_RegionSwitchbox = namedtuple("_RegionSwitchbox", ["col", "row"])
+
+
+def flow_regions(flows, margin=1):
+    """Group `flows` into independent regions of the array.
+
+    Every flow may use the switchboxes of its source and target's bounding
+    box grown by `margin`; flows whose boxes overlap are grouped, and groups
+    are merged until their bounding boxes are disjoint.  Returns a list of
+    (box, flow indices), with box = (min col, min row, max col, max row).
+    """
+
+    def overlap(a, b):
+        return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+    regions = []
+    for k, (src, tgt) in enumerate(flows):
+        c0, c1 = sorted((src.sb.col, tgt.sb.col))
+        r0, r1 = sorted((src.sb.row, tgt.sb.row))
+        regions.append(((c0 - margin, r0 - margin, c1 + margin, r1 + margin), [k]))
+
+    merged = True
+    while merged:
+        merged = False
+        regions.sort(key=lambda region: region[0])
+        out = []
+        for box, members in regions:
+            for i, (other, other_members) in enumerate(out):
+                if overlap(box, other):
+                    box = (
+                        min(box[0], other[0]),
+                        min(box[1], other[1]),
+                        max(box[2], other[2]),
+                        max(box[3], other[3]),
+                    )
+                    out[i] = (box, other_members + members)
+                    merged = True
+                    break
+            else:
+                out.append((box, members))
+        regions = out
+    return [(box, sorted(members)) for box, members in regions]
+
+
+def edge_usage(flow_paths, by_source=False):
+    """Count the flows, or with `by_source` the sources, using each edge.
+
+    The exact routers bound the number of flows on an edge by its capacity;
+    flows from the same source share channels (see get_routing_solution), so
+    the number of sources is what actually has to fit.
+    """
+    users = defaultdict(set)
+    for k, ((src, _), path) in enumerate(flow_paths.items()):
+        for e in path:
+            users[e].add(src if by_source else k)
+    return {e: len(u) for e, u in users.items()}
+
+
+def _plain_region(DG, flows, indices, box=None, used=None):
+    # A picklable copy of the part of `DG` inside `box` and of `flows[indices]`,
+    # with the capacity of each edge reduced by `used`.  Its switchboxes equal
+    # (col, row) tuples and can be split into regions again.
+    import networkx as nx
+
+    def inside(n):
+        return box is None or (box[0] <= n.col <= box[2] and box[1] <= n.row <= box[3])
+
+    def plain_sb(n):
+        return _RegionSwitchbox(n.col, n.row)
+
+    plain = nx.DiGraph()
+    plain.add_nodes_from(plain_sb(n) for n in DG.nodes if inside(n))
+    for u, v, attrs in DG.edges(data=True):
+        if inside(u) and inside(v):
+            capacity = attrs["capacity"] - (used or {}).get((u, v), 0)
+            plain.add_edge(plain_sb(u), plain_sb(v), capacity=capacity)
+    # Flows from the same source keep sharing it; targets carry the index.
+    plain_flows = []
+    for k in indices:
+        src, tgt = flows[k]
+        plain_flows.append(
+            (
+                _RegionEndPoint(plain_sb(src.sb), repr(src)),
+                _RegionEndPoint(plain_sb(tgt.sb), k),
+            )
+        )
+    return plain, plain_flows
+
+
+def _plain_hint(DG, flows, plain_flows, hint):
+    # `hint` for the graph and flows _plain_region made of all of `DG` and
+    # `flows`; edges it has no switchboxes for are dropped.
+    if not hint:
+        return None
+    nodes = {repr(n): _RegionSwitchbox(n.col, n.row) for n in DG.nodes}
+    hinted = {(_repr_key(src), _repr_key(tgt)): e for (src, tgt), e in hint.items()}
+    plain_hint = {}
+    for (src, tgt), plain_flow in zip(flows, plain_flows):
+        edges = hinted.get((repr(src), repr(tgt)))
+        if edges is None:
+            continue
+        plain_hint[plain_flow] = [
+            (nodes[_repr_key(u)], nodes[_repr_key(v)])
+            for u, v in edges
+            if _repr_key(u) in nodes and _repr_key(v) in nodes
+        ]
+    return plain_hint
+
+
+def available_cpus():
+    """The number of CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not on Linux.
+        return os.cpu_count() or 1
+
+
+_MAIN_GUARD = re.compile(r"""__name__\s*==\s*["']__main__["']""")
+
+
+def worker_process_context(preload=()):
+    """The multiprocessing context to start worker processes from, or None.
+
+    Routing and compiling run in processes with threads (OR-Tools, MLIR), which
+    must not fork, so workers come from a forkserver that imports `preload`, or
+    are spawned where there is none.  Both import the parent's __main__ script
+    again, so when it has no `if __name__ == "__main__":` guard and would re-run,
+    None is returned and callers fall back to threads.
+    """
+    import multiprocessing
+
+    if multiprocessing.current_process().daemon:
+        # E.g. a route_with_portfolio strategy; these can't have children.
+        return None
+    path = getattr(sys.modules.get("__main__"), "__file__", None)
+    if path is not None:
+        try:
+            with open(path) as f:
+                if not _MAIN_GUARD.search(f.read()):
+                    return None
+        except (OSError, UnicodeDecodeError):
+            return None
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        if preload:
+            context.set_forkserver_preload(list(preload))
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _route_region(route, DG, flows, kwargs):
+    # Runs in a worker process; returns {flow index: [(u, v), ...]} or None.
+    try:
+        flow_paths = route(DG, flows, **kwargs)
+    except RuntimeError:
+        return None
+    return {tgt.port: path for (_, tgt), path in flow_paths.items()}
+
+
+def route_in_regions(
+    DG, flows, route=None, margin=1, max_workers=None, cpus=None, stats=None, **kwargs
+):
+    """Route `flows` on `DG` region by region, in parallel processes.
+
+    `flows` are split into independent regions with flow_regions, and each
+    region is routed on its own part of `DG` by `route` (route_using_cp by
+    default, called with `kwargs`).  Regions don't share edges, so their
+    paths together respect every capacity.  The flows of regions that can't
+    be routed inside their box are then routed on all of `DG` with the
+    capacity the other regions left, and if that fails too, all flows are
+    routed by a single `route` started from the paths found so far.  The
+    processes come from worker_process_context(); without one, the regions
+    are routed on threads.  The regions routed at the same time share `cpus`
+    (available_cpus() by default).
+
+    Raises RuntimeError if the result would exceed a capacity.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if route is None:
+        route = route_using_cp
+    # Hints can't be shipped to the regions; they go to the fallback only.
+    hint = kwargs.pop("hint", None)
+    start = time.perf_counter()
+    regions = flow_regions(flows, margin)
+    if stats is not None:
+        stats["regions"] = len(regions)
+    if len(regions) <= 1:
+        return route(DG, flows, stats=stats, hint=hint, **kwargs)
+
+    nodes = {(n.col, n.row): n for n in DG.nodes}
+
+    def unplain(path):
+        return [(nodes[u], nodes[v]) for u, v in path]
+
+    flow_paths = {}
+    failed = []
+    if cpus is None:
+        cpus = available_cpus()
+    if max_workers is None:
+        max_workers = min(len(regions), max(1, cpus // 2))
+    if "num_workers" not in kwargs and route is route_using_cp:
+        # Share the cores between the regions routed at the same time.
+        kwargs["num_workers"] = max(1, cpus // (2 * max_workers))
+    context = worker_process_context()
+    if context is not None:
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+    else:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+    with pool:
+        futures = [
+            (
+                indices,
+                pool.submit(
+                    _route_region,
+                    route,
+                    *_plain_region(DG, flows, indices, box),
+                    kwargs,
+                ),
+            )
+            for box, indices in regions
+        ]
+        for indices, future in futures:
+            paths = future.result()
+            if paths is None:
+                failed.extend(indices)
+                continue
+            for k, path in paths.items():
+                flow_paths[flows[k]] = unplain(path)
+
+    if failed:
+        # Reconcile: route the leftover flows around the routed regions.
+        used = edge_usage(flow_paths)
+        paths = _route_region(
+            route, *_plain_region(DG, flows, failed, used=used), kwargs
+        )
+        if paths is not None:
+            for k, path in paths.items():
+                flow_paths[flows[k]] = unplain(path)
+        else:
+            flow_paths = route(DG, flows, hint={**(hint or {}), **flow_paths}, **kwargs)
+
+    used = edge_usage(flow_paths)
+    for u, v, attrs in DG.edges(data=True):
+        if used.get((u, v), 0) > attrs["capacity"]:
+            raise RuntimeError("Couldn't route.")
+    if stats is not None:
+        stats["rerouted_flows"] = len(failed)
+        stats["solve_seconds"] = time.perf_counter() - start
+    return flow_paths
+
+
+def portfolio_strategies(num_workers=None):
+    """The default (name, route, kwargs) strategies of route_with_portfolio.
+
+    The CP-SAT strategies differ in seed and objective and share `num_workers`
+    cores (available_cpus() by default) between them; Gurobi is included when
+    gurobipy is installed.
+    """
+    import importlib.util
+
+    if num_workers is None:
+        num_workers = available_cpus()
+    cp_workers = max(1, num_workers // 3)
+    strategies = [
+        ("pathfinder", route_using_pathfinder, {}),
+        ("cp", route_using_cp, {"seed": 42, "num_workers": cp_workers}),
+        ("cp-seed-7", route_using_cp, {"seed": 7, "num_workers": cp_workers}),
+        (
+            "cp-min-edges",
+            route_using_cp,
+            {"min_edges": True, "num_workers": cp_workers},
+        ),
+    ]
+    if importlib.util.find_spec("gurobipy") is not None:
+        strategies.append(("gurobi", route_using_ilp, {}))
+    return strategies
+
+
+def _run_strategy(conn, route, DG, flows, kwargs, regions=False):
+    # Runs in a portfolio process or thread; sends {flow index: [(u, v), ...]}
+    # or None.
+    try:
+        if regions:
+            # The strategy's workers are shared by its regions.
+            kwargs = dict(kwargs)
+            cpus = kwargs.pop("num_workers", None)
+            flow_paths = route_in_regions(DG, flows, route=route, cpus=cpus, **kwargs)
+        else:
+            flow_paths = route(DG, flows, **kwargs)
+        result = {tgt.port: path for (_, tgt), path in flow_paths.items()}
+    except Exception:
+        # Infeasible, timed out, or e.g. no Gurobi license: lose the race.
+        result = None
+    try:
+        conn.send(result)
+    except OSError:
+        # A thread that lost the race; the portfolio stopped listening.
+        pass
+    conn.close()
+
+
+def route_with_portfolio(
+    DG,
+    flows,
+    strategies=None,
+    timeout=600,
+    formulation="pairwise",
+    stats=None,
+    hint=None,
+    regions=False,
+):
+    """Race several routing strategies and take the first legal routing.
+
+    Every strategy of `strategies` (portfolio_strategies() by default) runs in
+    its own process from worker_process_context(), or on a thread without one.
+    The exact ones get `timeout`, `formulation` and `hint`, and with `regions`
+    route region by region (see route_in_regions).  As soon as one returns
+    paths that fit every edge's capacity, the other processes are terminated;
+    threads run on until their own timeout.  Raises RuntimeError if none
+    succeeds within `timeout`.
+    """
+    import multiprocessing
+    import threading
+    from multiprocessing.connection import wait
+
+    if strategies is None:
+        strategies = portfolio_strategies()
+    start = time.perf_counter()
+    deadline = start + timeout
+    plain_DG, plain_flows = _plain_region(DG, flows, range(len(flows)))
+    plain_hint = _plain_hint(DG, flows, plain_flows, hint)
+    capacity = {(u, v): attrs["capacity"] for u, v, attrs in plain_DG.edges(data=True)}
+    nodes = {(n.col, n.row): n for n in DG.nodes}
+
+    context = worker_process_context()
+    running = {}
+    for name, route, kwargs in strategies:
+        exact = route is not route_using_pathfinder
+        if exact:
+            kwargs = {
+                "timeout": timeout,
+                "formulation": formulation,
+                "hint": plain_hint,
+                **kwargs,
+            }
+        recv, send = multiprocessing.Pipe(duplex=False)
+        args = (send, route, plain_DG, plain_flows, kwargs, regions and exact)
+        if context is not None:
+            worker = context.Process(target=_run_strategy, args=args, daemon=True)
+            worker.start()
+            send.close()
+        else:
+            worker = threading.Thread(target=_run_strategy, args=args, daemon=True)
+            worker.start()
+        running[recv] = name, worker
+
+    winner, paths = None, None
+    try:
+        while running and winner is None:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            for conn in wait(list(running), timeout=remaining):
+                name, worker = running.pop(conn)
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    # The process died without an answer.
+                    result = None
+                conn.close()
+                worker.join()
+                if result is None:
+                    continue
+                plain_paths = {plain_flows[k]: path for k, path in result.items()}
+                usage = edge_usage(plain_paths, by_source=True)
+                if all(n <= capacity[e] for e, n in usage.items()):
+                    winner, paths = name, result
+                    break
+    finally:
+        for conn, (_, worker) in running.items():
+            if context is not None:
+                worker.terminate()
+                worker.join()
+            conn.close()
+
+    if stats is not None:
+        stats["winner"] = winner
+        stats["solve_seconds"] = time.perf_counter() - start
+        stats["status"] = "FEASIBLE" if winner else "UNKNOWN"
+    if winner is None:
+        raise RuntimeError("Couldn't route.")
+    return {
+        flows[k]: [(nodes[u], nodes[v]) for u, v in path] for k, path in paths.items()
+    }
+
+
 def rgb2hex(r, g, b, a):
     return f"#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}{int(a * 255):02x}"
 
@@ -362,6 +1032,98 @@ def get_routing_solution(DG, flow_paths, used_channels):
     return routing_solution
 
 
+# Bump this whenever the routers change in a way that should not reuse
+# solutions cached by a previous version.
+ROUTING_CACHE_VERSION = "2"
+
+DEFAULT_ROUTING_CACHE_MAX_SIZE_MB = 64
+
+
+def default_routing_cache_dir():
+    if cache_dir := os.getenv("ROUTER_CACHE_DIR"):
+        return cache_dir
+    xdg_cache = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(xdg_cache, "aie-router")
+
+
+def _encode_flow_paths(flow_paths, flows):
+    # The path of every flow of `flows`, in order, as [col, row, col, row]
+    # edges.
+    return [
+        [[u.col, u.row, v.col, v.row] for u, v in flow_paths[flow]] for flow in flows
+    ]
+
+
+def _decode_flow_paths(data, DG, flows):
+    # Flow paths on `DG` from _encode_flow_paths; returns None if `data` doesn't
+    # route `flows` on `DG`.
+    nodes = {(n.col, n.row): n for n in DG.nodes}
+    if not isinstance(data, list) or len(data) != len(flows):
+        return None
+    flow_paths = {}
+    for flow, path in zip(flows, data):
+        try:
+            edges = [(nodes[u0, u1], nodes[v0, v1]) for u0, u1, v0, v1 in path]
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not all(DG.has_edge(u, v) for u, v in edges):
+            return None
+        flow_paths[flow] = edges
+    return flow_paths
+
+
+class RoutingCache(ArtifactCache):
+    """On-disk cache of Router flow paths, shared between processes.
+
+    Entries are JSON files keyed by Router.cache_key; see ArtifactCache for
+    the layout and least-recently-used eviction.
+    """
+
+    def __init__(self, cache_dir, max_size_mb=DEFAULT_ROUTING_CACHE_MAX_SIZE_MB):
+        super().__init__(cache_dir, max_size_mb)
+
+    def load(self, key):
+        """Return the data stored for `key`, or None on a miss."""
+        entry = self._entry(key)
+        try:
+            with open(entry, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def save(self, key, data):
+        entry = self._entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(entry), prefix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, entry)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.stores += 1
+        self.evict()
+
+    def invalidate(self, key):
+        """Remove the entry for `key`.  Returns True if there was one."""
+        try:
+            os.unlink(self._entry(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+
 def pythonize_bool(value):
     if value is None:
         return False
@@ -382,6 +1144,12 @@ class Router:
     max_row: int
     timeout: int
     use_gurobi: bool = False
+    formulation: str = "pairwise"
+    optimal: bool = False
+    paths_file: str = None
+    regions: bool = False
+    portfolio: bool = False
+    num_workers: int
     # Don't use actual binding here to prevent a blow up since class bodies are executed
     # at module load time.
     target_model: "AIETargetModel"
@@ -389,13 +1157,65 @@ class Router:
     used_channels: Dict[Tuple["Switchbox", "Switchbox"], Set[int]]
     routing_solution: Dict["PathEndPoint", "SwitchSettings"]
 
-    def __init__(self, use_gurobi=False, timeout=600):
+    def __init__(
+        self,
+        use_gurobi=False,
+        timeout=600,
+        formulation=None,
+        optimal=False,
+        hint=None,
+        paths_file=None,
+        cache=None,
+        regions=False,
+        portfolio=False,
+        num_workers=None,
+    ):
         self.flows = []
         self.routing_solution = None
         self.use_gurobi = use_gurobi or pythonize_bool(
             os.getenv("ROUTER_USE_GUROBI", "False")
         )
         self.timeout = timeout
+        # "congestion" scales to many more flows than the default "pairwise";
+        # see route_using_cp.
+        self.formulation = formulation or os.getenv("ROUTER_FORMULATION", "pairwise")
+        if self.formulation not in ROUTER_FORMULATIONS:
+            raise ValueError(f"unknown router formulation '{self.formulation}'")
+        # Unless optimal routing is asked for, the heuristic router runs first
+        # and the exact solver only if it can't find a legal routing.
+        self.optimal = optimal or pythonize_bool(os.getenv("ROUTER_OPTIMAL", "False"))
+        # The exact solver starts from the flow paths `hint` of a previous
+        # routing.  With a `paths_file`, they are loaded from it if it exists
+        # and the new paths are saved to it, so successive runs warm-start.
+        self.paths_file = paths_file or os.getenv("ROUTER_PATHS_FILE")
+        self.hint = hint
+        if self.hint is None and self.paths_file and os.path.exists(self.paths_file):
+            self.hint = load_flow_paths(self.paths_file)
+        self.flow_paths = None
+        # Flow paths can be reused across processes from a RoutingCache: the
+        # one given as `cache`, or the one in default_routing_cache_dir() with
+        # cache=True or ROUTER_CACHE=1.  It is off by default so that a routing
+        # is never silently a replay of an earlier one.
+        if cache is None:
+            cache = pythonize_bool(os.getenv("ROUTER_CACHE", "False"))
+        if cache is True:
+            try:
+                cache = RoutingCache(default_routing_cache_dir())
+            except OSError:
+                cache = None
+        self.cache = cache or None
+        # Large arrays are routed exactly region by region in parallel; see
+        # route_in_regions.
+        self.regions = regions or pythonize_bool(os.getenv("ROUTER_REGIONS", "False"))
+        # Race the heuristic router and several exact solvers instead; see
+        # route_with_portfolio.
+        self.portfolio = portfolio or pythonize_bool(
+            os.getenv("ROUTER_PORTFOLIO", "False")
+        )
+        # CPUs the exact solvers, regions or portfolio strategies share.
+        self.num_workers = num_workers or int(
+            os.getenv("ROUTER_NUM_WORKERS", available_cpus())
+        )
         self.used_channels = defaultdict(set)
 
     def initialize(self, max_col, max_row, target_model):
@@ -403,64 +1223,134 @@ class Router:
         self.max_row = max_row
         self.target_model = target_model
         self.DG = build_graph(self.max_col, self.max_row, self.target_model)
+        self.edge_index = build_edge_index(self.DG)
 
     def add_flow(self, src: "PathEndPoint", tgt: "PathEndPoint"):
         self.flows.append((src, tgt))
 
     def add_fixed_connection(self, connect_op):
-        from ._mlir_libs._aie_python_passes import get_connecting_bundle
+        from ._mlir_libs._aie_python_passes import Switchbox, get_connecting_bundle
 
-        tileid = connect_op.get_switchbox().get_tileid()
+        sb = Switchbox(connect_op.get_switchbox().get_tileid())
         lhs_port = connect_op.get_src_port()
         rhs_port = connect_op.get_dst_port()
 
         # find the correct Channel and indicate the fixed direction
 
-        # outgoing connection
-        matching_outgoing_edges = [
-            (u, v, e)
-            for u, v, e in self.DG.edges(data=True)
-            if e["bundle"] == rhs_port.bundle
-            and u == tileid  # i.e., this tile is the source
-        ]
-        if len(matching_outgoing_edges):
-            assert len(matching_outgoing_edges) == 1
-            u, v, e = matching_outgoing_edges[0]
+        # outgoing connection, i.e., this tile is the source
+        if edge := self.edge_index.get((sb, rhs_port.bundle, "out")):
+            u, v, e = edge
             e["capacity"] -= 1
             self.used_channels[u, rhs_port.bundle].add(rhs_port.channel)
             return True
 
-        # incoming connection
-        matching_incoming_edges = [
-            (u, v, e)
-            for u, v, e in self.DG.edges(data=True)
-            if e["bundle"] == get_connecting_bundle(lhs_port.bundle)
-            and v == tileid  # i.e., this tile is the target
-        ]
-        if len(matching_incoming_edges):
-            assert len(matching_incoming_edges) == 1
-            u, v, e = matching_incoming_edges[0]
+        # incoming connection, i.e., this tile is the target
+        incoming_bundle = get_connecting_bundle(lhs_port.bundle)
+        if edge := self.edge_index.get((sb, incoming_bundle, "in")):
+            u, v, e = edge
             e["capacity"] -= 1
             # this is where the assumption that connection ports across
             # tiles use the same channel comes in
-            assert e["bundle"] == get_connecting_bundle(lhs_port.bundle)
             self.used_channels[u, e["bundle"]].add(lhs_port.channel)
             return True
 
         return False
 
+    def route_exactly(self):
+        route = route_using_ilp if self.use_gurobi else route_using_cp
+        kwargs = dict(
+            timeout=self.timeout, formulation=self.formulation, hint=self.hint
+        )
+        if self.regions:
+            return route_in_regions(
+                self.DG, self.flows, route=route, cpus=self.num_workers, **kwargs
+            )
+        if not self.use_gurobi:
+            kwargs["num_workers"] = self.num_workers
+        return route(self.DG, self.flows, **kwargs)
+
+    def route_with_portfolio(self):
+        strategies = portfolio_strategies(self.num_workers)
+        if self.optimal:
+            strategies = [s for s in strategies if s[1] is not route_using_pathfinder]
+        return route_with_portfolio(
+            self.DG,
+            self.flows,
+            strategies,
+            timeout=self.timeout,
+            formulation=self.formulation,
+            hint=self.hint,
+            regions=self.regions,
+        )
+
+    def cache_key(self):
+        """Hash everything that determines the routing solution."""
+        edges = sorted(
+            f"{u!r}>{v!r}:{e['bundle']!r}:{e['capacity']}"
+            for u, v, e in self.DG.edges(data=True)
+        )
+        used_channels = sorted(
+            f"{sb!r}:{bundle!r}:{sorted(channels)}"
+            for (sb, bundle), channels in self.used_channels.items()
+            if channels
+        )
+        options = [
+            self.use_gurobi,
+            self.timeout,
+            self.formulation,
+            self.optimal,
+            self.regions,
+            self.portfolio,
+        ]
+        return ArtifactCache.make_key(
+            ROUTING_CACHE_VERSION,
+            f"{self.max_col},{self.max_row}",
+            "\n".join(edges),
+            "\n".join(used_channels),
+            "\n".join(f"{src!r}->{tgt!r}" for src, tgt in self.flows),
+            json.dumps(options),
+        )
+
+    def invalidate_cache(self):
+        """Drop the cached solution of the current routing problem, if any."""
+        if self.cache is not None:
+            self.cache.invalidate(self.cache_key())
+
     def find_paths(self):
+        key = None
+        flow_paths = None
+        if self.routing_solution is None and self.cache is not None:
+            key = self.cache_key()
+            data = self.cache.load(key)
+            if data is not None:
+                flow_paths = _decode_flow_paths(data, self.DG, self.flows)
+
         if self.routing_solution is None:
-            if self.use_gurobi:
-                flow_paths = route_using_ilp(self.DG, self.flows, timeout=self.timeout)
-            else:
-                flow_paths = route_using_cp(
-                    self.DG, self.flows, num_workers=10, timeout=self.timeout
-                )
+            # Cached flow paths go through the same steps as new ones, so the
+            # router ends up in the same state.
+            cached = flow_paths is not None
+            if not cached and self.portfolio:
+                flow_paths = self.route_with_portfolio()
+            elif not cached and not self.optimal:
+                try:
+                    flow_paths = route_using_pathfinder(self.DG, self.flows)
+                except RuntimeError:
+                    pass
+
+            if flow_paths is None:
+                flow_paths = self.route_exactly()
+            self.flow_paths = flow_paths
+            if self.paths_file:
+                save_flow_paths(self.paths_file, flow_paths)
 
             self.routing_solution = get_routing_solution(
                 self.DG, flow_paths, self.used_channels
             )
+            if key is not None and not cached:
+                try:
+                    self.cache.save(key, _encode_flow_paths(flow_paths, self.flows))
+                except OSError:
+                    pass
 
         return {k: dict(v) for k, v in self.routing_solution.items()}
 
@@ -0,0 +1,66 @@
+# npu_insts.py -*- Python -*-
+#
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# NPU instruction files.
+#
+# Text files (e.g. npu_insts.txt) hold one hex word per line, which is easy to
+# diff.  Binary files (any name ending in .bin) hold the little-endian words
+# and nothing else, like the output of `aie-translate --aie-npu-to-binary`,
+# so they can be loaded with np.fromfile or memory-mapped.
+
+import os
+
+import numpy as np
+
+
+def is_binary_insts_path(path):
+    return str(path).endswith(".bin")
+
+
+def insts_from_hex(words):
+    """Convert the 8-digit hex words emitted by aie-translate to an array."""
+    data = bytes.fromhex("".join(words))
+    return np.frombuffer(data, dtype=">u4").astype(np.uint32)
+
+
+def write_insts(path, insts):
+    """Write instruction words in the format implied by the file name.
+
+    The file is replaced rather than rewritten, so arrays memory-mapped from
+    the previous one by read_insts stay valid.
+    """
+    insts = np.asarray(insts, dtype=np.uint32)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            if is_binary_insts_path(path):
+                f.write(insts.astype("<u4").tobytes())
+            else:
+                np.savetxt(f, insts, fmt="%08X")
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_insts(path, mmap=False):
+    """Read an instruction file as a uint32 array.
+
+    With `mmap`, a binary file is memory-mapped read-only instead of read.
+    """
+    if not is_binary_insts_path(path):
+        with open(path, "r") as f:
+            return np.array([int(c, 16) for c in f.read().split()], dtype=np.uint32)
+
+    size = os.path.getsize(path)
+    if size % 4:
+        raise ValueError(f"{path}: {size} bytes is not a whole number of words")
+    if mmap and size:
+        return np.memmap(path, dtype="<u4", mode="r")
+    return np.fromfile(path, dtype="<u4")
@@ -6,10 +6,13 @@
 #
 # (c) Copyright 2024 Advanced Micro Devices, Inc.
 import copy
+import os
 import time
 import numpy as np
 import pyxrt as xrt
 
+from . import npu_insts
+
 
 class AIE_Application:
 
@@ -31,7 +34,12 @@ class AIE_Application:
         self.kernel = xrt.kernel(self.context, xkernel.get_name())
 
         ## Set up instruction stream
-        insts = read_insts(insts_path)
+        # insts_path may also be the instruction array itself, e.g. from
+        # aiecc's compile_module().
+        if isinstance(insts_path, np.ndarray):
+            insts = insts_path
+        else:
+            insts = read_insts(insts_path)
         self.n_insts = len(insts)
         self.insts_buffer = AIE_Buffer(
             self, 1, insts.dtype, insts.shape, xrt.bo.cacheable
@@ -105,15 +113,19 @@ insts_cache = {}
 
 def read_insts(insts_path):
     global insts_cache
-    if insts_path in insts_cache:
+    # A rewritten file is read again: it has a new modification time or size.
+    st = os.stat(insts_path)
+    key = (insts_path, st.st_mtime_ns, st.st_size)
+    if key in insts_cache:
         # Speed up things if we re-configure the array a lot: Don't re-parse
         # the insts.txt each time
-        return insts_cache[insts_path]
-    with open(insts_path, "r") as f:
-        insts_text = f.readlines()
-        insts_text = [l for l in insts_text if l != ""]
-        insts_v = np.array([int(c, 16) for c in insts_text], dtype=np.uint32)
-        insts_cache[insts_path] = insts_v
+        return insts_cache[key]
+    # Binary (.bin) instruction files are memory-mapped rather than parsed;
+    # npu_insts.write_insts replaces files, so the map stays valid.
+    insts_v = npu_insts.read_insts(insts_path, mmap=True)
+    for stale in [k for k in insts_cache if k[0] == insts_path]:
+        del insts_cache[stale]
+    insts_cache[key] = insts_v
     return insts_v
 
 
@@ -94,7 +94,7 @@ std::vector<uint32_t> test_utils::load_instr_sequence(std::string instr_path) {
 }
 
 std::vector<uint32_t> test_utils::load_instr_binary(std::string instr_path) {
-  std::ifstream instr_file(instr_path);
+  std::ifstream instr_file(instr_path, std::ios::binary);
   if (!instr_file.is_open()) {
     throw std::runtime_error("Unable to open instruction file\n");
   }
@@ -53,7 +53,11 @@ int xrt_test_run(int IN1_VOLUME, int IN2_VOLUME, int OUT_VOLUME,
   srand(time(NULL));
 
   // Load instruction sequence
-  std::vector<uint32_t> instr_v = test_utils::load_instr_sequence(myargs.instr);
+  std::vector<uint32_t> instr_v =
+      myargs.instr.size() > 4 &&
+              myargs.instr.compare(myargs.instr.size() - 4, 4, ".bin") == 0
+          ? test_utils::load_instr_binary(myargs.instr)
+          : test_utils::load_instr_sequence(myargs.instr);
   if (myargs.verbosity >= 1)
     std::cout << "Sequence instr count: " << instr_v.size() << "\n";
 
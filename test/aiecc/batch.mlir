@@ -0,0 +1,50 @@
+//===- batch.mlir ----------------------------------------------*- MLIR -*-===//
+//
+// This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+// See https://llvm.org/LICENSE.txt for license information.
+// SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+//
+// (c) Copyright 2025 Advanced Micro Devices, Inc.
+//
+//===----------------------------------------------------------------------===//
+
+// RUN: %PYTHON aiecc.py --batch --batch-manifest=%t.json --no-compile --no-link -n --aie-generate-npu-insts %s %S/simple_xclbin.mlir | FileCheck %s
+// RUN: FileCheck %s --input-file=%t.json --check-prefix=MANIFEST
+
+// A batch uses a temporary build cache unless --no-cache is given, and then
+// none at all, not even the one in $AIECC_CACHE_DIR.
+// RUN: rm -rf %t.prj %t.cache
+// RUN: %PYTHON aiecc.py --batch --batch-manifest=%t.cached.json --no-compile --no-link --no-compile-host --aie-generate-npu-insts --tmpdir=%t.prj %s | FileCheck %s --check-prefix=ONE
+// RUN: FileCheck %s --input-file=%t.cached.json --check-prefix=CACHED
+// RUN: env AIECC_CACHE_DIR=%t.cache %PYTHON aiecc.py --batch --no-cache --batch-manifest=%t.uncached.json --no-compile --no-link --no-compile-host --aie-generate-npu-insts --tmpdir=%t.prj %s | FileCheck %s --check-prefix=ONE
+// RUN: FileCheck %s --input-file=%t.uncached.json --check-prefix=UNCACHED
+// RUN: not ls %t.cache
+
+// CHECK: Compiled 2 of 2 designs
+// ONE: Compiled 1 of 1 designs
+
+// MANIFEST: "name": "{{.*}}batch.mlir"
+// MANIFEST: "tmpdir": "{{.*}}batch.mlir.prj"
+// MANIFEST: "status": "ok"
+// MANIFEST: "insts": "{{.*}}batch.mlir.prj{{/|\\}}npu_insts.txt"
+// MANIFEST: "name": "{{.*}}simple_xclbin.mlir"
+// MANIFEST: "tmpdir": "{{.*}}simple_xclbin.mlir.prj"
+// MANIFEST: "status": "ok"
+
+// CACHED: "status": "ok"
+// CACHED: "cache": {
+// UNCACHED: "status": "ok"
+// UNCACHED: "cache": null
+
+module {
+  aie.device(npu1_4col) {
+    %12 = aie.tile(1, 2)
+    %buf = aie.buffer(%12) : memref<256xi32>
+    %4 = aie.core(%12) {
+      %0 = arith.constant 1 : i32
+      %1 = arith.constant 0 : index
+      memref.store %0, %buf[%1] : memref<256xi32>
+      aie.end
+    }
+  }
+}
@@ -0,0 +1,41 @@
+//===- in_process.mlir -----------------------------------------*- MLIR -*-===//
+//
+// This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+// See https://llvm.org/LICENSE.txt for license information.
+// SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+//
+// (c) Copyright 2025 Advanced Micro Devices, Inc.
+//
+//===----------------------------------------------------------------------===//
+
+// REQUIRES: peano
+
+// RUN: %PYTHON aiecc.py --no-unified --in-process --compile --no-link --no-xchesscc -nv %VitisSysrootFlag% --host-target=%aieHostTargetTriplet% %s -I%aie_runtime_lib%/test_lib/include %extraAieCcFlags% -L%aie_runtime_lib%/test_lib/lib -ltest_lib %S/test.cpp -o test.elf | FileCheck %s --check-prefix=CORES
+// RUN: %PYTHON aiecc.py --unified --in-process --compile --no-link --no-xchesscc -nv %VitisSysrootFlag% --host-target=%aieHostTargetTriplet% %s -I%aie_runtime_lib%/test_lib/include %extraAieCcFlags% -L%aie_runtime_lib%/test_lib/lib -ltest_lib %S/test.cpp -o test.elf | FileCheck %s --check-prefix=UNIFIED
+
+// Per-core lowering and linker script generation go through the Python
+// bindings instead of aie-opt/aie-translate subprocesses.
+// CORES-NOT: aie-standard-lowering
+// CORES-NOT: --aie-generate-ldscript
+// CORES: in-process lowering of core (1, 2)
+// CORES: in-process ldscript generation for core (1, 2)
+// CORES: {{^[^ ]*llc}}
+// CORES-SAME: --march=aie2
+
+// UNIFIED-NOT: --mlir-to-llvmir
+// UNIFIED: in-process lowering of all cores
+// UNIFIED: {{^[^ ]*llc}}
+// UNIFIED-SAME: --march=aie2
+
+module {
+  aie.device(npu1_4col) {
+    %12 = aie.tile(1, 2)
+    %buf12 = aie.buffer(%12) : memref<256xi32>
+    %c12 = aie.core(%12) {
+      %0 = arith.constant 0 : i32
+      %1 = arith.constant 0 : index
+      memref.store %0, %buf12[%1] : memref<256xi32>
+      aie.end
+    }
+  }
+}
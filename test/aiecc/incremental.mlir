@@ -0,0 +1,42 @@
+//===- incremental.mlir ----------------------------------------*- MLIR -*-===//
+//
+// This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+// See https://llvm.org/LICENSE.txt for license information.
+// SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+//
+// (c) Copyright 2025 Advanced Micro Devices, Inc.
+//
+//===----------------------------------------------------------------------===//
+
+// RUN: rm -rf %t.prj
+// RUN: %PYTHON aiecc.py --incremental --no-compile --no-link --no-compile-host --aie-generate-npu-insts --tmpdir=%t.prj --npu-insts-name=%t.insts.txt %s | FileCheck %s --check-prefix=FULL
+// RUN: %PYTHON aiecc.py --incremental --no-compile --no-link --no-compile-host --aie-generate-npu-insts --tmpdir=%t.prj --npu-insts-name=%t.insts.txt %s | FileCheck %s --check-prefix=REUSE
+
+// Only the runtime sequence changes: the previous build is reused.
+// RUN: sed 's/value = 42/value = 43/' %s > %t.sequence.mlir
+// RUN: %PYTHON aiecc.py --incremental --no-compile --no-link --no-compile-host --aie-generate-npu-insts --tmpdir=%t.prj --npu-insts-name=%t.insts.txt %t.sequence.mlir | FileCheck %s --check-prefix=REUSE
+// RUN: FileCheck %s --input-file=%t.insts.txt --check-prefix=INSTS
+
+// A core changes: everything is rebuilt.
+// RUN: sed 's/arith.constant 1 : i32/arith.constant 2 : i32/' %t.sequence.mlir > %t.core.mlir
+// RUN: %PYTHON aiecc.py --incremental --no-compile --no-link --no-compile-host --aie-generate-npu-insts --tmpdir=%t.prj --npu-insts-name=%t.insts.txt %t.core.mlir | FileCheck %s --check-prefix=FULL
+
+// FULL-NOT: Device configuration unchanged
+// REUSE: Device configuration unchanged; reusing the previous build
+// INSTS: 0000002B
+
+module {
+  aie.device(npu1_4col) {
+    %12 = aie.tile(1, 2)
+    %buf = aie.buffer(%12) : memref<256xi32>
+    %4 = aie.core(%12) {
+      %0 = arith.constant 1 : i32
+      %1 = arith.constant 0 : index
+      memref.store %0, %buf[%1] : memref<256xi32>
+      aie.end
+    }
+    aiex.runtime_sequence(%arg0: memref<16xi32>) {
+      aiex.npu.write32 {address = 123 : ui32, column = 1 : i32, row = 2 : i32, value = 42 : ui32}
+    }
+  }
+}
@@ -0,0 +1,79 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+import os
+import tempfile
+
+from aie.compiler.aiecc.cache import ArtifactCache, linked_inputs
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+# CHECK-LABEL: TEST: test_hit_miss
+@run
+def test_hit_miss():
+    with tempfile.TemporaryDirectory() as d:
+        cache = ArtifactCache(os.path.join(d, "cache"))
+        src = os.path.join(d, "core_0_2.elf")
+        with open(src, "wb") as f:
+            f.write(b"\x7fELF" + bytes(60))
+
+        key = ArtifactCache.make_key("ir", "ldscript", "toolchain")
+        assert key != ArtifactCache.make_key("irl", "dscript", "toolchain")
+
+        dest = os.path.join(d, "restored.elf")
+        assert not cache.lookup(key, dest)
+        cache.store(key, src)
+        assert cache.lookup(key, dest)
+        with open(dest, "rb") as f:
+            assert f.read() == b"\x7fELF" + bytes(60)
+
+        # CHECK: {'hits': 1, 'misses': 1, 'stores': 1, 'evictions': 0}
+        print(cache.stats())
+
+
+# CHECK-LABEL: TEST: test_lru_eviction
+@run
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as d:
+        cache = ArtifactCache(os.path.join(d, "cache"), max_size_mb=1)
+        src = os.path.join(d, "big.elf")
+        with open(src, "wb") as f:
+            f.write(bytes(400 * 1024))
+
+        keys = [ArtifactCache.make_key(str(i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.store(key, src)
+            # Make the store order visible to the mtime-based LRU policy.
+            os.utime(cache._entry(key), ns=(i, i))
+        # Touch the oldest entry so that the second one becomes the LRU entry.
+        assert cache.lookup(keys[0], os.path.join(d, "out.elf"))
+
+        src_small = os.path.join(d, "small.elf")
+        with open(src_small, "wb") as f:
+            f.write(bytes(400 * 1024))
+        cache.store(ArtifactCache.make_key("3"), src_small)
+        cache.evict()
+
+        assert cache.size() <= 1024 * 1024
+        assert os.path.exists(cache._entry(keys[0]))
+        assert not os.path.exists(cache._entry(keys[1]))
+        # CHECK: evictions: 2
+        print("evictions:", cache.evictions)
+
+
+# CHECK-LABEL: TEST: test_linked_inputs
+@run
+def test_linked_inputs():
+    ldscript = "PROVIDE(main = core_0_2);\nINPUT(kernel.o)\n"
+    bcf = "_entry_point _main_init\n_include _file kernel2.o\n"
+    # CHECK: ['kernel.o', 'kernel2.o']
+    print(linked_inputs(ldscript + bcf))
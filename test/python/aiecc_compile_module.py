@@ -0,0 +1,73 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+import os
+import tempfile
+
+from aie.compiler.aiecc.main import compile_module
+from aie.ir import Context, Location, Module
+
+module = """
+module {
+  aie.device(npu1_4col) {
+    %12 = aie.tile(1, 2)
+    %buf = aie.buffer(%12) : memref<256xi32>
+    %4 = aie.core(%12) {
+      %0 = arith.constant 0 : i32
+      %1 = arith.constant 0 : index
+      memref.store %0, %buf[%1] : memref<256xi32>
+      aie.end
+    }
+    aiex.runtime_sequence(%arg0: memref<16xi32>) {
+      aiex.npu.write32 {address = 123 : ui32, column = 1 : i32, row = 2 : i32, value = 42 : ui32}
+    }
+  }
+}
+"""
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+ARGS = ["--no-compile", "--no-link", "--no-compile-host", "--aie-generate-npu-insts"]
+
+
+# CHECK-LABEL: TEST: in_memory
+# CHECK: insts: uint32 True
+# CHECK: xclbin: None
+# CHECK: tmpdir: None
+# CHECK: nothing left behind: True
+@run
+def in_memory():
+    prev_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as cwd:
+        os.chdir(cwd)
+        with Context(), Location.unknown():
+            result = compile_module(Module.parse(module), ARGS)
+        print("insts:", result.insts.dtype, len(result.insts) > 0)
+        print("xclbin:", result.xclbin)
+        print("tmpdir:", result.tmpdir)
+        print("nothing left behind:", os.listdir(cwd) == [])
+        os.chdir(prev_cwd)
+
+
+# CHECK-LABEL: TEST: kept_tmpdir
+# CHECK: insts file: True
+# CHECK: same insts: True
+@run
+def kept_tmpdir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with Context(), Location.unknown():
+            result = compile_module(Module.parse(module), ARGS, tmpdir)
+        insts_file = os.path.join(result.tmpdir, "npu_insts.txt")
+        print("insts file:", os.path.exists(insts_file))
+        with open(insts_file) as f:
+            insts = [int(word, 16) for word in f.read().split()]
+        print("same insts:", insts == result.insts.tolist())
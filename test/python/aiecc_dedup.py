@@ -0,0 +1,75 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+from aie.compiler.aiecc.dedup import alias_ldscript, canonicalize_core_llvmir
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+CORE_0_2 = """\
+@in_cons_buff_0 = external global [16 x i32]
+@out_buff_0 = external global [16 x i32]
+
+define void @core_0_2() {
+  %1 = load i32, ptr @in_cons_buff_0, align 4
+  store i32 %1, ptr @out_buff_0, align 4
+  ret void
+}
+"""
+
+# Same program on another tile, with its buffers declared in another order.
+CORE_1_2 = """\
+@out2_buff_0 = external global [16 x i32]
+@in2_cons_buff_0 = external global [16 x i32]
+
+define void @core_1_2() {
+  %1 = load i32, ptr @in2_cons_buff_0, align 4
+  store i32 %1, ptr @out2_buff_0, align 4
+  ret void
+}
+"""
+
+
+# CHECK-LABEL: TEST: test_identical_cores
+@run
+def test_identical_cores():
+    canonical_a, aliases_a = canonicalize_core_llvmir(CORE_0_2, 0, 2)
+    canonical_b, aliases_b = canonicalize_core_llvmir(CORE_1_2, 1, 2)
+    # CHECK: True
+    print(canonical_a == canonical_b)
+    # CHECK: define void @__aiecc_core()
+    # CHECK: load i32, ptr @__aiecc_sym0
+    print(canonical_a)
+    # CHECK: [('__aiecc_sym0', 'in2_cons_buff_0'), ('__aiecc_sym1', 'out2_buff_0')]
+    print(aliases_b)
+
+
+# CHECK-LABEL: TEST: test_different_cores
+@run
+def test_different_cores():
+    other = CORE_1_2.replace("store i32 %1", "store i32 7")
+    # CHECK: False
+    print(
+        canonicalize_core_llvmir(CORE_0_2, 0, 2)[0]
+        == canonicalize_core_llvmir(other, 1, 2)[0]
+    )
+
+
+# CHECK-LABEL: TEST: test_alias_ldscript
+@run
+def test_alias_ldscript():
+    _, aliases = canonicalize_core_llvmir(CORE_1_2, 1, 2)
+    script = "SECTIONS\n{\n}\nPROVIDE(main = core_1_2);\n"
+    # CHECK: PROVIDE(main = __aiecc_core);
+    # CHECK-NEXT: core_1_2 = __aiecc_core;
+    # CHECK-NEXT: __aiecc_sym0 = in2_cons_buff_0;
+    # CHECK-NEXT: __aiecc_sym1 = out2_buff_0;
+    print(alias_ldscript(script, 1, 2, aliases))
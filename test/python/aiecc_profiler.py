@@ -0,0 +1,120 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+from aie.compiler.aiecc.profiler import (
+    TraceRecorder,
+    capture_stderr,
+    parse_timing_report,
+    split_timing_report,
+    stderr_gate,
+)
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+STDERR = """\
+warning: something unrelated
+===-------------------------------------------------------------------------===
+                         ... Execution time report ...
+===-------------------------------------------------------------------------===
+  Total Execution Time: 0.0300 seconds
+
+  ----User Time----  ----Wall Time----  ----Name----
+    0.0050 ( 16.7%)    0.0100 ( 33.3%)  AIEPathfinderPass
+    0.0020 (  6.7%)    0.0020 (  6.7%)  'aie.device' Pipeline
+    0.0010 (  3.3%)    0.0010 (  3.3%)  Canonicalizer
+    0.0010 (  3.3%)    0.0010 (  3.3%)  Canonicalizer
+    0.0300 (100.0%)    0.0300 (100.0%)  Total
+"""
+
+
+# CHECK-LABEL: TEST: test_timing_report
+@run
+def test_timing_report():
+    diagnostics, report = split_timing_report(STDERR)
+    # CHECK: warning: something unrelated
+    print(diagnostics.strip())
+    # CHECK: {'AIEPathfinderPass': 0.01, 'Canonicalizer': 0.002}
+    print(parse_timing_report(report))
+    # CHECK: {}
+    print(parse_timing_report(diagnostics))
+
+
+# CHECK-LABEL: TEST: test_trace_lanes
+@run
+def test_trace_lanes():
+    trace = TraceRecorder()
+    with trace.slice("aie-opt", "subprocess", command="aie-opt a.mlir"):
+        with trace.slice("clang", "subprocess"):
+            pass
+    with trace.slice("generate_cdo", "in-process"):
+        pass
+    trace.add_pass_timings("aie-opt a.mlir", {"AIEPathfinderPass": 0.5})
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "trace.json")
+        trace.write(path)
+        with open(path) as f:
+            data = json.load(f)
+
+    slices = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    # Overlapping slices get their own lane; lanes are reused once free.
+    # CHECK: [('aie-opt', 0), ('clang', 1), ('generate_cdo', 0)]
+    print([(e["name"], e["tid"]) for e in slices])
+    counters = [e["args"]["running"] for e in data["traceEvents"] if e["ph"] == "C"]
+    # CHECK: [1, 2, 1, 0]
+    print(counters)
+    # CHECK: {'aie-opt a.mlir': {'AIEPathfinderPass': 0.5}}
+    print(data["otherData"]["passTimings"])
+
+
+# CHECK-LABEL: TEST: test_capture_excludes_new_processes
+@run
+def test_capture_excludes_new_processes():
+    capturing = threading.Event()
+    release_capture = threading.Event()
+    events = []
+    report = []
+
+    def capture():
+        with capture_stderr() as captured:
+            capturing.set()
+            os.write(2, b"report\n")
+            release_capture.wait()
+            events.append("capture ends")
+        report.extend(captured)
+
+    def spawn():
+        capturing.wait()
+        with stderr_gate.spawning():
+            events.append("child starts")
+            subprocess.run([sys.executable, "-c", "import os; os.write(2, b'')"])
+
+    threads = [threading.Thread(target=capture), threading.Thread(target=spawn)]
+    for t in threads:
+        t.start()
+    capturing.wait()
+    # The child waits for the capture to end rather than inheriting it as fd 2.
+    release_capture.wait(0.2)
+    # CHECK: []
+    print(events)
+    release_capture.set()
+    for t in threads:
+        t.join()
+    # CHECK: ['capture ends', 'child starts'] ['report\n']
+    print(events, report)
@@ -0,0 +1,82 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+import asyncio
+
+from aie.compiler.aiecc.scheduler import TaskGraph
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+def step(log, name, delay=0.0):
+    async def fn():
+        log.append(f"start {name}")
+        await asyncio.sleep(delay)
+        log.append(f"end {name}")
+
+    return fn
+
+
+# CHECK-LABEL: TEST: test_overlap
+@run
+def test_overlap():
+    log = []
+    graph = TaskGraph()
+    graph.add("route", step(log, "route", 0.05), ["in.mlir"], ["physical.mlir"])
+    graph.add("core", step(log, "core", 0.01), ["in.mlir"], ["core.elf"])
+    graph.add("cdo", step(log, "cdo"), ["physical.mlir", "core.elf"], ["cdo"])
+    asyncio.run(graph.run())
+    # Cores don't wait for routing; the CDO step waits for both.
+    # CHECK: ['start route', 'start core', 'end core', 'end route', 'start cdo', 'end cdo']
+    print(log)
+
+
+# CHECK-LABEL: TEST: test_limit
+@run
+def test_limit():
+    log = []
+    graph = TaskGraph(asyncio.Semaphore(1))
+    graph.add("a", step(log, "a", 0.01), limited=True)
+    graph.add("b", step(log, "b", 0.01), limited=True)
+    asyncio.run(graph.run())
+    # CHECK: ['start a', 'end a', 'start b', 'end b']
+    print(log)
+
+
+# CHECK-LABEL: TEST: test_cycle
+@run
+def test_cycle():
+    graph = TaskGraph()
+    graph.add("a", step([], "a"), ["y"], ["x"])
+    graph.add("b", step([], "b"), ["x"], ["y"])
+    try:
+        graph.topological_order()
+    except ValueError as e:
+        # CHECK: dependency cycle: a -> b -> a
+        print(e)
+
+
+# CHECK-LABEL: TEST: test_failure_cancels
+@run
+def test_failure_cancels():
+    log = []
+
+    async def fail():
+        raise RuntimeError("routing failed")
+
+    graph = TaskGraph()
+    graph.add("route", fail, [], ["physical.mlir"])
+    graph.add("cdo", step(log, "cdo"), ["physical.mlir"])
+    try:
+        asyncio.run(graph.run())
+    except RuntimeError as e:
+        # CHECK: routing failed []
+        print(e, log)
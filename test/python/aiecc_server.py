@@ -0,0 +1,76 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+import os
+import tempfile
+import threading
+
+from aie.compiler.aiecc.server import CompileServer, forward_to_server
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+# CHECK-LABEL: TEST: fallback_without_server
+# CHECK: missing socket: None
+# CHECK: no-server: None
+@run
+def fallback_without_server():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "aiecc.sock")
+        print(
+            "missing socket:",
+            forward_to_server(["--server-socket", socket_path, "--version"]),
+        )
+        with CompileServer(socket_path, 1):
+            print(
+                "no-server:",
+                forward_to_server(
+                    ["--server-socket", socket_path, "--no-server", "--version"]
+                ),
+            )
+
+
+# CHECK-LABEL: TEST: untrusted_socket
+# CHECK: shared directory: None
+@run
+def untrusted_socket():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "aiecc.sock")
+        with CompileServer(socket_path, 1):
+            os.chmod(tmpdir, 0o777)
+            print(
+                "shared directory:",
+                forward_to_server(["--server-socket", socket_path, "--version"]),
+            )
+
+
+# CHECK-LABEL: TEST: compile_on_server
+# CHECK: aiecc.py
+# CHECK: --version: 0
+# CHECK: error: the 'file' positional argument is required.
+# CHECK: no file: 1
+@run
+def compile_on_server():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "aiecc.sock")
+        with CompileServer(socket_path, 2) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                returncode = forward_to_server(
+                    ["--server-socket", socket_path, "--version"]
+                )
+                print("--version:", returncode)
+                returncode = forward_to_server(["--server-socket", socket_path])
+                print("no file:", returncode)
+            finally:
+                server.shutdown()
+                thread.join()
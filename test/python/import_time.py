@@ -0,0 +1,68 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+import json
+import os
+import subprocess
+import sys
+
+# Only needed to visualize or to route, so they must not be imported with the
+# design-facing packages.
+HEAVY_MODULES = ["matplotlib", "networkx", "ortools", "gurobipy"]
+
+# Seconds; override with AIE_IMPORT_TIME_BUDGET on slow machines.
+BUDGET = float(os.getenv("AIE_IMPORT_TIME_BUDGET", "5"))
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+def import_in_fresh_interpreter(module):
+    code = f"""
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(out.splitlines()[-1])
+    # Recorded in the test log, not checked exactly.
+    print(f"import {module}: {result['seconds']:.3f} s", file=sys.stderr)
+    return result
+
+
+# CHECK-LABEL: TEST: import_aie_iron
+# CHECK: heavy modules: []
+# CHECK: within budget: True
+@run
+def import_aie_iron():
+    result = import_in_fresh_interpreter("aie.iron")
+    print("heavy modules:", result["loaded"])
+    print("within budget:", result["seconds"] < BUDGET)
+
+
+# CHECK-LABEL: TEST: import_taplib
+# CHECK: heavy modules: []
+@run
+def import_taplib():
+    result = import_in_fresh_interpreter("aie.helpers.taplib")
+    print("heavy modules:", result["loaded"])
+
+
+# CHECK-LABEL: TEST: import_util
+# CHECK: heavy modules: []
+@run
+def import_util():
+    result = import_in_fresh_interpreter("aie.util")
+    print("heavy modules:", result["loaded"])
@@ -0,0 +1,83 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+import os
+import tempfile
+
+import numpy as np
+
+from aie.utils.npu_insts import insts_from_hex, read_insts, write_insts
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+WORDS = ["06030100", "00000105", "00000001", "0000002A", "FFFFFFFF"]
+
+
+# CHECK-LABEL: TEST: from_hex
+# CHECK: uint32 ['0x6030100', '0x105', '0x1', '0x2a', '0xffffffff']
+@run
+def from_hex():
+    insts = insts_from_hex(WORDS)
+    print(insts.dtype, [hex(i) for i in insts])
+
+
+# CHECK-LABEL: TEST: text_round_trip
+# CHECK: 06030100
+# CHECK-NEXT: 00000105
+# CHECK: FFFFFFFF
+# CHECK: same: True
+@run
+def text_round_trip():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "insts.txt")
+        write_insts(path, insts_from_hex(WORDS))
+        with open(path) as f:
+            print(f.read(), end="")
+        print("same:", read_insts(path).tolist() == insts_from_hex(WORDS).tolist())
+
+
+# CHECK-LABEL: TEST: binary_round_trip
+# CHECK: size: 20
+# CHECK: raw words: True
+# CHECK: fromfile: True
+# CHECK: mmap: True
+@run
+def binary_round_trip():
+    insts = insts_from_hex(WORDS)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "insts.bin")
+        write_insts(path, insts)
+        with open(path, "rb") as f:
+            data = f.read()
+        # The same layout as `aie-translate --aie-npu-to-binary` output.
+        print("size:", len(data))
+        print("raw words:", data == insts.astype("<u4").tobytes())
+        print("fromfile:", np.array_equal(read_insts(path), insts))
+        print("mmap:", np.array_equal(read_insts(path, mmap=True), insts))
+
+
+# CHECK-LABEL: TEST: rewrite_while_mapped
+# CHECK: old map: True
+# CHECK: new file: True
+@run
+def rewrite_while_mapped():
+    insts = insts_from_hex(WORDS)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "insts.bin")
+        write_insts(path, insts)
+        mapped = read_insts(path, mmap=True)
+        # Rewriting a shorter file replaces it rather than truncating the one
+        # still mapped, which would make reading the map crash.
+        write_insts(path, insts[:2])
+        print("old map:", np.array_equal(mapped, insts))
+        print("new file:", np.array_equal(read_insts(path), insts[:2]))
+        del mapped
@@ -4,6 +4,8 @@
 # RUN: %PYTHON %s | FileCheck %s
 # REQUIRES: python_passes
 
+import os
+import tempfile
 from pathlib import Path
 from textwrap import dedent
 
@@ -14,7 +16,7 @@ from aie._mlir_libs._aie_python_passes import (
 
 # noinspection PyUnresolvedReferences
 import aie.dialects.aie
-from aie.util import Router
+from aie.util import Router, RoutingCache
 from aie.ir import Context, Location, Module
 from aie.passmanager import PassManager
 
@@ -74,6 +76,140 @@ def test_broadcast():
     print(mlir_module)
 
 
+# CHECK-LABEL: TEST: test_broadcast_congestion
+@run
+def test_broadcast_congestion():
+    with open(Path(THIS_FILE).parent.parent / "create-flows" / "broadcast.mlir") as f:
+        mlir_module = Module.parse(f.read())
+    r = Router(timeout=TIMEOUT, formulation="congestion", optimal=True)
+    pass_ = create_python_router_pass(r)
+    pm = PassManager()
+    pass_manager_add_owned_pass(pm, pass_)
+    pm.add("aie-find-flows")
+
+    device = mlir_module.body.operations[0]
+    pm.run(device.operation)
+
+    # CHECK: %[[T02:.*]] = aie.tile(0, 2)
+    # CHECK: %[[T13:.*]] = aie.tile(1, 3)
+    # CHECK: %[[T20:.*]] = aie.tile(2, 0)
+    # CHECK: %[[T22:.*]] = aie.tile(2, 2)
+    # CHECK: %[[T31:.*]] = aie.tile(3, 1)
+    # CHECK: %[[T60:.*]] = aie.tile(6, 0)
+    # CHECK: %[[T71:.*]] = aie.tile(7, 1)
+    # CHECK: %[[T82:.*]] = aie.tile(8, 2)
+    # CHECK: %[[T83:.*]] = aie.tile(8, 3)
+    #
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T71]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T31]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T82]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T13]], DMA : 0)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T83]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T22]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T02]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T31]], DMA : 1)
+    print(mlir_module)
+
+
+# CHECK-LABEL: TEST: test_broadcast_warm_start
+@run
+def test_broadcast_warm_start():
+    with open(Path(THIS_FILE).parent.parent / "create-flows" / "broadcast.mlir") as f:
+        source = f.read()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths_file = os.path.join(tmpdir, "paths.json")
+        for _ in range(2):
+            mlir_module = Module.parse(source)
+            r = Router(
+                timeout=TIMEOUT, optimal=True, paths_file=paths_file, cache=False
+            )
+            pass_ = create_python_router_pass(r)
+            pm = PassManager()
+            pass_manager_add_owned_pass(pm, pass_)
+            pm.add("aie-find-flows")
+
+            device = mlir_module.body.operations[0]
+            pm.run(device.operation)
+        # The second routing started from the paths saved by the first.
+        assert r.hint is not None and len(r.hint) == len(r.flow_paths)
+
+    # CHECK: %[[T02:.*]] = aie.tile(0, 2)
+    # CHECK: %[[T13:.*]] = aie.tile(1, 3)
+    # CHECK: %[[T20:.*]] = aie.tile(2, 0)
+    # CHECK: %[[T22:.*]] = aie.tile(2, 2)
+    # CHECK: %[[T31:.*]] = aie.tile(3, 1)
+    # CHECK: %[[T60:.*]] = aie.tile(6, 0)
+    # CHECK: %[[T71:.*]] = aie.tile(7, 1)
+    # CHECK: %[[T82:.*]] = aie.tile(8, 2)
+    # CHECK: %[[T83:.*]] = aie.tile(8, 3)
+    #
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T71]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T31]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T82]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T13]], DMA : 0)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T83]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T22]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T02]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T31]], DMA : 1)
+    print(mlir_module)
+
+
+# CHECK-LABEL: TEST: test_broadcast_cached
+@run
+def test_broadcast_cached():
+    with open(Path(THIS_FILE).parent.parent / "create-flows" / "broadcast.mlir") as f:
+        source = f.read()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = RoutingCache(os.path.join(tmpdir, "cache"))
+        states = []
+        for i in range(2):
+            mlir_module = Module.parse(source)
+            paths_file = os.path.join(tmpdir, f"paths{i}.json")
+            r = Router(timeout=TIMEOUT, cache=cache, paths_file=paths_file)
+            pass_ = create_python_router_pass(r)
+            pm = PassManager()
+            pass_manager_add_owned_pass(pm, pass_)
+            pm.add("aie-find-flows")
+
+            device = mlir_module.body.operations[0]
+            pm.run(device.operation)
+            with open(paths_file) as f:
+                saved = f.read()
+            flow_paths = {
+                (repr(src), repr(tgt)): [(repr(u), repr(v)) for u, v in path]
+                for (src, tgt), path in r.flow_paths.items()
+            }
+            used_channels = {
+                (repr(sb), repr(bundle)): sorted(channels)
+                for (sb, bundle), channels in r.used_channels.items()
+            }
+            states.append((flow_paths, used_channels, saved))
+        # The second routing was read back from the cache, and left the router
+        # as the first one did.
+        assert (cache.hits, cache.misses, cache.stores) == (1, 1, 1)
+        assert states[0] == states[1]
+
+    # CHECK: %[[T02:.*]] = aie.tile(0, 2)
+    # CHECK: %[[T13:.*]] = aie.tile(1, 3)
+    # CHECK: %[[T20:.*]] = aie.tile(2, 0)
+    # CHECK: %[[T22:.*]] = aie.tile(2, 2)
+    # CHECK: %[[T31:.*]] = aie.tile(3, 1)
+    # CHECK: %[[T60:.*]] = aie.tile(6, 0)
+    # CHECK: %[[T71:.*]] = aie.tile(7, 1)
+    # CHECK: %[[T82:.*]] = aie.tile(8, 2)
+    # CHECK: %[[T83:.*]] = aie.tile(8, 3)
+    #
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T71]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T31]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T82]], DMA : 0)
+    # CHECK: aie.flow(%[[T20]], DMA : 0, %[[T13]], DMA : 0)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T83]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T22]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T02]], DMA : 1)
+    # CHECK: aie.flow(%[[T60]], DMA : 0, %[[T31]], DMA : 1)
+    print(mlir_module)
+
+
 # CHECK-LABEL: TEST: test_flow_test_1
 @run
 def test_flow_test_1():
@@ -0,0 +1,214 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+# REQUIRES: python_passes
+
+# Routes on a synthetic mesh, so no bindings are needed.
+
+import os
+import subprocess
+import sys
+import tempfile
+from collections import namedtuple
+
+import networkx as nx
+
+from aie.util import (
+    edge_usage,
+    flow_regions,
+    route_in_regions,
+    route_using_cp,
+    worker_process_context,
+)
+
+TIMEOUT = 10
+
+Switchbox = namedtuple("Switchbox", ["col", "row"])
+EndPoint = namedtuple("EndPoint", ["sb", "port"])
+
+
+def run(f):
+    # Worker processes that spawn rather than fork import this file again.
+    if __name__ == "__main__":
+        print("\nTEST:", f.__name__)
+        f()
+
+
+def mesh(cols, rows, capacity=1):
+    DG = nx.DiGraph()
+    for c in range(cols):
+        for r in range(rows):
+            for dc, dr in [(1, 0), (0, 1)]:
+                if c + dc < cols and r + dr < rows:
+                    a, b = Switchbox(c, r), Switchbox(c + dc, r + dr)
+                    DG.add_edge(a, b, capacity=capacity)
+                    DG.add_edge(b, a, capacity=capacity)
+    return DG
+
+
+def make_flows(pairs):
+    # Every flow has a DMA channel of its own, so none share channels.
+    return [
+        (EndPoint(Switchbox(*src), k), EndPoint(Switchbox(*tgt), k))
+        for k, (src, tgt) in enumerate(pairs)
+    ]
+
+
+def is_legal(DG, flows, flow_paths):
+    # Every path leads from its source to its target within the capacities.
+    for src, tgt in flows:
+        path = nx.DiGraph(flow_paths[src, tgt])
+        if src.sb not in path or not nx.has_path(path, src.sb, tgt.sb):
+            return False
+    usage = edge_usage(flow_paths)
+    return all(n <= DG.edges[e]["capacity"] for e, n in usage.items())
+
+
+def show(flow_paths):
+    # The paths as sorted lists of (col, row, col, row) edges, in any order.
+    return sorted(
+        sorted((u.col, u.row, v.col, v.row) for u, v in path)
+        for path in flow_paths.values()
+    )
+
+
+# Routes called in this process (the fallbacks); the regions are routed in
+# worker processes.
+calls = []
+
+
+def recording_route(DG, flows, **kwargs):
+    calls.append("warm-started" if kwargs.get("hint") else "cold")
+    return route_using_cp(DG, flows, **kwargs)
+
+
+def capacity_blind_route(DG, flows, **kwargs):
+    return {
+        (src, tgt): list(nx.utils.pairwise(nx.shortest_path(DG, src.sb, tgt.sb)))
+        for src, tgt in flows
+    }
+
+
+# Two flows on the top row of a 3x3 mesh with one channel per link, which
+# both need the link from (1, 2) to (0, 2).
+TOP_ROW = [((1, 2), (0, 2)), ((1, 2), (0, 2))]
+
+
+# CHECK-LABEL: TEST: test_flow_regions
+@run
+def test_flow_regions():
+    flows = make_flows([((0, 0), (1, 0)), ((0, 2), (1, 3)), ((3, 0), (3, 1))])
+    # CHECK: [((0, 0, 1, 0), [0]), ((0, 2, 1, 3), [1]), ((3, 0, 3, 1), [2])]
+    print(flow_regions(flows, margin=0))
+    # Boxes grown by the margin overlap and are merged.
+    # CHECK: [((-1, -1, 4, 4), [0, 1, 2])]
+    print(flow_regions(flows, margin=1))
+
+
+# CHECK-LABEL: TEST: test_worker_process_context
+@run
+def test_worker_process_context():
+    # This script is guarded, so workers are started, but never forked.
+    # CHECK: guarded: {{forkserver|spawn}}
+    print("guarded:", worker_process_context().get_start_method())
+    # A script that would re-run in every worker gets none.
+    with tempfile.TemporaryDirectory() as d:
+        script = os.path.join(d, "unguarded.py")
+        with open(script, "w") as f:
+            f.write("from aie.util import worker_process_context\n")
+            f.write("print(worker_process_context())\n")
+        out = subprocess.run(
+            [sys.executable, script], check=True, capture_output=True, text=True
+        ).stdout
+    # CHECK: unguarded: None
+    print("unguarded:", out.strip())
+
+
+# CHECK-LABEL: TEST: test_regions_routed_in_workers
+@run
+def test_regions_routed_in_workers():
+    DG = mesh(4, 4)
+    flows = make_flows([((0, 0), (1, 1)), ((0, 0), (0, 1)), ((3, 2), (2, 3))])
+    calls.clear()
+    stats = {}
+    flow_paths = route_in_regions(
+        DG,
+        flows,
+        route=recording_route,
+        margin=0,
+        max_workers=2,
+        stats=stats,
+        timeout=TIMEOUT,
+        num_workers=1,
+    )
+    # CHECK: 2 0 []
+    print(stats["regions"], stats["rerouted_flows"], calls)
+    # CHECK: legal: True
+    print("legal:", is_legal(DG, flows, flow_paths))
+
+
+# CHECK-LABEL: TEST: test_leftover_flows_reconciled
+@run
+def test_leftover_flows_reconciled():
+    DG = mesh(3, 3)
+    flows = make_flows(TOP_ROW + [((2, 0), (1, 0))])
+    calls.clear()
+    stats = {}
+    flow_paths = route_in_regions(
+        DG,
+        flows,
+        route=recording_route,
+        margin=0,
+        stats=stats,
+        timeout=TIMEOUT,
+        num_workers=1,
+    )
+    # The top row can't be routed inside its box; with the capacity the
+    # bottom row left, one of its flows goes around through the middle row.
+    # CHECK: 2 2 ['cold']
+    print(stats["regions"], stats["rerouted_flows"], calls)
+    # CHECK: [(0, 1, 0, 2), (1, 1, 0, 1), (1, 2, 1, 1)], [(1, 2, 0, 2)], [(2, 0, 1, 0)]]
+    print(show(flow_paths))
+    # CHECK: legal: True
+    print("legal:", is_legal(DG, flows, flow_paths))
+
+
+# CHECK-LABEL: TEST: test_full_graph_fallback
+@run
+def test_full_graph_fallback():
+    DG = mesh(3, 3)
+    flows = make_flows(TOP_ROW + [((1, 1), (1, 0)), ((2, 0), (1, 1)), ((2, 1), (0, 1))])
+    calls.clear()
+    stats = {}
+    flow_paths = route_in_regions(
+        DG,
+        flows,
+        route=recording_route,
+        margin=0,
+        stats=stats,
+        timeout=TIMEOUT,
+        num_workers=1,
+    )
+    # The bottom region routed (2, 1) -> (0, 1) along the middle row, which
+    # leaves the top row's leftover flow no way around.  Routing all flows
+    # together, starting from the paths found so far, succeeds.
+    # CHECK: 2 2 ['cold', 'warm-started']
+    print(stats["regions"], stats["rerouted_flows"], calls)
+    # CHECK: legal: True
+    print("legal:", is_legal(DG, flows, flow_paths))
+
+
+# CHECK-LABEL: TEST: test_over_capacity_rejected
+@run
+def test_over_capacity_rejected():
+    DG = mesh(3, 3)
+    flows = make_flows(TOP_ROW + [((2, 0), (1, 0))])
+    try:
+        route_in_regions(DG, flows, route=capacity_blind_route, margin=0)
+    except RuntimeError as e:
+        # CHECK: Couldn't route.
+        print(e)
@@ -0,0 +1,197 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+# REQUIRES: python_passes
+
+# Races stub strategies on a synthetic mesh, so no bindings are needed.
+
+import multiprocessing
+import time
+from collections import namedtuple
+
+import networkx as nx
+
+from aie.util import (
+    Router,
+    available_cpus,
+    edge_usage,
+    portfolio_strategies,
+    route_using_cp,
+    route_using_pathfinder,
+    route_with_portfolio,
+)
+
+Switchbox = namedtuple("Switchbox", ["col", "row"])
+EndPoint = namedtuple("EndPoint", ["sb", "port"])
+
+# Longer than any test takes unless a strategy isn't terminated.
+SLOW = 60
+
+
+def run(f):
+    # Strategy processes that spawn rather than fork import this file again.
+    if __name__ == "__main__":
+        print("\nTEST:", f.__name__)
+        f()
+
+
+def mesh(cols, rows, capacity=1):
+    DG = nx.DiGraph()
+    for c in range(cols):
+        for r in range(rows):
+            for dc, dr in [(1, 0), (0, 1)]:
+                if c + dc < cols and r + dr < rows:
+                    a, b = Switchbox(c, r), Switchbox(c + dc, r + dr)
+                    DG.add_edge(a, b, capacity=capacity)
+                    DG.add_edge(b, a, capacity=capacity)
+    return DG
+
+
+# Two sources on a 3x3 mesh with one channel per link, whose shortest paths
+# both use the link from (1, 2) to (0, 2).
+DG = mesh(3, 3)
+FLOWS = [(EndPoint(Switchbox(1, 2), k), EndPoint(Switchbox(0, 2), k)) for k in range(2)]
+
+
+def slow_route(DG, flows, **kwargs):
+    time.sleep(SLOW)
+    return route_using_pathfinder(DG, flows)
+
+
+def raising_route(DG, flows, **kwargs):
+    raise RuntimeError("no license")
+
+
+def capacity_blind_route(DG, flows, **kwargs):
+    return {
+        (src, tgt): list(nx.utils.pairwise(nx.shortest_path(DG, src.sb, tgt.sb)))
+        for src, tgt in flows
+    }
+
+
+def late_route(DG, flows, **kwargs):
+    # Answers after capacity_blind_route.
+    time.sleep(0.5)
+    return route_using_pathfinder(DG, flows)
+
+
+def hint_route(DG, flows, hint=None, **kwargs):
+    # Answers with the hint, so it only wins when it was given one.
+    if not hint:
+        raise RuntimeError("no hint")
+    return {flow: hint[flow] for flow in flows}
+
+
+def region_route(DG, flows, **kwargs):
+    # Only routes parts of the 6x6 mesh, as route_in_regions hands them out.
+    if DG.number_of_nodes() == 36:
+        raise RuntimeError("too large")
+    return route_using_pathfinder(DG, flows)
+
+
+def fits(flow_paths):
+    usage = edge_usage(flow_paths, by_source=True)
+    return all(n <= DG.edges[e]["capacity"] for e, n in usage.items())
+
+
+# CHECK-LABEL: TEST: test_first_legal_routing_wins
+@run
+def test_first_legal_routing_wins():
+    strategies = [
+        ("slow", slow_route, {}),
+        ("raising", raising_route, {}),
+        ("over-capacity", capacity_blind_route, {}),
+        ("legal", late_route, {}),
+    ]
+    stats = {}
+    start = time.perf_counter()
+    flow_paths = route_with_portfolio(DG, FLOWS, strategies, timeout=SLOW, stats=stats)
+    # The raising strategy and the over-capacity routing lose the race, and
+    # the slow strategy is terminated rather than waited for.
+    # CHECK: legal FEASIBLE
+    print(stats["winner"], stats["status"])
+    # CHECK: fits: True
+    print("fits:", fits(flow_paths))
+    # CHECK: terminated: True []
+    print(
+        "terminated:",
+        time.perf_counter() - start < SLOW / 2,
+        multiprocessing.active_children(),
+    )
+
+
+# CHECK-LABEL: TEST: test_timeout
+@run
+def test_timeout():
+    strategies = [
+        ("slow", slow_route, {}),
+        ("raising", raising_route, {}),
+        ("over-capacity", capacity_blind_route, {}),
+    ]
+    stats = {}
+    start = time.perf_counter()
+    try:
+        route_with_portfolio(DG, FLOWS, strategies, timeout=1, stats=stats)
+    except RuntimeError as e:
+        # CHECK: Couldn't route.
+        print(e)
+    # CHECK: None UNKNOWN
+    print(stats["winner"], stats["status"])
+    # CHECK: terminated: True []
+    print(
+        "terminated:",
+        time.perf_counter() - start < SLOW / 2,
+        multiprocessing.active_children(),
+    )
+
+
+# CHECK-LABEL: TEST: test_hint_and_regions
+@run
+def test_hint_and_regions():
+    hint = route_using_pathfinder(DG, FLOWS)
+    stats = {}
+    flow_paths = route_with_portfolio(
+        DG, FLOWS, [("hinted", hint_route, {})], timeout=SLOW, stats=stats, hint=hint
+    )
+    # CHECK: hinted FEASIBLE
+    print(stats["winner"], stats["status"])
+    # CHECK: same as hint: True
+    print("same as hint:", flow_paths == hint)
+
+    # Two flows at opposite corners of a 6x6 mesh are separate regions.
+    DG6 = mesh(6, 6)
+    flows = [
+        (EndPoint(Switchbox(0, 0), 0), EndPoint(Switchbox(1, 1), 0)),
+        (EndPoint(Switchbox(5, 5), 1), EndPoint(Switchbox(4, 4), 1)),
+    ]
+    strategies = [("regions", region_route, {})]
+    for regions in (False, True):
+        stats = {}
+        try:
+            route_with_portfolio(
+                DG6, flows, strategies, timeout=5, stats=stats, regions=regions
+            )
+        except RuntimeError:
+            pass
+        # CHECK: regions=False: None
+        # CHECK: regions=True: regions
+        print(f"regions={regions}:", stats["winner"])
+
+
+# CHECK-LABEL: TEST: test_worker_budget
+@run
+def test_worker_budget():
+    # CHECK: default: True
+    print("default:", Router().num_workers == available_cpus())
+    # The CP-SAT strategies split the router's CPUs rather than each taking
+    # as many.
+    strategies = portfolio_strategies(Router(num_workers=6).num_workers)
+    # CHECK: cp workers: [2, 2, 2]
+    print(
+        "cp workers:",
+        [kw["num_workers"] for _, route, kw in strategies if route is route_using_cp],
+    )
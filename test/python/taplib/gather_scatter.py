@@ -0,0 +1,123 @@
+import numpy as np
+
+from aie.helpers.taplib import TensorAccessPattern, TensorAccessSequence, TensorTiler2D
+from util import construct_test
+
+# RUN: %python %s | FileCheck %s
+
+
+# CHECK-LABEL: tap_gather
+@construct_test
+def tap_gather():
+    data = np.arange(4 * 6, dtype=np.int32).reshape(4, 6)
+
+    # A 2x3 tile at (1, 2) is a strided view of the data
+    tile = TensorAccessPattern((4, 6), 1 * 6 + 2, sizes=[2, 3], strides=[6, 1])
+    tile_data = tile.gather(data)
+    assert (tile_data == data[1:3, 2:5]).all()
+    assert np.shares_memory(tile_data, data)
+    assert not tile_data.flags.writeable
+
+    # Transposed access
+    transpose = TensorAccessPattern((4, 6), 0, sizes=[6, 4], strides=[1, 6])
+    assert (transpose.gather(data) == data.T).all()
+
+    # Repeated accesses are a view too
+    repeat = TensorAccessPattern((4, 6), 20, sizes=[2, 4], strides=[0, 1])
+    repeat_data = repeat.gather(data.ravel())
+    assert (repeat_data == np.array([[20, 21, 22, 23], [20, 21, 22, 23]])).all()
+    assert np.shares_memory(repeat_data, data)
+
+    # Accesses that wrap around the end of the tensor are gathered into a copy
+    wrap = TensorAccessPattern((4, 6), 22, sizes=[4], strides=[1])
+    wrap_data = wrap.gather(data)
+    assert (wrap_data == np.array([22, 23, 0, 1])).all()
+    assert not np.shares_memory(wrap_data, data)
+
+    try:
+        tile.gather(np.zeros((4, 5)))
+        raise Exception("Should fail, data does not match tensor dimensions")
+    except ValueError:
+        # Good
+        pass
+
+    # CHECK: Pass!
+    print("Pass!")
+
+
+# CHECK-LABEL: tap_scatter
+@construct_test
+def tap_scatter():
+    data = np.zeros((4, 6), dtype=np.int32)
+    tile = TensorAccessPattern((4, 6), 1 * 6 + 2, sizes=[2, 3], strides=[6, 1])
+    tile.scatter(data, np.arange(6).reshape(2, 3))
+    expected = np.zeros((4, 6), dtype=np.int32)
+    expected[1:3, 2:5] = np.arange(6).reshape(2, 3)
+    assert (data == expected).all()
+
+    # Scattering what was gathered round-trips
+    transpose = TensorAccessPattern((4, 6), 0, sizes=[6, 4], strides=[1, 6])
+    round_trip = np.zeros_like(expected)
+    transpose.scatter(round_trip, transpose.gather(expected))
+    assert (round_trip == expected).all()
+
+    # Repeated accesses keep the last value
+    repeat = TensorAccessPattern((4, 6), 0, sizes=[2, 3], strides=[0, 1])
+    repeat.scatter(data, [[7, 8, 9], [10, 11, 12]])
+    assert (data[0, :3] == [10, 11, 12]).all()
+
+    # Values broadcast to the sizes
+    repeat.scatter(data, 5)
+    assert (data[0, :3] == 5).all()
+
+    try:
+        tile.scatter(np.zeros((6, 4)).T, 0)
+        raise Exception("Should fail, cannot scatter into non-contiguous data")
+    except ValueError:
+        # Good
+        pass
+
+    # CHECK: Pass!
+    print("Pass!")
+
+
+# CHECK-LABEL: tas_gather
+@construct_test
+def tas_gather():
+    data = np.arange(8 * 8, dtype=np.int32).reshape(8, 8)
+
+    # Row blocks advance by a constant offset, so the whole sequence is one view
+    rows = TensorAccessSequence(
+        (8, 8),
+        4,
+        sizes=[2, 8],
+        strides=[8, 1],
+        offset_fn=lambda step, _: step * 2 * 8,
+    )
+    rows_data = rows.gather(data)
+    assert rows_data.shape == (4, 2, 8)
+    assert (rows_data == data.reshape(4, 2, 8)).all()
+    assert np.shares_memory(rows_data, data)
+
+    # 4x4 tiles are gathered in one fused fancy-index
+    tiles = TensorTiler2D.simple_tiler((8, 8), (4, 4))
+    tiles_data = tiles.gather(data)
+    assert tiles_data.shape == (4, *tiles[0].sizes)
+    assert (
+        tiles_data.reshape(4, 4, 4)
+        == data.reshape(2, 4, 2, 4).transpose(0, 2, 1, 3).reshape(4, 4, 4)
+    ).all()
+    for tile, tile_data in zip(tiles, tiles_data):
+        assert (tile.gather(data) == tile_data).all()
+
+    # Access patterns with different sizes give all accesses flat, in order
+    mixed = TensorAccessSequence.from_taps(
+        [
+            TensorAccessPattern((8, 8), 0, sizes=[2], strides=[1]),
+            TensorAccessPattern((8, 8), 8, sizes=[2, 2], strides=[8, 1]),
+        ]
+    )
+    assert (mixed.gather(data) == np.array([0, 1, 8, 9, 16, 17])).all()
+
+    # CHECK: Pass!
+    print("Pass!")
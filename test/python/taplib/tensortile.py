@@ -42,6 +42,64 @@ def tensor_tile():
     print("Pass!")
 
 
+# CHECK-LABEL: tensor_tile_repeated_accesses
+@construct_test
+def tensor_tile_repeated_accesses():
+    # Visits every element of a 2x3 tensor twice, then wraps around past the end
+    tile = TensorAccessPattern((2, 3), 4, sizes=[2, 4], strides=[0, 1])
+    assert (tile.access_indices() == np.array([4, 5, 0, 1, 4, 5, 0, 1])).all()
+    assert list(tile.access_generator()) == [4, 5, 0, 1, 4, 5, 0, 1]
+    access_order, access_count = tile.accesses()
+    assert (
+        access_order == np.array([[6, 7, -1], [-1, 4, 5]], dtype=access_order.dtype)
+    ).all()
+    assert (
+        access_count == np.array([[2, 2, 0], [0, 2, 2]], dtype=access_count.dtype)
+    ).all()
+
+    # Same accesses expressed with a different pattern
+    tile2 = TensorAccessPattern((2, 3), 4, sizes=[2, 2, 2], strides=[0, 2, 1])
+    assert tile.compare_access_orders(tile2)
+    tile3 = TensorAccessPattern((2, 3), 4, sizes=[2, 2, 1], strides=[0, 2, 1])
+    assert not tile.compare_access_orders(tile3)
+
+    # CHECK: Pass!
+    print("Pass!")
+
+
+# CHECK-LABEL: tensor_tile_canonical_form
+@construct_test
+def tensor_tile_canonical_form():
+    # Row-major walk over a 4x8 tensor, written three ways
+    tile = TensorAccessPattern((4, 8), 0, sizes=[4, 8], strides=[8, 1])
+    tile2 = TensorAccessPattern((4, 8), 0, sizes=[32], strides=[1])
+    tile3 = TensorAccessPattern((4, 8), 0, sizes=[2, 1, 2, 8], strides=[16, 5, 8, 1])
+    assert tile.canonical_form() == (32, 0, (32,), (1,))
+    assert tile.canonical_form() == tile2.canonical_form() == tile3.canonical_form()
+    assert tile.compare_access_orders(tile2) and tile3.compare_access_orders(tile)
+
+    # Strides wrap around the tensor, so a stride of the tensor size is no stride
+    repeat = TensorAccessPattern((4, 8), 3, sizes=[2, 4], strides=[32, 1])
+    repeat2 = TensorAccessPattern((4, 8), 3, sizes=[2, 4], strides=[0, 1])
+    assert repeat.canonical_form() == repeat2.canonical_form()
+    assert repeat.compare_access_orders(repeat2)
+
+    # Column-major is not row-major
+    transposed = TensorAccessPattern((4, 8), 0, sizes=[8, 4], strides=[1, 8])
+    assert tile.canonical_form() != transposed.canonical_form()
+    assert not tile.compare_access_orders(transposed)
+
+    # Dimensions that continue each other modulo the tensor size merge too
+    wrap = TensorAccessPattern((2, 2), 0, sizes=[4], strides=[3])
+    wrap2 = TensorAccessPattern((2, 2), 0, sizes=[2, 2], strides=[2, 3])
+    assert list(wrap2.access_generator()) == [0, 3, 2, 1]
+    assert wrap.canonical_form() == wrap2.canonical_form()
+    assert wrap.compare_access_orders(wrap2)
+
+    # CHECK: Pass!
+    print("Pass!")
+
+
 # CHECK-LABEL: tensor_tile_invalid
 @construct_test
 def tensor_tile_invalid():
@@ -71,6 +71,67 @@ def tensor_tile_sequence():
     print("Pass!")
 
 
+# CHECK-LABEL: tensor_tile_sequence_cached_accesses
+@construct_test
+def tensor_tile_sequence_cached_accesses():
+    # Equal patterns share their read-only access arrays
+    tile = TensorAccessPattern((2, 3), 0, sizes=[2, 3], strides=[3, 1])
+    tile2 = TensorAccessPattern((2, 3), 0, sizes=[2, 3], strides=[3, 1])
+    assert tile.access_order() is tile2.access_order()
+    assert not tile.access_order().flags.writeable
+    assert not tile.access_count().flags.writeable
+    try:
+        tile.access_order()[0, 0] = 5
+        raise Exception("Should not be able to modify cached access order")
+    except ValueError:
+        # Good
+        pass
+
+    tiles = TensorAccessSequence(
+        (2, 3), 2, sizes=[1, 3], strides=[0, 1], offset_fn=lambda step, _: step * 3
+    )
+    access_order, access_count = tiles.accesses()
+    assert access_order is tiles.access_order()
+    assert access_count is tiles.access_count()
+    assert not access_order.flags.writeable
+    assert (access_order == np.array([[0, 1, 2], [3, 4, 5]])).all()
+
+    # Mutations invalidate the combined arrays
+    tiles[1] = TensorAccessPattern((2, 3), 0, sizes=[1, 3], strides=[0, 1])
+    assert (tiles.access_count() == np.array([[2, 2, 2], [0, 0, 0]])).all()
+    del tiles[1]
+    assert (tiles.access_count() == np.array([[1, 1, 1], [0, 0, 0]])).all()
+    tiles.insert(0, TensorAccessPattern((2, 3), 3, sizes=[1, 3], strides=[0, 1]))
+    assert (tiles.access_order() == np.array([[3, 4, 5], [0, 1, 2]])).all()
+    tiles.append(TensorAccessPattern((2, 3), 3, sizes=[1, 1], strides=[0, 1]))
+    assert (tiles.access_count() == np.array([[1, 1, 1], [2, 1, 1]])).all()
+
+    # CHECK: Pass!
+    print("Pass!")
+
+
+# CHECK-LABEL: tensor_tile_sequence_overlapping
+@construct_test
+def tensor_tile_sequence_overlapping():
+    # The second tap re-reads the last element of the first one's row
+    tiles = TensorAccessSequence.from_taps(
+        [
+            TensorAccessPattern((2, 3), 0, sizes=[1, 3], strides=[0, 1]),
+            TensorAccessPattern((2, 3), 2, sizes=[1, 4], strides=[0, 1]),
+        ]
+    )
+    access_order, access_count = tiles.accesses()
+    assert (access_order == np.array([[0, 1, 3], [4, 5, 6]])).all()
+    assert (access_count == np.array([[1, 1, 2], [1, 1, 1]])).all()
+
+    empty = TensorAccessSequence((2, 3), 0)
+    assert (empty.access_order() == -1).all()
+    assert (empty.access_count() == 0).all()
+
+    # CHECK: Pass!
+    print("Pass!")
+
+
 # CHECK-LABEL: tensor_tile_sequence_invalid
 @construct_test
 def tensor_tile_sequence_invalid():
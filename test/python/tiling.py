@@ -0,0 +1,145 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+# RUN: %python %s | FileCheck %s
+
+from aie.dialects.aie import AIEDevice, get_target_model
+from aie.helpers.tiling import (
+    MemoryHierarchy,
+    TilingProblem,
+    evaluate,
+    explore,
+    matmul_problem,
+    num_tilings,
+)
+
+
+def run(f):
+    print("\nTEST:", f.__name__)
+    f()
+
+
+# The parameters of the original ILP experiment.
+ILP_HIERARCHY = MemoryHierarchy(
+    l2_bytes=2**16,
+    l1_bytes=2**11,
+    cores=64,
+    l2_ratios=[0.3, 0.3, 0.4],
+    l1_ratios=[0.3, 0.3, 0.4],
+    l3_l2_bandwidth=2**30 / 600e6,
+    l2_l1_bandwidth=2 * 2**30 / 600e6,
+)
+
+
+# CHECK-LABEL: TEST: hierarchy_from_target_model
+# CHECK: l2 2097152 l1 65536 cores 16
+# CHECK: l2 524288 l1 65536 cores 4
+@run
+def hierarchy_from_target_model():
+    tm = get_target_model(AIEDevice.npu1_4col)
+    for columns in (None, 1):
+        h = MemoryHierarchy.from_target_model(tm, columns)
+        print("l2", h.l2_bytes, "l1", h.l1_bytes, "cores", h.cores)
+
+
+# CHECK-LABEL: TEST: evaluate_tiling
+# CHECK: cycles 8192 cores 32
+# CHECK: l1 tile (32, 16, 16) l2 tile (64, 64, 64)
+# CHECK: l1 bytes (512, 256, 512)
+# CHECK: traffic 1.5 1.5
+# CHECK: too many cores: None
+@run
+def evaluate_tiling():
+    problem = TilingProblem(
+        [64, 64, 64], [[1, 0, 1], [0, 1, 1], [1, 1, 0]], ILP_HIERARCHY
+    )
+    tiling = evaluate(problem, [(1, 1, 2, 32), (1, 1, 4, 16), (1, 1, 4, 16)])
+    print("cycles", tiling.cycles, "cores", tiling.cores)
+    print("l1 tile", tiling.tile_sizes("L1"), "l2 tile", tiling.tile_sizes("L2"))
+    print("l1 bytes", tiling.l1_tile_bytes)
+    print("traffic", tiling.l3_l2_traffic, tiling.l2_l1_traffic)
+    print(
+        "too many cores:",
+        evaluate(problem, [(1, 1, 8, 8), (1, 1, 8, 8), (1, 1, 2, 32)]),
+    )
+
+
+# CHECK-LABEL: TEST: solvers_agree
+# CHECK: tilings 592704
+# CHECK: enumerate -20.5
+# CHECK: cp-sat -20.5
+# CHECK: same pareto set: True
+@run
+def solvers_agree():
+    problem = TilingProblem(
+        [64, 64, 64], [[1, 0, 1], [0, 1, 1], [1, 1, 0]], ILP_HIERARCHY
+    )
+    print("tilings", num_tilings(problem.loop_bounds))
+    results = {}
+    for solver in ("enumerate", "cp-sat"):
+        results[solver] = explore(problem, solver=solver, num_solutions=10)
+        print(solver, results[solver][0].objective)
+    # Symmetric tilings tie, so compare what they achieve rather than factors.
+    metrics = {
+        solver: sorted((t.objective, t._pareto_metrics()) for t in tilings)
+        for solver, tilings in results.items()
+    }
+    print("same pareto set:", metrics["enumerate"] == metrics["cp-sat"])
+
+
+# CHECK-LABEL: TEST: solvers_agree_on_ties
+# CHECK: enumerate [(-17.0, (1024, 22.0, 22.0))]
+# CHECK: cp-sat [(-17.0, (1024, 22.0, 22.0))]
+@run
+def solvers_agree_on_ties():
+    # Many more tilings than num_solutions tie at the best objective, and only
+    # some of them have the least traffic.
+    hierarchy = MemoryHierarchy(2**15, 2**11, 64, l1_ratios=[0.3, 0.3, 0.4])
+    problem = matmul_problem(128, 16, 32, hierarchy)
+    for solver in ("enumerate", "cp-sat"):
+        tilings = explore(problem, solver=solver, num_solutions=3)
+        print(solver, [(t.objective, t._pareto_metrics()) for t in tilings])
+
+
+# CHECK-LABEL: TEST: matmul_tile_sizes
+# CHECK: fits: True
+# CHECK: ranked: True
+# CHECK: pareto: True
+@run
+def matmul_tile_sizes():
+    hierarchy = MemoryHierarchy.from_target_model(get_target_model(AIEDevice.npu1_4col))
+    problem = matmul_problem(512, 512, 512, hierarchy)
+    tilings = explore(problem, num_solutions=20)
+    m, k, n = tilings[0].tile_sizes("L1")
+    print("fits:", (m * k + k * n) * 2 + m * n * 4 <= hierarchy.l1_bytes)
+    objectives = [t.objective for t in tilings]
+    print("ranked:", objectives == sorted(objectives))
+    print(
+        "pareto:",
+        not any(a.dominates(b) for a in tilings for b in tilings),
+    )
+
+
+# CHECK-LABEL: TEST: bad_problems
+# CHECK: Factors (2, 2, 2, 2) do not split the loop bound 64
+# CHECK: l2_ratios needs one entry per tensor, got 2 for 3
+# CHECK: Unknown solver 'simplex'
+# CHECK: too many to enumerate
+@run
+def bad_problems():
+    problem = matmul_problem(64, 64, 64, ILP_HIERARCHY)
+    for bad in (
+        lambda: evaluate(problem, [(2, 2, 2, 2)] * 3),
+        lambda: matmul_problem(
+            64, 64, 64, MemoryHierarchy(2**16, 2**11, 64, l2_ratios=[0.5, 0.5])
+        ),
+        lambda: explore(problem, solver="simplex"),
+        lambda: explore(matmul_problem(4096, 4096, 4096, ILP_HIERARCHY), "enumerate"),
+    ):
+        try:
+            bad()
+        except ValueError as e:
+            print(e)
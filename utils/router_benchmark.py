@@ -0,0 +1,431 @@
+# This file is licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# (c) Copyright 2025 Advanced Micro Devices, Inc.
+
+"""Benchmark the routers on synthetic flow sets of increasing size.
+
+Flow sets are generated for every combination of --flows, --fanout (targets
+per source) and --density (fraction of the array's columns the flows are
+confined to), on a synthetic mesh or, with --device, on the build_graph
+topology of real devices.  Every router runs on every flow set in a process
+of its own, recording model build and solve time, peak memory, the total
+path length (switchbox-to-switchbox channels used; a channel shared by flows
+of one source counts once) and the number of edges over capacity.
+
+The mesh only needs networkx and ortools (and gurobipy for --gurobi);
+--device and the C++ pathfinder (cpp-pathfinder) need the aie bindings.
+
+  python router_benchmark.py --flows 10,20,40,80 --fanout 1,4 -o base.json
+  python router_benchmark.py --device npu1_4col,npu2 --routers pathfinder,cpp-pathfinder
+  python router_benchmark.py --compare base.json new.json
+"""
+
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import random
+import re
+import resource
+import sys
+import time
+from collections import namedtuple
+
+from aie.util import (
+    ROUTER_FORMULATIONS,
+    edge_usage,
+    route_in_regions,
+    route_using_cp,
+    route_using_ilp,
+    route_using_pathfinder,
+    route_with_portfolio,
+)
+
+Switchbox = namedtuple("Switchbox", ["col", "row"])
+EndPoint = namedtuple("EndPoint", ["sb", "port"])
+
+# The graph to route on, the number of DMA channels of every switchbox's tile
+# (0 if flows can't start or end there) and the device, if any.
+Topology = namedtuple("Topology", ["name", "DG", "channels", "device"])
+
+FIELDS = [
+    "topology",
+    "router",
+    "requested_flows",
+    "flows",
+    "fanout",
+    "density",
+    "seed",
+    "iterations",
+    "num_variables",
+    "num_constraints",
+    "build_seconds",
+    "solve_seconds",
+    "seconds",
+    "peak_rss_mb",
+    "status",
+    "total_path_length",
+    "over_capacity",
+]
+
+# Results that identify the same benchmark in two runs.
+KEY_FIELDS = ["topology", "router", "requested_flows", "fanout", "density", "seed"]
+
+SUCCESS = {"OPTIMAL", "FEASIBLE"}
+
+
+def synthetic_graph(cols, rows, capacity):
+    """A mesh of switchboxes with `capacity` channels per direction."""
+    import networkx as nx
+
+    DG = nx.DiGraph()
+    for c in range(cols):
+        for r in range(rows):
+            DG.add_node(Switchbox(c, r))
+    for c in range(cols):
+        for r in range(rows):
+            for dc, dr in [(1, 0), (0, 1)]:
+                if c + dc < cols and r + dr < rows:
+                    a, b = Switchbox(c, r), Switchbox(c + dc, r + dr)
+                    DG.add_edge(a, b, capacity=capacity)
+                    DG.add_edge(b, a, capacity=capacity)
+    return DG
+
+
+def synthetic_topology(cols, rows, capacity):
+    DG = synthetic_graph(cols, rows, capacity)
+    return Topology(f"mesh{cols}x{rows}", DG, dict.fromkeys(DG.nodes, capacity), None)
+
+
+def device_module(device, tiles, flows=()):
+    lines = ["module {", f"  aie.device({device}) {{"]
+    for col, row in tiles:
+        lines.append(f"    %t_{col}_{row} = aie.tile({col}, {row})")
+    for src, tgt in flows:
+        lines.append(
+            f"    aie.flow(%t_{src.sb.col}_{src.sb.row}, DMA : {src.port[1]}, "
+            f"%t_{tgt.sb.col}_{tgt.sb.row}, DMA : {tgt.port[1]})"
+        )
+    lines += ["  }", "}"]
+    return "\n".join(lines)
+
+
+def device_topology(device):
+    """The build_graph topology of `device`, captured from the router pass."""
+    import networkx as nx
+    from aie._mlir_libs._aie_python_passes import (
+        create_python_router_pass,
+        pass_manager_add_owned_pass,
+    )
+    from aie.dialects.aie import AIEDevice, get_target_model
+    from aie.ir import Context, Location, Module
+    from aie.passmanager import PassManager
+    from aie.util import Router
+
+    class GraphCapture(Router):
+        def find_paths(self):
+            return {}
+
+    tm = get_target_model(int(getattr(AIEDevice, device)))
+    tiles = [(c, r) for c in range(tm.columns()) for r in range(tm.rows())]
+    with Context(), Location.unknown():
+        module = Module.parse(device_module(device, tiles))
+        router = GraphCapture(cache=False)
+        pm = PassManager()
+        pass_manager_add_owned_pass(pm, create_python_router_pass(router))
+        pm.run(module.body.operations[0].operation)
+
+    # Plain switchboxes and capacities, so the graph can go to other processes.
+    DG = nx.DiGraph()
+    DG.add_nodes_from(Switchbox(n.col, n.row) for n in router.DG.nodes)
+    for u, v, attrs in router.DG.edges(data=True):
+        DG.add_edge(
+            Switchbox(u.col, u.row),
+            Switchbox(v.col, v.row),
+            capacity=attrs["capacity"],
+        )
+
+    def dma_channels(col, row):
+        if tm.is_mem_tile(col, row):
+            return 6
+        if tm.is_core_tile(col, row) or tm.is_shim_noc_tile(col, row):
+            return 2
+        return 0
+
+    channels = {sb: dma_channels(sb.col, sb.row) for sb in DG.nodes}
+    return Topology(device, DG, channels, device)
+
+
+def synthetic_flows(topology, num_flows, fanout, density, seed):
+    """Up to `num_flows` flows in groups of `fanout` sharing a source DMA
+    channel, between tiles of the leftmost `density` of the columns.
+
+    Every DMA channel is used by at most one source and one target, so fewer
+    flows are returned when the channels run out.
+    """
+    rng = random.Random(seed)
+    num_cols = max(sb.col for sb in topology.DG.nodes) + 1
+    cols = max(1, math.ceil(density * num_cols))
+    tiles = sorted(sb for sb, n in topology.channels.items() if n and sb.col < cols)
+    src_free = {sb: list(range(topology.channels[sb])) for sb in tiles}
+    tgt_free = {sb: list(range(topology.channels[sb])) for sb in tiles}
+
+    flows = []
+    while len(flows) < num_flows:
+        srcs = [sb for sb in tiles if src_free[sb]]
+        if not srcs:
+            break
+        src = rng.choice(srcs)
+        src_port = ("DMA", src_free[src].pop(0))
+        tgts = [sb for sb in tiles if sb != src and tgt_free[sb]]
+        if not tgts:
+            break
+        for tgt in rng.sample(tgts, min(fanout, len(tgts), num_flows - len(flows))):
+            tgt_port = ("DMA", tgt_free[tgt].pop(0))
+            flows.append((EndPoint(src, src_port), EndPoint(tgt, tgt_port)))
+    return flows
+
+
+def channels_used(flow_paths):
+    return len({(src, e) for (src, _), path in flow_paths.items() for e in path})
+
+
+def over_capacity(DG, flow_paths):
+    usage = edge_usage(flow_paths, by_source=True)
+    return sum(1 for (u, v), n in usage.items() if n > DG.edges[u, v]["capacity"])
+
+
+# A connect op of a switchbox driving one of its neighbours.
+_HOP_RE = re.compile(r"aie\.connect<\w+ : \d+, (?:North|South|East|West) : \d+>")
+
+
+def route_cpp_pathfinder(topology, flows, stats):
+    from aie.ir import Context, Location, Module
+    from aie.passmanager import PassManager
+
+    tiles = sorted((sb.col, sb.row) for sb in topology.DG.nodes)
+    with Context(), Location.unknown():
+        module = Module.parse(device_module(topology.device, tiles, flows))
+        pm = PassManager.parse(
+            "builtin.module(aie.device(aie-create-pathfinder-flows))"
+        )
+        start = time.perf_counter()
+        try:
+            pm.run(module.operation)
+        except Exception:
+            stats["status"] = "FAILED"
+            return
+        stats["solve_seconds"] = time.perf_counter() - start
+        stats["status"] = "FEASIBLE"
+        # The pass only succeeds with a legal routing.
+        stats["over_capacity"] = 0
+        in_switchbox, hops = False, 0
+        for line in str(module).splitlines():
+            if "aie.switchbox(" in line:
+                in_switchbox = True
+            elif "aie.shim_mux(" in line:
+                in_switchbox = False
+            elif in_switchbox and _HOP_RE.search(line):
+                hops += 1
+        stats["total_path_length"] = hops
+
+
+def route_python(router, topology, flows, args, stats):
+    kwargs = {"timeout": args.timeout, "stats": stats}
+    exact = route_using_ilp if args.gurobi else route_using_cp
+    if router == "pathfinder":
+        flow_paths = route_using_pathfinder(topology.DG, flows, stats=stats)
+    elif router == "regions":
+        flow_paths = route_in_regions(topology.DG, flows, route=exact, **kwargs)
+    elif router == "portfolio":
+        flow_paths = route_with_portfolio(topology.DG, flows, **kwargs)
+    else:
+        flow_paths = exact(topology.DG, flows, formulation=router, **kwargs)
+    stats["total_path_length"] = channels_used(flow_paths)
+    stats["over_capacity"] = over_capacity(topology.DG, flow_paths)
+
+
+def _benchmark(conn, router, topology, flows, args):
+    # Runs in a process of its own, so that its peak memory is its own.
+    stats = {}
+    start = time.perf_counter()
+    try:
+        if router == "cpp-pathfinder":
+            route_cpp_pathfinder(topology, flows, stats)
+        else:
+            route_python(router, topology, flows, args, stats)
+    except RuntimeError:
+        stats["status"] = "FAILED"
+    stats["seconds"] = time.perf_counter() - start
+    peak_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    stats["peak_rss_mb"] = round(peak_kb / 1024, 1)
+    conn.send(stats)
+    conn.close()
+
+
+def benchmark(router, topology, flows, args):
+    recv, send = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_benchmark, args=(send, router, topology, flows, args)
+    )
+    process.start()
+    send.close()
+    # Leave the router time to give up on its own before killing it.
+    if recv.poll(args.timeout * 1.5 + 60):
+        stats = recv.recv()
+    else:
+        process.terminate()
+        stats = {"status": "TIMEOUT"}
+    process.join()
+    return stats
+
+
+def run(args):
+    if args.device:
+        topologies = [device_topology(d) for d in args.device.split(",")]
+    else:
+        topologies = [synthetic_topology(args.cols, args.rows, args.capacity)]
+
+    results = []
+    json_output = args.output and args.output.endswith(".json")
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    writer = (
+        None
+        if json_output
+        else csv.DictWriter(out, fieldnames=FIELDS, extrasaction="ignore")
+    )
+    if writer:
+        writer.writeheader()
+    for topology in topologies:
+        for num_flows in [int(n) for n in args.flows.split(",")]:
+            for fanout in [int(n) for n in args.fanout.split(",")]:
+                for density in [float(d) for d in args.density.split(",")]:
+                    flows = synthetic_flows(
+                        topology, num_flows, fanout, density, args.seed
+                    )
+                    for router in args.routers.split(","):
+                        if router == "cpp-pathfinder" and topology.device is None:
+                            continue
+                        result = {
+                            "topology": topology.name,
+                            "router": router,
+                            "requested_flows": num_flows,
+                            "flows": len(flows),
+                            "fanout": fanout,
+                            "density": density,
+                            "seed": args.seed,
+                            **benchmark(router, topology, flows, args),
+                        }
+                        results.append(result)
+                        if writer:
+                            writer.writerow(result)
+                            out.flush()
+    if json_output:
+        json.dump(results, out, indent=1)
+    if args.output:
+        out.close()
+
+
+def load_results(path):
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def compare(base_path, new_path, tolerance):
+    """Print the benchmarks of `new_path` that regressed from `base_path`.
+
+    A benchmark regresses if it no longer succeeds, has more edges over
+    capacity or a longer total path length, or takes more than `tolerance`
+    (relative, and at least 0.1 s or 1 MB) longer or more memory.  Returns the
+    number of regressions.
+    """
+    base = {tuple(str(r[f]) for f in KEY_FIELDS): r for r in load_results(base_path)}
+    regressions = 0
+    for new in load_results(new_path):
+        key = tuple(str(new[f]) for f in KEY_FIELDS)
+        old = base.get(key)
+        if old is None:
+            continue
+        problems = []
+        if old.get("status") in SUCCESS and new.get("status") not in SUCCESS:
+            problems.append(f"status {old.get('status')} -> {new.get('status')}")
+        for field in ["over_capacity", "total_path_length"]:
+            a, b = _number(old.get(field)), _number(new.get(field))
+            if a is not None and b is not None and b > a:
+                problems.append(f"{field} {a:g} -> {b:g}")
+        for field, slack in [("seconds", 0.1), ("peak_rss_mb", 1.0)]:
+            a, b = _number(old.get(field)), _number(new.get(field))
+            if a is not None and b is not None and b > a * (1 + tolerance) + slack:
+                problems.append(f"{field} {a:.2f} -> {b:.2f}")
+        if problems:
+            regressions += 1
+            name = ", ".join(f"{f}={v}" for f, v in zip(KEY_FIELDS, key))
+            print(f"REGRESSION {name}: {'; '.join(problems)}")
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--flows", default="10,20,40,80", help="Flow counts")
+    parser.add_argument("--fanout", default="1", help="Targets per source")
+    parser.add_argument(
+        "--density", default="1.0", help="Fractions of the columns flows use"
+    )
+    parser.add_argument(
+        "--device", default=None, help="Devices to route on instead of a mesh"
+    )
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--capacity", type=int, default=6)
+    parser.add_argument(
+        "--routers",
+        default=",".join([*ROUTER_FORMULATIONS, "pathfinder"]),
+        help="Exact router formulations, 'pathfinder', 'regions', 'portfolio' "
+        "and/or 'cpp-pathfinder' (devices only) to compare",
+    )
+    parser.add_argument("--gurobi", action="store_true", help="Use Gurobi")
+    parser.add_argument("--timeout", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "-o", "--output", default=None, help="CSV file, or JSON if it ends in .json"
+    )
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASE", "NEW"),
+        help="Report regressions of the results NEW from BASE and exit",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative time and memory increase --compare tolerates",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.tolerance) else 0)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()